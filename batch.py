@@ -0,0 +1,44 @@
+import sys
+import json
+import argparse
+
+from database import create_tables
+
+# 데이터베이스 초기화
+create_tables()
+
+from services.user_service import handle_user_login
+from services.batch_service import run_batch, default_run_id
+from utils.validators import validate_user_input
+
+
+# 상품 목록 파일(CSV/JSONL)로 원고 일괄 생성
+# 결과는 지정한 사용자의 콘텐츠 이력에 저장되며, 중단 후 같은 명령으로 다시 실행하면 이어서 처리한다.
+def main():
+    parser = argparse.ArgumentParser(description="상품 목록 파일(CSV/JSONL)로 원고를 일괄 생성합니다.")
+    parser.add_argument("path", help="상품 목록 파일 (.csv 또는 .jsonl, user_inputs와 같은 필드)")
+    parser.add_argument("--team", required=True, help="팀명")
+    parser.add_argument("--user", required=True, help="사용자명")
+    parser.add_argument("--workers", type=int, default=None, help="동시 생성 수 (기본: BATCH_WORKERS)")
+    parser.add_argument("--run-id", default=None, help="실행 ID (기본: 파일 이름 기반, 같은 ID로 다시 실행하면 이어서 처리)")
+    args = parser.parse_args()
+
+    is_valid, error_msg = validate_user_input(args.team, args.user)
+    if not is_valid:
+        print(error_msg)
+        sys.exit(1)
+
+    user_id = handle_user_login(args.team, args.user)
+    run_id = args.run_id or default_run_id(args.path)
+
+    def on_progress(processed: int, total: int, elapsed: float):
+        print(f"[{run_id}] {processed}/{total} 처리 ({elapsed:.0f}초 경과)")
+
+    summary = run_batch(args.path, user_id, run_id=run_id, workers=args.workers, on_progress=on_progress)
+    if summary["interrupted"]:
+        print(f"[{run_id}] 중단됨: 완료된 결과를 저장했습니다 (다시 실행하면 이어서 처리)")
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
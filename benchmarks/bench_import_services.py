@@ -0,0 +1,58 @@
+"""
+`import services` 임포트 시간 벤치마크
+
+새 Python 프로세스에서 `import services`에 걸리는 시간을 측정합니다.
+- cold: 프롬프트 스냅샷이 없는 상태 (YAML 파싱 수행)
+- warm: 프롬프트 스냅샷이 있는 상태 (YAML 파싱 생략)
+
+실행: poetry run python -m benchmarks.bench_import_services [반복 횟수]
+"""
+import os
+import sys
+import statistics
+import subprocess
+
+from core.config import settings, BASE_DIR
+
+# 자식 프로세스에서 실행할 측정 코드
+MEASURE_CODE = (
+    "import time; t = time.perf_counter(); "
+    "import services; "
+    "print((time.perf_counter() - t) * 1000)"
+)
+
+
+# 새 프로세스에서 import 시간(ms) 측정
+def measure_import_ms() -> float:
+    output = subprocess.run(
+        [sys.executable, "-c", MEASURE_CODE],
+        cwd=str(BASE_DIR),
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return float(output.stdout.strip().splitlines()[-1])
+
+
+# 프롬프트 스냅샷 삭제
+def remove_snapshot():
+    if os.path.exists(settings.PROMPT_CACHE_PATH):
+        os.remove(settings.PROMPT_CACHE_PATH)
+
+
+def main(runs: int = 10):
+    cold, warm = [], []
+
+    for _ in range(runs):
+        remove_snapshot()
+        cold.append(measure_import_ms())
+        # 직전 cold 실행에서 스냅샷이 저장된 상태
+        warm.append(measure_import_ms())
+
+    print(f"{'mode':<8}{'median (ms)':>14}{'min (ms)':>12}{'max (ms)':>12}")
+    for mode, samples in (("cold", cold), ("warm", warm)):
+        print(f"{mode:<8}{statistics.median(samples):>14.1f}{min(samples):>12.1f}{max(samples):>12.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10)
@@ -0,0 +1,75 @@
+"""
+프롬프트 렌더링 마이크로벤치마크
+
+기존 방식(요청마다 프롬프트 변수 딕셔너리 구성 + 전체 system_prompt에 str.format)과
+컴파일된 템플릿(PromptTemplate.render)의 1회 렌더링 시간을 비교합니다.
+
+실행: poetry run python -m benchmarks.bench_prompt_render [반복 횟수]
+"""
+import sys
+import timeit
+
+from utils.prompt_loader import prompt_loader
+
+# 벤치마크용 입력 데이터
+SAMPLE_PRODUCT_DATA = {
+    "product_name": "나이키 에어맥스",
+    "price": "89,000원",
+    "product_attribute": "사이즈 250~290 / 블랙, 화이트 / 경량 쿠셔닝",
+    "event": "첫 구매 시 추가 5,000원 할인, 무료배송",
+    "card": "신한카드 5% 할인",
+    "coupon": "신규회원 20% 할인 쿠폰, 최대 5만원까지",
+    "keyword": "한정수량, 조기품절",
+    "etc": "",
+    "best_case": "지이크 체스터 롱코트 103,200원입니다\n롯데카드 있으면 98,040원까지 나옵니다\n기본 디자인이라 겨울에 입기 괜찮아보이네요",
+    "regenerate_reason": "너무 광고 같아요",
+    "previous_contents": [{"id": 1, "tone": "정보전달형", "text": "이전 문구"}],
+    "target_tones": "정보전달형"
+}
+
+
+# 기존 방식 렌더링 (비교 기준)
+def legacy_render(prompt_data, product_data):
+    prompt_variables = {
+        "productName": product_data.get("product_name", ""),
+        "price": product_data.get("price", ""),
+        "productAttribute": product_data.get("product_attribute", ""),
+        "event": product_data.get("event", ""),
+        "card": product_data.get("card", ""),
+        "coupon": product_data.get("coupon", ""),
+        "keyword": product_data.get("keyword", ""),
+        "etc": product_data.get("etc", ""),
+        "bestCase": product_data.get("best_case", ""),
+        "regenerateReason": product_data.get("regenerate_reason", ""),
+        "previousContents": product_data.get("previous_contents", ""),
+        "targetTones": product_data.get("target_tones", ""),
+        "role_definition": prompt_data.get("role_definition", ""),
+        "guidelines": "\n".join(prompt_data.get("guidelines", [])),
+        "community_style": prompt_data.get("community_style", {}),
+        "output_format": prompt_data.get("output_format", ""),
+        "community_style_core": prompt_data.get("community_style", {}).get("core", ""),
+        "community_style_tone": prompt_data.get("community_style", {}).get("tone", ""),
+        "community_style_characteristics": prompt_data.get("community_style", {}).get("characteristics", ""),
+        "community_style_professional_terms": prompt_data.get("community_style", {}).get("professional_terms", "")
+    }
+    return prompt_data.get("system_prompt", "").format(**prompt_variables)
+
+
+def main(number: int = 20000):
+    print(f"{'prompt':<22}{'legacy (us)':>14}{'compiled (us)':>16}{'speedup':>10}")
+
+    for prompt_key in sorted(prompt_loader.templates):
+        prompt_data = prompt_loader.prompts[prompt_key]
+        template = prompt_loader.templates[prompt_key]
+
+        # 렌더링 결과가 기존 방식과 동일한지 확인
+        assert template.render(SAMPLE_PRODUCT_DATA) == legacy_render(prompt_data, SAMPLE_PRODUCT_DATA), prompt_key
+
+        legacy = timeit.timeit(lambda: legacy_render(prompt_data, SAMPLE_PRODUCT_DATA), number=number)
+        compiled = timeit.timeit(lambda: template.render(SAMPLE_PRODUCT_DATA), number=number)
+
+        print(f"{prompt_key:<22}{legacy / number * 1e6:>14.2f}{compiled / number * 1e6:>16.2f}{legacy / compiled:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,130 @@
+"""
+응답 파싱 성공률 벤치마크
+
+녹화한 카세트(JSONL)의 실제 응답을 대상으로 기존 파싱 로직과 복구 파서를 비교합니다.
+- full: 요청한 톤을 모두 파싱
+- partial: 일부 톤만 복구 (복구 파서는 누락된 톤만 재요청)
+- fallback: 'AI 생성' 카드 1장으로 대체
+카세트를 지정하지 않으면 대표적인 깨진 응답 유형으로 만든 내장 코퍼스를 사용합니다.
+
+실행: poetry run python -m benchmarks.bench_response_parse [카세트 경로 ...]
+"""
+import re
+import sys
+import json
+import time
+from collections import Counter
+
+from services.ai_service import TONE_ORDER
+from services.response_parser import parse_tone_response
+
+REPEAT = 200
+
+
+# 기존 generate_product_content의 파싱 로직 (비교 기준)
+def legacy_parse(text: str) -> dict:
+    response_text = text.strip()
+    if '```json' in response_text:
+        start_idx = response_text.find('```json') + 7
+        end_idx = response_text.find('```', start_idx)
+        if end_idx != -1:
+            response_text = response_text[start_idx:end_idx].strip()
+    elif '```' in response_text:
+        start_idx = response_text.find('```') + 3
+        end_idx = response_text.find('```', start_idx)
+        if end_idx != -1:
+            response_text = response_text[start_idx:end_idx].strip()
+
+    key_by_name = {name: key for key, name in TONE_ORDER}
+    try:
+        if response_text.startswith('{'):
+            parsed = json.loads(response_text)
+            return {key: parsed[key]['content'] for key, _ in TONE_ORDER if key in parsed and 'content' in parsed[key]}
+        if response_text.startswith('['):
+            parsed = json.loads(response_text)
+            return {key_by_name.get(item['tone'], item['tone']): item['text'] for item in parsed
+                    if isinstance(item, dict) and 'tone' in item and 'text' in item}
+    except json.JSONDecodeError:
+        pass
+    return {}
+
+
+# 내장 코퍼스: 정상 응답과 대표적인 깨진 응답 유형
+def builtin_corpus() -> list:
+    full = json.dumps({key: {"content": f"{name} 원고 첫 줄\n가격 혜택 정리\n마무리 문장"} for key, name in TONE_ORDER},
+                      ensure_ascii=False, indent=2)
+    array = json.dumps([{"tone": "후기형", "text": "재생성한 후기형 원고"}], ensure_ascii=False)
+    all_tones = [name for _, name in TONE_ORDER]
+    return [
+        ("clean", full, all_tones),
+        ("fenced", f"```json\n{full}\n```", all_tones),
+        ("missing_closing_fence", f"```json\n{full}", all_tones),
+        ("trailing_prose", f"{full}\n\n요청하신 6가지 톤으로 작성했습니다.", all_tones),
+        ("leading_prose", f"다음은 작성한 원고입니다.\n```json\n{full}\n```", all_tones),
+        ("truncated_last_tone", full[:len(full) - 30], all_tones),
+        ("truncated_mid_response", full[:len(full) // 2], all_tones),
+        ("bare_array", array, ["후기형"]),
+        ("prose_only", "원고를 작성했습니다. 원하시는 톤을 알려주세요.", all_tones),
+    ]
+
+
+# 카세트 코퍼스: 프롬프트의 '재생성 대상 톤'으로 기대 톤 결정
+def cassette_corpus(paths: list) -> list:
+    corpus = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for index, line in enumerate(f):
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if entry.get("error") or "text" not in entry:
+                    continue
+                match = re.search(r"재생성 대상 톤: (.+)", entry.get("prompt", ""))
+                expected = [name.strip() for name in match.group(1).split(",")] if match else [name for _, name in TONE_ORDER]
+                corpus.append((f"{path}:{index + 1}", entry["text"], expected))
+    return corpus
+
+
+def classify(contents: dict, expected_names: list) -> str:
+    expected_keys = {key for key, name in TONE_ORDER if name in expected_names}
+    found = expected_keys & set(contents)
+    if found == expected_keys:
+        return "full"
+    return "partial" if found else "fallback"
+
+
+def measure_us(parse, corpus) -> float:
+    started = time.perf_counter()
+    for _ in range(REPEAT):
+        for _, text, _ in corpus:
+            parse(text)
+    return (time.perf_counter() - started) / (REPEAT * len(corpus)) * 1e6
+
+
+def main(paths: list):
+    corpus = cassette_corpus(paths) if paths else builtin_corpus()
+    if not corpus:
+        print("파싱할 응답이 없습니다.")
+        return
+
+    parsers = {
+        "legacy": legacy_parse,
+        "repair": lambda text: parse_tone_response(text, TONE_ORDER).contents,
+    }
+
+    if not paths:
+        print(f"{'case':<26}{'legacy':>10}{'repair':>10}")
+        for name, text, expected in corpus:
+            print(f"{name:<26}{classify(legacy_parse(text), expected):>10}"
+                  f"{classify(parsers['repair'](text), expected):>10}")
+        print()
+
+    print(f"{'parser':<10}{'full':>8}{'partial':>10}{'fallback':>10}{'us/parse':>12}")
+    for parser_name, parse in parsers.items():
+        outcomes = Counter(classify(parse(text), expected) for _, text, expected in corpus)
+        print(f"{parser_name:<10}{outcomes['full']:>8}{outcomes['partial']:>10}{outcomes['fallback']:>10}"
+              f"{measure_us(parse, corpus):>12.1f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
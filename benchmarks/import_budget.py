@@ -0,0 +1,71 @@
+"""
+로그인 화면 콜드 스타트 임포트 예산 검사
+
+새 Python 프로세스에서 main.py가 로그인 화면을 그리기 전까지 import하는 앱 모듈의 시간을 측정하고,
+- 앱 모듈 import 시간(streamlit 자체 import 시간 제외)이 예산 이내인지
+- 로그인 화면에서 쓰지 않는 무거운 모듈(Gemini SDK, pandas, numpy, bson)이 로드되지 않았는지
+를 확인합니다. 예산을 넘거나 무거운 모듈이 로드되면 종료 코드 1을 반환합니다.
+
+실행: poetry run python -m benchmarks.import_budget [예산(ms), 기본 500] [반복 횟수]
+"""
+import sys
+import json
+import statistics
+import subprocess
+
+from core.config import BASE_DIR
+
+# 로그인 화면에서 로드되면 안 되는 모듈
+HEAVY_MODULES = ["google.generativeai", "pandas", "numpy", "bson"]
+
+# main.py가 로그인 화면 전에 import하는 모듈
+APP_IMPORTS = (
+    "import database; "
+    "import frontend; "
+    "import frontend.components.sidebar; "
+    "import frontend.pages.history; "
+    "import frontend.pages.community_cases"
+)
+
+# 자식 프로세스에서 실행할 측정 코드 (streamlit은 앱과 무관한 고정 비용이므로 먼저 로드)
+MEASURE_CODE = (
+    "import sys, time, json; import streamlit; "
+    "t = time.perf_counter(); "
+    f"{APP_IMPORTS}; "
+    "elapsed = (time.perf_counter() - t) * 1000; "
+    f"print(json.dumps({{'ms': elapsed, 'loaded': [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))"
+)
+
+
+# 새 프로세스에서 앱 모듈 import 시간(ms)과 로드된 무거운 모듈 측정
+def measure() -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", MEASURE_CODE],
+        cwd=str(BASE_DIR),
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def main(budget_ms: float = 500.0, runs: int = 5) -> int:
+    samples = [measure() for _ in range(runs)]
+    median_ms = statistics.median(sample["ms"] for sample in samples)
+    loaded = sorted({module for sample in samples for module in sample["loaded"]})
+
+    print(f"app import median={median_ms:.1f}ms min={min(s['ms'] for s in samples):.1f}ms budget={budget_ms:.0f}ms")
+    print(f"heavy modules loaded: {', '.join(loaded) if loaded else 'none'}")
+
+    if median_ms > budget_ms or loaded:
+        print("FAIL")
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(
+        float(sys.argv[1]) if len(sys.argv) > 1 else 500.0,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    ))
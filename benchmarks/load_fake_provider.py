@@ -0,0 +1,65 @@
+"""
+가짜 공급자 부하 테스트 스크립트
+
+LLM_PROVIDER=fake 상태에서 여러 스레드가 동시에 generate_product_content를 호출합니다.
+네트워크 없이 스케줄러/재시도/서킷 브레이커/응답 파싱 경로 전체의 지연 분포와 성공률을 측정합니다.
+가짜 공급자 동작은 FAKE_LATENCY, FAKE_ERROR_RATE, FAKE_MALFORMED_RATE 환경 변수로 조정합니다.
+
+실행: LLM_PROVIDER=fake poetry run python -m benchmarks.load_fake_provider [동시 사용자 수] [사용자당 요청 수]
+"""
+import os
+import sys
+import time
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault("LLM_PROVIDER", "fake")
+
+from services.ai_service import ai_service, TONE_ORDER
+
+COMMUNITIES = ["mam2bebe", "ppomppu", "fmkorea"]
+TEAMS = ["브랜드패션팀", "뷰티팀", "리빙팀"]
+
+
+# 사용자 1명의 연속 요청
+def run_user(user_index: int, requests: int):
+    results = []
+    for i in range(requests):
+        product_data = {"product_name": f"상품-{user_index}-{i}", "price": "39,000원"}
+        started = time.perf_counter()
+        result = ai_service.generate_product_content(
+            product_data=product_data,
+            community_key=COMMUNITIES[(user_index + i) % len(COMMUNITIES)],
+            user_id=f"user-{user_index}",
+            team_name=TEAMS[user_index % len(TEAMS)]
+        )
+        complete = result["success"] and len(result.get("generated_contents", [])) == len(TONE_ORDER)
+        results.append((time.perf_counter() - started, result["success"], complete, result.get("queue_wait", 0.0)))
+    return results
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=users) as executor:
+        results = [row for rows in executor.map(run_user, range(users), [requests] * users) for row in rows]
+    elapsed = time.perf_counter() - started
+
+    latencies = [row[0] for row in results]
+    print(f"provider={ai_service.provider.name} stats={ai_service.provider.snapshot()}")
+    print(f"requests={len(results)} elapsed={elapsed:.2f}s throughput={len(results) / elapsed:.2f} req/s")
+    print(f"success={sum(row[1] for row in results)} six_tone_json={sum(row[2] for row in results)}")
+    print(f"latency p50={percentile(latencies, 0.5):.2f}s p95={percentile(latencies, 0.95):.2f}s "
+          f"mean={statistics.mean(latencies):.2f}s avg_queue_wait={statistics.mean(row[3] for row in results):.2f}s")
+    print(f"circuit_breaker={ai_service.circuit_breaker.snapshot()['state']} scheduler={ai_service.get_service_status()['scheduler']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+프로세스 간 쿼터 조정 검증 스크립트
+
+여러 로컬 프로세스가 임시 SQLite DB의 quota_leases 테이블을 공유하며 임대를 요청합니다.
+- 60초 윈도우 내 승인된 요청 수가 RPM 한도를 넘지 않는지
+- 동시에 보유한 임대 수가 동시 실행 한도를 넘지 않는지
+- 임대를 반납하지 않고 종료한 워커의 슬롯이 만료 후 회수되는지
+를 확인합니다.
+
+실행: poetry run python -m benchmarks.quota_multiprocess [프로세스 수] [프로세스당 요청 수]
+"""
+import os
+import sys
+import time
+import tempfile
+import multiprocessing
+
+from core.config import settings
+
+RPM = 20
+TPM = 100000
+MAX_CONCURRENCY = 3
+LEASE_TTL = 2.0
+ACQUIRE_TIMEOUT = 3.0
+
+
+# 자식 프로세스 초기화: 임시 DB 사용
+def init_worker(db_path: str):
+    settings.DATABASE_PATH = db_path
+
+
+def make_coordinator():
+    from services.quota_coordinator import QuotaCoordinator
+    return QuotaCoordinator(True, RPM, TPM, MAX_CONCURRENCY, LEASE_TTL)
+
+
+# 일반 워커: 임대 획득 -> 짧은 작업 -> 반납
+def worker(args):
+    requests, holders, max_holders, lock = args
+    from services.quota_coordinator import QuotaTimeoutError
+    coordinator = make_coordinator()
+    granted, rejected = 0, 0
+
+    for _ in range(requests):
+        try:
+            with coordinator.lease(100, timeout=ACQUIRE_TIMEOUT):
+                with lock:
+                    holders.value += 1
+                    max_holders.value = max(max_holders.value, holders.value)
+                time.sleep(0.05)
+                with lock:
+                    holders.value -= 1
+                granted += 1
+        except QuotaTimeoutError:
+            rejected += 1
+
+    return granted, rejected
+
+
+# 비정상 종료 워커: 임대를 반납하지 않고 프로세스 종료
+def crashing_worker(db_path: str):
+    init_worker(db_path)
+    coordinator = make_coordinator()
+    for _ in range(MAX_CONCURRENCY):
+        coordinator.acquire(100)
+    os._exit(1)
+
+
+def main(processes: int = 4, requests: int = 10):
+    from database.crud import create_tables
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "quota.db")
+        init_worker(db_path)
+        create_tables()
+
+        # 1) 동시 실행/RPM 한도 확인
+        manager = multiprocessing.Manager()
+        holders, max_holders, lock = manager.Value("i", 0), manager.Value("i", 0), manager.Lock()
+        started_at = time.time()
+        with multiprocessing.Pool(processes, initializer=init_worker, initargs=(db_path,)) as pool:
+            results = pool.map(worker, [(requests, holders, max_holders, lock)] * processes)
+
+        granted = sum(r[0] for r in results)
+        rejected = sum(r[1] for r in results)
+        print(f"granted={granted} rejected={rejected} elapsed={time.time() - started_at:.1f}s")
+        print(f"max concurrent leases={max_holders.value} (limit {MAX_CONCURRENCY})")
+        assert granted <= RPM, "RPM limit exceeded"
+        assert max_holders.value <= MAX_CONCURRENCY, "concurrency limit exceeded"
+
+        # 2) 비정상 종료 워커의 슬롯 회수 확인 (RPM 윈도우 초기화를 위해 테이블 비움)
+        from database.connection import Database
+        db = Database()
+        db.connect()
+        db.execute("DELETE FROM quota_leases")
+        db.commit()
+        db.close()
+
+        crashed = multiprocessing.Process(target=crashing_worker, args=(db_path,))
+        crashed.start()
+        crashed.join()
+
+        coordinator = make_coordinator()
+        started_at = time.monotonic()
+        lease = coordinator.acquire(100, timeout=LEASE_TTL * 3)
+        coordinator.release(lease)
+        print(f"slot recovered after crashed worker in {time.monotonic() - started_at:.1f}s (lease ttl {LEASE_TTL}s)")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,83 @@
+"""
+카세트 재생 벤치마크 스크립트
+
+LLM_CASSETTE_RECORD=true로 녹화한 실제 Gemini 응답(JSONL)을 AIService에 재생합니다.
+프롬프트 렌더링, 응답 파싱(```json 펜스, 재생성 배열 응답 등), 캐시 계층의 처리 시간과
+파싱 결과 분포를 네트워크 없이 실제 한국어 출력 기준으로 측정합니다.
+카세트의 프롬프트와 일치하지 않는 요청은 녹화 순서대로 응답을 순환 재생합니다.
+
+실행: poetry run python -m benchmarks.replay_cassette [카세트 경로] [재생 속도 배율(기본 0: 지연 없음)] [반복 횟수]
+"""
+import os
+import sys
+import time
+import statistics
+from collections import Counter
+
+if len(sys.argv) > 1:
+    os.environ["LLM_CASSETTE_PATH"] = sys.argv[1]
+os.environ["LLM_PROVIDER"] = "replay"
+os.environ["LLM_CASSETTE_RECORD"] = "false"
+os.environ["REPLAY_SPEED"] = sys.argv[2] if len(sys.argv) > 2 else "0"
+# 재생 속도를 측정하기 위해 로컬 RPM/TPM 한도는 사실상 해제
+os.environ.setdefault("LLM_RPM", "1000000")
+os.environ.setdefault("LLM_TPM", "1000000000")
+os.environ.setdefault("SINGLEFLIGHT_ENABLED", "false")
+# 녹화된 오류 응답의 재시도 대기도 재생 속도 배율에 맞춤
+os.environ.setdefault("RETRY_DELAY", str(1.0 * float(os.environ["REPLAY_SPEED"])))
+os.environ.setdefault("RETRY_MAX_DELAY", str(8.0 * float(os.environ["REPLAY_SPEED"])))
+
+from core.config import settings
+
+if not os.path.exists(settings.LLM_CASSETTE_PATH):
+    print(f"카세트 파일이 없습니다: {settings.LLM_CASSETTE_PATH}")
+    print("LLM_CASSETTE_RECORD=true 상태로 서비스를 실행해 먼저 녹화하세요.")
+    sys.exit(1)
+
+from services.ai_service import ai_service, TONE_ORDER
+
+COMMUNITIES = ["mam2bebe", "ppomppu", "fmkorea"]
+
+
+# 생성 결과 분류
+def classify_result(result) -> str:
+    if not result["success"]:
+        return "failed"
+    contents = result.get("generated_contents", [])
+    if len(contents) == 1 and contents[0]["tone"] == "AI 생성":
+        return "fallback_text"
+    if len(contents) == len(TONE_ORDER):
+        return "all_tones"
+    return "partial_tones"
+
+
+def main():
+    rounds = int(sys.argv[3]) if len(sys.argv) > 3 else 3
+    entries = len(ai_service.provider.entries)
+
+    latencies = []
+    outcomes = Counter()
+    started = time.perf_counter()
+    for round_index in range(rounds):
+        for i in range(entries):
+            product_data = {"product_name": f"재생-{round_index}-{i}", "price": "29,900원"}
+            call_started = time.perf_counter()
+            result = ai_service.generate_product_content(
+                product_data=product_data,
+                community_key=COMMUNITIES[i % len(COMMUNITIES)],
+                user_id="replay"
+            )
+            latencies.append(time.perf_counter() - call_started)
+            outcomes[classify_result(result)] += 1
+    elapsed = time.perf_counter() - started
+
+    print(f"cassette={settings.LLM_CASSETTE_PATH} entries={entries} rounds={rounds} speed={settings.REPLAY_SPEED}")
+    print(f"requests={len(latencies)} elapsed={elapsed:.3f}s throughput={len(latencies) / elapsed:.1f} req/s")
+    print(f"latency mean={statistics.mean(latencies) * 1000:.2f}ms "
+          f"p95={sorted(latencies)[int(len(latencies) * 0.95)] * 1000:.2f}ms")
+    print(f"outcomes={dict(outcomes)}")
+    print(f"provider={ai_service.provider.snapshot()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Gemini API 로컬 스텁 서버
+
+Gemini REST API(v1beta)의 generateContent / countTokens 엔드포인트를 흉내 내는 로컬 HTTP 서버입니다.
+6개 톤 JSON을 설정한 지연 시간 후 반환하고, 열린 TCP 연결 수와 처리한 요청 수를 집계하므로
+연결 예열/유지(keepalive)와 연결 재사용 여부를 실제 네트워크 없이 확인할 수 있습니다.
+
+서비스를 스텁 서버로 연결:
+    GEMINI_API_KEY=stub GEMINI_API_ENDPOINT=http://localhost:8765 GEMINI_TRANSPORT=rest poetry run streamlit run main.py
+
+집계 확인: curl http://localhost:8765/stats
+
+실행: poetry run python -m benchmarks.stub_gemini_server [포트(기본 8765)] [응답 지연 초(기본 0.5)]
+"""
+import re
+import sys
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from services.ai_service import TONE_ORDER
+from services.token_accounting import token_estimator
+
+_lock = threading.Lock()
+_stats = {"connections": 0, "requests": 0, "generate": 0, "count_tokens": 0}
+
+
+class StubGeminiHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 keep-alive: 클라이언트가 연결을 재사용하면 connections는 늘지 않고 requests만 증가
+    protocol_version = "HTTP/1.1"
+    latency = 0.5
+
+    def setup(self):
+        super().setup()
+        with _lock:
+            _stats["connections"] += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=UTF-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    # 요청 본문의 프롬프트 텍스트
+    @staticmethod
+    def _prompt_text(request) -> str:
+        return "\n".join(part.get("text", "") for content in request.get("contents", [])
+                         for part in content.get("parts", []))
+
+    def do_GET(self):
+        if self.path.startswith("/stats"):
+            with _lock:
+                self._send_json(200, dict(_stats))
+            return
+        self._send_json(404, {"error": {"code": 404, "message": "Not found", "status": "NOT_FOUND"}})
+
+    def do_POST(self):
+        with _lock:
+            _stats["requests"] += 1
+        request = self._read_json()
+        prompt = self._prompt_text(request)
+        prompt_tokens = token_estimator.estimate(prompt)
+
+        if self.path.split("?")[0].endswith(":countTokens"):
+            with _lock:
+                _stats["count_tokens"] += 1
+            self._send_json(200, {"totalTokens": prompt_tokens})
+            return
+
+        if not self.path.split("?")[0].endswith(":generateContent"):
+            self._send_json(404, {"error": {"code": 404, "message": "Not found", "status": "NOT_FOUND"}})
+            return
+
+        with _lock:
+            _stats["generate"] += 1
+        time.sleep(self.latency)
+
+        match = re.search(r"상품명: (.*)", prompt)
+        product_name = match.group(1).strip() if match else "상품"
+        text = json.dumps({
+            key: {"content": f"{product_name} {name} 원고입니다\n가격 혜택 확인해보세요"}
+            for key, name in TONE_ORDER
+        }, ensure_ascii=False)
+        output_tokens = token_estimator.estimate(text)
+
+        self._send_json(200, {
+            "candidates": [{
+                "content": {"parts": [{"text": text}], "role": "model"},
+                "finishReason": "STOP",
+                "index": 0
+            }],
+            "usageMetadata": {
+                "promptTokenCount": prompt_tokens,
+                "candidatesTokenCount": output_tokens,
+                "totalTokenCount": prompt_tokens + output_tokens
+            }
+        })
+
+
+def main():
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+    StubGeminiHandler.latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.5
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubGeminiHandler)
+    server.daemon_threads = True
+    print(f"Gemini 스텁 서버 실행: http://localhost:{port} (응답 지연 {StubGeminiHandler.latency}s)")
+    print("종료: Ctrl+C")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"집계: {json.dumps(_stats, ensure_ascii=False)}")
+
+
+if __name__ == "__main__":
+    main()
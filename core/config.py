@@ -21,6 +21,12 @@ LOG_PATH = BASE_DIR / "logs"
 # 프롬프트 경로
 PROMPT_BASE_PATH = BASE_DIR / "prompts"
 
+# 프롬프트 스냅샷 캐시 경로 (파싱된 YAML을 marshal로 저장)
+PROMPT_CACHE_PATH = BASE_DIR / "data" / "cache" / "prompts.marshal"
+
+# LLM 요청/응답 카세트 경로 (녹화 및 재생용 JSONL)
+LLM_CASSETTE_PATH = BASE_DIR / "data" / "cassettes" / "llm.jsonl"
+
 
 class Settings:
     
@@ -34,18 +40,131 @@ class Settings:
     
     # 프롬프트 경로
     PROMPT_BASE_PATH = str(PROMPT_BASE_PATH)
+    PROMPT_CACHE_PATH = str(PROMPT_CACHE_PATH)
+    
+    # LLM 카세트 경로
+    LLM_CASSETTE_PATH = os.getenv("LLM_CASSETTE_PATH", str(LLM_CASSETTE_PATH))
+    
+    # 프롬프트 변경 감지 주기(초), 0이면 자동 재로드 비활성화
+    PROMPT_RELOAD_INTERVAL = float(os.getenv("PROMPT_RELOAD_INTERVAL", "2.0"))
     
     # Gemini API 설정
     GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
     GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.0-flash")
+    # 모델 단계(쉼표 구분, 빠른 모델부터): 예) "gemini-2.0-flash-lite,gemini-2.0-flash"
+    # 비어 있으면 GEMINI_MODEL 단일 단계
+    MODEL_CASCADE = [model.strip() for model in os.getenv("MODEL_CASCADE", "").split(",") if model.strip()]
+    # API 엔드포인트/전송 방식 (비어 있으면 SDK 기본값), 로컬 스텁 서버: "http://localhost:8765" + "rest"
+    GEMINI_API_ENDPOINT = os.getenv("GEMINI_API_ENDPOINT", "")
+    GEMINI_TRANSPORT = os.getenv("GEMINI_TRANSPORT", "")
     MAX_TOKENS = int(os.getenv("MAX_TOKENS", "2048"))
     TEMPERATURE = float(os.getenv("TEMPERATURE", "0.7"))
     TOP_P = float(os.getenv("TOP_P", "0.8"))
     TOP_K = int(os.getenv("TOP_K", "40"))
     
+    # 프롬프트 변수 토큰 예산 (베스트 사례는 초과 시 도입부/마무리를 남기고 축약)
+    BEST_CASE_TOKEN_BUDGET = int(os.getenv("BEST_CASE_TOKEN_BUDGET", "600"))
+    # 베스트 사례 원문 대신 스타일 다이제스트를 프롬프트에 사용
+    BEST_CASE_DIGEST_ENABLED = os.getenv("BEST_CASE_DIGEST_ENABLED", "true").lower() == "true"
+    
+    # LLM 공급자: gemini / fake (오프라인 부하 테스트용) / replay (녹화한 카세트 재생)
+    LLM_PROVIDER = os.getenv("LLM_PROVIDER", "gemini").lower()
+    # 가짜 공급자 설정: 지연 분포("fixed:1.0" / "uniform:0.5,2.0" / "lognormal:중앙값,시그마"), 오류율, 잘못된 출력 비율
+    FAKE_LATENCY = os.getenv("FAKE_LATENCY", "lognormal:1.5,0.4")
+    FAKE_ERROR_RATE = float(os.getenv("FAKE_ERROR_RATE", "0.0"))
+    FAKE_MALFORMED_RATE = float(os.getenv("FAKE_MALFORMED_RATE", "0.0"))
+    FAKE_SEED = int(os.getenv("FAKE_SEED")) if os.getenv("FAKE_SEED") else None
+    # 실제 요청/응답을 카세트에 녹화 (LLM_PROVIDER=replay로 재생)
+    LLM_CASSETTE_RECORD = os.getenv("LLM_CASSETTE_RECORD", "false").lower() == "true"
+    # 재생 속도 배율: 1.0이면 원래 지연 시간, 0.5면 절반, 0이면 지연 없음
+    REPLAY_SPEED = float(os.getenv("REPLAY_SPEED", "1.0"))
+    
+    # 응답 스키마 기반 JSON 구조화 출력 사용 (지원 모델에서만 적용)
+    STRUCTURED_OUTPUT_ENABLED = os.getenv("STRUCTURED_OUTPUT_ENABLED", "true").lower() == "true"
+    # 응답에서 누락되거나 잘린 톤만 1회 재요청
+    PARSE_REASK_ENABLED = os.getenv("PARSE_REASK_ENABLED", "true").lower() == "true"
+    # 프롬프트 rules 위반 중 로컬에서 수정할 수 없는 톤만 1회 재요청
+    RULES_REASK_ENABLED = os.getenv("RULES_REASK_ENABLED", "true").lower() == "true"
+    
     # 재시도 설정
     MAX_RETRIES = int(os.getenv("MAX_RETRIES", "3"))
     RETRY_DELAY = float(os.getenv("RETRY_DELAY", "1.0"))
+    RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", "8.0"))
+    # 요청 단위 데드라인(초): 재시도 대기를 포함한 전체 호출 시간 상한
+    REQUEST_DEADLINE = float(os.getenv("REQUEST_DEADLINE", "30.0"))
+    # 사용자 요청 단위 시간 예산(초, SLO): 화면에서 생성 버튼을 누른 시점부터 결과 표시까지의 상한
+    # 초과가 예상되면 재요청을 생략한 부분 결과나 이전 결과로 응답
+    GENERATION_SLO = float(os.getenv("GENERATION_SLO", "25.0"))
+    # 누락/규칙 위반 톤 재요청에 필요한 최소 남은 시간(초)
+    REASK_MIN_BUDGET = float(os.getenv("REASK_MIN_BUDGET", "5.0"))
+    # SQLite 잠금 대기 시간(초), 요청 컨텍스트가 있으면 남은 시간 이내로 제한
+    DB_BUSY_TIMEOUT = float(os.getenv("DB_BUSY_TIMEOUT", "5.0"))
+    
+    # LLM 호출 스케줄러 설정 (전역 동시 실행 수, 분당 요청/토큰 한도, 팀별 가중치)
+    LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+    LLM_RPM = int(os.getenv("LLM_RPM", "60"))
+    LLM_TPM = int(os.getenv("LLM_TPM", "1000000"))
+    TEAM_WEIGHTS = os.getenv("TEAM_WEIGHTS", "")
+    
+    # 프로세스 간 전역 쿼터 조정 (여러 서버 프로세스가 같은 호스트에서 실행될 때 사용)
+    QUOTA_COORDINATOR_ENABLED = os.getenv("QUOTA_COORDINATOR_ENABLED", "false").lower() == "true"
+    GLOBAL_RPM = int(os.getenv("GLOBAL_RPM", os.getenv("LLM_RPM", "60")))
+    GLOBAL_TPM = int(os.getenv("GLOBAL_TPM", os.getenv("LLM_TPM", "1000000")))
+    GLOBAL_MAX_CONCURRENCY = int(os.getenv("GLOBAL_MAX_CONCURRENCY", "8"))
+    # 임대 만료 시간(초): 비정상 종료된 워커의 슬롯 회수 기준
+    QUOTA_LEASE_TTL = float(os.getenv("QUOTA_LEASE_TTL", "120"))
+    
+    # 헤지 요청: 응답이 community_key별 지연 백분위(p90)를 넘기면 동일 요청을 한 번 더 보내 먼저 끝난 응답 사용
+    HEDGE_ENABLED = os.getenv("HEDGE_ENABLED", "false").lower() == "true"
+    HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "0.9"))
+    # 백분위 계산에 필요한 최소 표본 수, 최소 헤지 대기 시간(초), 일반 요청 대비 최대 헤지 비율
+    HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+    HEDGE_MIN_DELAY = float(os.getenv("HEDGE_MIN_DELAY", "2.0"))
+    HEDGE_MAX_RATIO = float(os.getenv("HEDGE_MAX_RATIO", "0.1"))
+    
+    # 시작 시 백그라운드에서 공급자 초기화 및 연결 예열
+    WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+    # 유휴 연결 유지 ping 주기(초), 0이면 비활성화
+    KEEPALIVE_INTERVAL = float(os.getenv("KEEPALIVE_INTERVAL", "45"))
+    # 전송 활동이 이 시간(초) 이상 없으면 연결이 끊긴 것으로 간주 (연결 재사용 통계 기준)
+    CONNECTION_IDLE_TIMEOUT = float(os.getenv("CONNECTION_IDLE_TIMEOUT", "60"))
+    # 실제 호출이 이 시간(초) 이상 없으면 ping 중단
+    KEEPALIVE_MAX_IDLE = float(os.getenv("KEEPALIVE_MAX_IDLE", "1800"))
+    
+    # 추측 생성: 생성 후 여유 용량이 있으면 같은 입력으로 다른 커뮤니티 문구를 미리 생성해 캐시에 보관
+    SPECULATIVE_ENABLED = os.getenv("SPECULATIVE_ENABLED", "false").lower() == "true"
+    # 추측 생성 후에도 비워 둘 동시 실행/요청 슬롯 수, 동시에 진행할 추측 생성 수
+    SPECULATIVE_HEADROOM = int(os.getenv("SPECULATIVE_HEADROOM", "1"))
+    SPECULATIVE_MAX_INFLIGHT = int(os.getenv("SPECULATIVE_MAX_INFLIGHT", "1"))
+    # 추측 생성 1건의 시간 예산(초), 결과 보관 시간(초)과 최대 보관 수
+    SPECULATIVE_TIMEOUT = float(os.getenv("SPECULATIVE_TIMEOUT", "60"))
+    SPECULATIVE_CACHE_TTL = float(os.getenv("SPECULATIVE_CACHE_TTL", "600"))
+    SPECULATIVE_CACHE_SIZE = int(os.getenv("SPECULATIVE_CACHE_SIZE", "200"))
+    
+    # 동일 프롬프트 동시 요청 병합 여부
+    SINGLEFLIGHT_ENABLED = os.getenv("SINGLEFLIGHT_ENABLED", "true").lower() == "true"
+    
+    # 생성 작업 워커 스레드 수 (0이면 이 프로세스에서는 작업을 실행하지 않고 등록만 함)
+    JOB_WORKERS = int(os.getenv("JOB_WORKERS", os.getenv("LLM_MAX_CONCURRENCY", "4")))
+    # 워커 유휴 시 대기열 확인 주기(초), 화면의 작업 상태 조회 주기(초)
+    JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "0.5"))
+    JOB_UI_POLL_INTERVAL = float(os.getenv("JOB_UI_POLL_INTERVAL", "1.0"))
+    # 실행 중 작업 임대 시간(초): 이 시간 안에 끝나지 않은 작업은 워커 비정상 종료로 보고 다시 실행
+    JOB_LEASE_TTL = float(os.getenv("JOB_LEASE_TTL", "180"))
+    JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "2"))
+    
+    # 배치 생성 워커 스레드 수, 한 트랜잭션으로 저장할 결과 수, 행 1건의 시간 예산(초)
+    BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", os.getenv("LLM_MAX_CONCURRENCY", "4")))
+    BATCH_COMMIT_SIZE = int(os.getenv("BATCH_COMMIT_SIZE", "20"))
+    BATCH_ROW_TIMEOUT = float(os.getenv("BATCH_ROW_TIMEOUT", "120"))
+    
+    # 멱등성 키 유지 시간(초)
+    IDEMPOTENCY_TTL = float(os.getenv("IDEMPOTENCY_TTL", "300"))
+    
+    # 서킷 브레이커 설정
+    CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+    CIRCUIT_RECOVERY_TIMEOUT = float(os.getenv("CIRCUIT_RECOVERY_TIMEOUT", "30.0"))
+    CIRCUIT_HALF_OPEN_MAX_CALLS = int(os.getenv("CIRCUIT_HALF_OPEN_MAX_CALLS", "1"))
 
 # 전역 설정 인스턴스
 settings = Settings()
@@ -10,8 +10,10 @@ if not os.path.exists(settings.DATABASE_DIR):
 
 # 데이터베이스 연결 관리 정의
 class Database:
-    def __init__(self):
+    # timeout: 잠금 대기 시간(초), 지정하지 않으면 DB_BUSY_TIMEOUT
+    def __init__(self, timeout: float = None):
         self.db_path = settings.DATABASE_PATH
+        self.timeout = timeout if timeout is not None else settings.DB_BUSY_TIMEOUT
         self.connection = None
     
     # 연결
@@ -19,7 +21,7 @@ class Database:
         # 디렉토리가 없으면 생성
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
         try:
-            self.connection = sqlite3.connect(self.db_path, check_same_thread=False)
+            self.connection = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False)
             self.connection.row_factory = sqlite3.Row
         except Exception as e:
             print(f"Database connection error: {e}")
@@ -1,12 +1,31 @@
+import os
+import time
 import uuid
 import json
+import hashlib
 from datetime import datetime, timezone, timedelta
 from typing import List, Dict, Any
+from core.config import settings
 from database.connection import Database
 
 # 한국 시간대 설정
 KST = timezone(timedelta(hours=9))
 
+# 요청 데드라인이 지난 뒤에도 결과 저장에 보장하는 최소 잠금 대기 시간(초)
+MIN_DB_TIMEOUT = 1.0
+
+
+# 요청 컨텍스트의 남은 시간으로 잠금 대기 시간을 제한한 연결 객체
+def _database(context=None) -> Database:
+    if context is None:
+        return Database()
+    return Database(timeout=context.remaining_for(settings.DB_BUSY_TIMEOUT, minimum=MIN_DB_TIMEOUT))
+
+# 입력 정보 해시 (키 순서/공백/인코딩과 무관하게 같은 입력이면 같은 값)
+def _product_hash(product_info: dict) -> str:
+    serialized = json.dumps(product_info, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
 def get_korean_time():
     """한국 시간을 반환합니다."""
     return datetime.now(KST)
@@ -82,10 +101,22 @@ def create_tables():
             generated_contents TEXT NOT NULL,
             reason TEXT,
             created_at DATETIME NOT NULL,
+            product_hash TEXT,
             FOREIGN KEY (input_id) REFERENCES user_inputs(id)
         )
     """)
 
+    # 기존 테이블에 product_hash 컬럼 추가 후 기존 행 채우기 (이미 존재하면 무시됨)
+    try:
+        db.execute("ALTER TABLE contents ADD COLUMN product_hash TEXT")
+        for row in db.fetchall("SELECT id, product_info FROM contents"):
+            db.execute("UPDATE contents SET product_hash = ? WHERE id = ?",
+                       (_product_hash(json.loads(row['product_info'])), row['id']))
+    except:
+        # 컬럼이 이미 존재하는 경우 무시
+        pass
+    db.execute("CREATE INDEX IF NOT EXISTS idx_contents_product_hash ON contents (product_hash)")
+
     # 채택 기록 테이블 (복사 버튼 클릭 추적)
     db.execute("""
         CREATE TABLE IF NOT EXISTS content_adoptions (
@@ -110,6 +141,116 @@ def create_tables():
         )
     """)
 
+    # 전역 쿼터 임대 테이블 (여러 프로세스가 Gemini RPM/TPM 한도를 공유)
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS quota_leases (
+            id TEXT PRIMARY KEY NOT NULL,
+            pid INTEGER NOT NULL,
+            tokens INTEGER NOT NULL,
+            acquired_at REAL NOT NULL,
+            expires_at REAL NOT NULL,
+            released_at REAL
+        )
+    """)
+    db.execute("CREATE INDEX IF NOT EXISTS idx_quota_leases_acquired_at ON quota_leases (acquired_at)")
+
+    # 멱등성 키 테이블 (Streamlit 재실행으로 인한 중복 생성/재생성 방지)
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS idempotency_keys (
+            key TEXT PRIMARY KEY NOT NULL,
+            user_id TEXT NOT NULL,
+            operation TEXT NOT NULL,
+            status TEXT NOT NULL,
+            result TEXT,
+            created_at REAL NOT NULL,
+            expires_at REAL NOT NULL
+        )
+    """)
+    db.execute("CREATE INDEX IF NOT EXISTS idx_idempotency_keys_expires_at ON idempotency_keys (expires_at)")
+
+    # 베스트 사례 스타일 다이제스트 (본문 해시 기준 캐시)
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS best_case_digests (
+            content_hash TEXT PRIMARY KEY NOT NULL,
+            post_id TEXT,
+            digest TEXT NOT NULL,
+            created_at DATETIME NOT NULL
+        )
+    """)
+
+    # 토큰 사용 원장 (호출 1건당 1행)
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS usage_ledger (
+            id TEXT PRIMARY KEY NOT NULL,
+            user_id TEXT,
+            team_name TEXT,
+            community_key TEXT NOT NULL,
+            generation_type TEXT NOT NULL,
+            model TEXT,
+            prompt_version TEXT,
+            prompt_tokens INTEGER NOT NULL DEFAULT 0,
+            output_tokens INTEGER NOT NULL DEFAULT 0,
+            cached_tokens INTEGER NOT NULL DEFAULT 0,
+            total_tokens INTEGER NOT NULL DEFAULT 0,
+            estimated INTEGER NOT NULL DEFAULT 0,
+            created_at DATETIME NOT NULL
+        )
+    """)
+
+    # 일별 토큰 사용 집계
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS usage_daily (
+            day TEXT NOT NULL,
+            user_id TEXT NOT NULL,
+            team_name TEXT NOT NULL,
+            community_key TEXT NOT NULL,
+            generation_type TEXT NOT NULL,
+            requests INTEGER NOT NULL DEFAULT 0,
+            prompt_tokens INTEGER NOT NULL DEFAULT 0,
+            output_tokens INTEGER NOT NULL DEFAULT 0,
+            cached_tokens INTEGER NOT NULL DEFAULT 0,
+            total_tokens INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, user_id, team_name, community_key, generation_type)
+        )
+    """)
+
+    # 생성 작업 대기열 (UI는 작업을 등록하고 상태만 조회, 워커 스레드가 실행)
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY NOT NULL,
+            user_id TEXT NOT NULL,
+            job_type TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            status TEXT NOT NULL,
+            progress TEXT,
+            result TEXT,
+            error TEXT,
+            worker TEXT,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            created_at REAL NOT NULL,
+            started_at REAL,
+            lease_expires_at REAL,
+            finished_at REAL
+        )
+    """)
+    db.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status_created_at ON jobs (status, created_at)")
+
+    # 배치 생성 체크포인트 (실행별 처리 완료 행, 콘텐츠 저장과 같은 트랜잭션으로 기록)
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS batch_items (
+            run_id TEXT NOT NULL,
+            row_key TEXT NOT NULL,
+            row_index INTEGER NOT NULL,
+            status TEXT NOT NULL,
+            content_id TEXT,
+            error TEXT,
+            latency REAL,
+            total_tokens INTEGER,
+            updated_at DATETIME NOT NULL,
+            PRIMARY KEY (run_id, row_key)
+        )
+    """)
+
     db.commit()
     db.close()
 
@@ -184,8 +325,9 @@ def create_user_feedback(user_id: str, feedback: str, rating: int = 5) -> str:
 def create_user_input(user_id: str, product_name: str, price: str = None, 
                      product_attribute: str = None, event: str = None, 
                      card: str = None, coupon: str = None, keyword: str = None, 
-                     etc: str = None, community: str = None, best_case: str = None) -> str:
-    db = Database()
+                     etc: str = None, community: str = None, best_case: str = None,
+                     context=None) -> str:
+    db = _database(context)
     db.connect()
     input_id = str(uuid.uuid4())
     now = get_korean_time_str()
@@ -263,21 +405,21 @@ def get_user_inputs(user_id: str, limit: int = 10):
 # 콘텐츠 생성 기록 저장
 def create_content(input_id: str, parent_generate_id: str, generation_type: str, 
                   product_info: dict, attributes: dict, generated_contents: list, 
-                  reason: str = None) -> str:
-    db = Database()
+                  reason: str = None, context=None) -> str:
+    db = _database(context)
     db.connect()
     content_id = str(uuid.uuid4())
     now = get_korean_time_str()
     
     db.execute("""
         INSERT INTO contents (id, input_id, parent_generate_id, generation_type, 
-                            product_info, attributes, generated_contents, reason, created_at)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                            product_info, attributes, generated_contents, reason, created_at, product_hash)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
     """, (content_id, input_id, parent_generate_id, generation_type,
           json.dumps(product_info, ensure_ascii=False),
           json.dumps(attributes, ensure_ascii=False),
           json.dumps(generated_contents, ensure_ascii=False),
-          reason, now))
+          reason, now, _product_hash(product_info)))
     
     db.commit()
     db.close()
@@ -287,8 +429,8 @@ def create_content(input_id: str, parent_generate_id: str, generation_type: str,
 
 
 # 콘텐츠 조회
-def get_content(content_id: str):
-    db = Database()
+def get_content(content_id: str, context=None):
+    db = _database(context)
     db.connect()
     row = db.fetchone("SELECT * FROM contents WHERE id = ?", (content_id,))
     db.close()
@@ -308,6 +450,27 @@ def get_content(content_id: str):
     # 콘텐츠 없으면 None 반환
     return None
 
+# 같은 입력(product_info)으로 생성한 사용자의 최근 콘텐츠 조회 (데드라인 초과 시 이전 결과로 응답)
+def get_recent_contents_by_product(user_id: str, product_info: dict, limit: int = 5, context=None):
+    db = _database(context)
+    db.connect()
+    rows = db.fetchall("""
+        SELECT c.id, c.input_id, c.generated_contents, c.created_at
+        FROM contents c
+        JOIN user_inputs ui ON c.input_id = ui.id
+        WHERE ui.user_id = ? AND c.generation_type = 'viral_copy' AND c.product_hash = ?
+        ORDER BY c.created_at DESC
+        LIMIT ?
+    """, (user_id, _product_hash(product_info), limit))
+    db.close()
+    
+    return [{
+        'id': row['id'],
+        'input_id': row['input_id'],
+        'generated_contents': json.loads(row['generated_contents']),
+        'created_at': row['created_at']
+    } for row in rows]
+
 # 사용자 콘텐츠 조회 (JOIN 사용)
 def get_user_contents(user_id: str, limit: int = 10):
     db = Database()
@@ -548,4 +711,513 @@ def get_user_feedbacks(user_id: str, limit: int = 10):
         print(f"Error retrieving user feedbacks: {e}")
         return []
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+# 쿼터 임대 시도 (BEGIN IMMEDIATE로 프로세스 간 직렬화)
+# 반환: (임대 ID 또는 None, 다음 시도까지 대기 시간(초))
+def try_acquire_quota_lease(tokens: int, rpm: int, tpm: int, max_concurrency: int,
+                            lease_ttl: float, window: float = 60.0):
+    db = Database()
+    db.connect()
+    now = time.time()
+
+    try:
+        db.execute("BEGIN IMMEDIATE")
+
+        # 윈도우를 벗어난 종료/만료 임대 정리
+        db.execute("""
+            DELETE FROM quota_leases
+            WHERE acquired_at < ? AND (released_at IS NOT NULL OR expires_at < ?)
+        """, (now - window, now))
+
+        # 현재 사용량 집계 (만료된 미반납 임대는 동시 실행 수에서 제외 - 비정상 종료 워커 복구)
+        row = db.fetchone("""
+            SELECT
+                COALESCE(SUM(CASE WHEN acquired_at > :since THEN 1 ELSE 0 END), 0) AS requests,
+                COALESCE(SUM(CASE WHEN acquired_at > :since THEN tokens ELSE 0 END), 0) AS tokens,
+                COALESCE(SUM(CASE WHEN released_at IS NULL AND expires_at > :now THEN 1 ELSE 0 END), 0) AS active,
+                MIN(CASE WHEN acquired_at > :since THEN acquired_at END) AS oldest
+            FROM quota_leases
+        """, {"since": now - window, "now": now})
+
+        if (row['active'] < max_concurrency and row['requests'] < rpm
+                and (row['tokens'] + tokens <= tpm or row['requests'] == 0)):
+            lease_id = str(uuid.uuid4())
+            db.execute("""
+                INSERT INTO quota_leases (id, pid, tokens, acquired_at, expires_at)
+                VALUES (?, ?, ?, ?, ?)
+            """, (lease_id, os.getpid(), tokens, now, now + lease_ttl))
+            db.commit()
+            return lease_id, 0.0
+
+        db.commit()
+
+        # 한도 초과: 가장 오래된 임대가 윈도우를 벗어날 때까지 대기 (동시 실행 초과 시 짧게 재시도)
+        if row['active'] >= max_concurrency or row['oldest'] is None:
+            return None, 0.2
+        return None, max(row['oldest'] + window - now, 0.05)
+    finally:
+        db.close()
+
+# 쿼터 임대 반납 (실제 사용 토큰으로 갱신)
+def release_quota_lease(lease_id: str, tokens: int = None):
+    db = Database()
+    db.connect()
+
+    if tokens is None:
+        db.execute("UPDATE quota_leases SET released_at = ? WHERE id = ?", (time.time(), lease_id))
+    else:
+        db.execute("UPDATE quota_leases SET released_at = ?, tokens = ? WHERE id = ?",
+                   (time.time(), tokens, lease_id))
+
+    db.commit()
+    db.close()
+
+# 최근 윈도우의 쿼터 사용량 조회
+def get_quota_usage(window: float = 60.0):
+    db = Database()
+    db.connect()
+    now = time.time()
+
+    try:
+        row = db.fetchone("""
+            SELECT
+                COUNT(*) AS requests,
+                COALESCE(SUM(tokens), 0) AS tokens,
+                COALESCE(SUM(CASE WHEN released_at IS NULL AND expires_at > ? THEN 1 ELSE 0 END), 0) AS active,
+                COUNT(DISTINCT pid) AS processes
+            FROM quota_leases
+            WHERE acquired_at > ?
+        """, (now, now - window))
+
+        return {
+            'requests': row['requests'],
+            'tokens': row['tokens'],
+            'active': row['active'],
+            'processes': row['processes']
+        }
+    except Exception as e:
+        print(f"Error retrieving quota usage: {e}")
+        return {}
+    finally:
+        db.close()
+
+
+# 멱등성 키 선점: 처음 보는 키면 pending으로 등록 후 None 반환, 이미 있으면 기존 기록 반환
+def claim_idempotency_key(key: str, user_id: str, operation: str, ttl: float):
+    db = Database()
+    db.connect()
+    now = time.time()
+
+    try:
+        db.execute("BEGIN IMMEDIATE")
+
+        # 만료된 키 정리
+        db.execute("DELETE FROM idempotency_keys WHERE expires_at < ?", (now,))
+
+        row = db.fetchone("SELECT status, result FROM idempotency_keys WHERE key = ?", (key,))
+        if row:
+            db.commit()
+            return {
+                'status': row['status'],
+                'result': json.loads(row['result']) if row['result'] else None
+            }
+
+        db.execute("""
+            INSERT INTO idempotency_keys (key, user_id, operation, status, created_at, expires_at)
+            VALUES (?, ?, ?, 'pending', ?, ?)
+        """, (key, user_id, operation, now, now + ttl))
+        db.commit()
+        return None
+    finally:
+        db.close()
+
+# 멱등성 키 결과 저장
+def complete_idempotency_key(key: str, result: dict):
+    db = Database()
+    db.connect()
+
+    db.execute("""
+        UPDATE idempotency_keys
+        SET status = 'completed', result = ?
+        WHERE key = ?
+    """, (json.dumps(result, ensure_ascii=False), key))
+
+    db.commit()
+    db.close()
+
+# 멱등성 키 삭제 (처리 중 예외 발생 시 재시도 허용)
+def release_idempotency_key(key: str):
+    db = Database()
+    db.connect()
+    db.execute("DELETE FROM idempotency_keys WHERE key = ? AND status = 'pending'", (key,))
+    db.commit()
+    db.close()
+
+# 멱등성 키 조회
+def get_idempotency_key(key: str):
+    db = Database()
+    db.connect()
+    row = db.fetchone("SELECT status, result FROM idempotency_keys WHERE key = ? AND expires_at >= ?",
+                      (key, time.time()))
+    db.close()
+
+    if row:
+        return {
+            'status': row['status'],
+            'result': json.loads(row['result']) if row['result'] else None
+        }
+    return None
+
+
+# 토큰 사용량 기록 (원장 추가 + 일별 집계 갱신을 한 트랜잭션으로 처리)
+def record_usage(user_id: str, team_name: str, community_key: str, generation_type: str,
+                 model: str, usage: dict, prompt_version: str = None) -> str:
+    db = Database()
+    db.connect()
+    usage_id = str(uuid.uuid4())
+    now = get_korean_time()
+
+    prompt_tokens = usage.get("prompt_tokens", 0)
+    output_tokens = usage.get("output_tokens", 0)
+    cached_tokens = usage.get("cached_tokens", 0)
+    total_tokens = usage.get("total_tokens", prompt_tokens + output_tokens)
+
+    db.execute("""
+        INSERT INTO usage_ledger (id, user_id, team_name, community_key, generation_type, model,
+                                  prompt_version, prompt_tokens, output_tokens, cached_tokens,
+                                  total_tokens, estimated, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, (usage_id, user_id, team_name, community_key, generation_type, model, prompt_version,
+          prompt_tokens, output_tokens, cached_tokens, total_tokens,
+          int(usage.get("estimated", False)), now.strftime("%Y-%m-%d %H:%M:%S")))
+
+    db.execute("""
+        INSERT INTO usage_daily (day, user_id, team_name, community_key, generation_type,
+                                 requests, prompt_tokens, output_tokens, cached_tokens, total_tokens)
+        VALUES (?, ?, ?, ?, ?, 1, ?, ?, ?, ?)
+        ON CONFLICT (day, user_id, team_name, community_key, generation_type) DO UPDATE SET
+            requests = requests + 1,
+            prompt_tokens = prompt_tokens + excluded.prompt_tokens,
+            output_tokens = output_tokens + excluded.output_tokens,
+            cached_tokens = cached_tokens + excluded.cached_tokens,
+            total_tokens = total_tokens + excluded.total_tokens
+    """, (now.strftime("%Y-%m-%d"), user_id or "", team_name or "", community_key, generation_type,
+          prompt_tokens, output_tokens, cached_tokens, total_tokens))
+
+    db.commit()
+    db.close()
+    return usage_id
+
+# 일별 토큰 사용량 조회 (팀 또는 사용자 기준 필터)
+def get_usage_daily(start_day: str, end_day: str, team_name: str = None, user_id: str = None):
+    db = Database()
+    db.connect()
+
+    try:
+        query = """
+            SELECT day, team_name, community_key, generation_type,
+                   SUM(requests) AS requests, SUM(prompt_tokens) AS prompt_tokens,
+                   SUM(output_tokens) AS output_tokens, SUM(cached_tokens) AS cached_tokens,
+                   SUM(total_tokens) AS total_tokens
+            FROM usage_daily
+            WHERE day BETWEEN ? AND ?
+        """
+        params = [start_day, end_day]
+        if team_name:
+            query += " AND team_name = ?"
+            params.append(team_name)
+        if user_id:
+            query += " AND user_id = ?"
+            params.append(user_id)
+        query += " GROUP BY day, team_name, community_key, generation_type ORDER BY day"
+
+        return [dict(row) for row in db.fetchall(query, params)]
+    except Exception as e:
+        print(f"Error retrieving daily usage: {e}")
+        return []
+    finally:
+        db.close()
+
+# 프롬프트별 토큰 사용량 순위 (비용이 큰 프롬프트 탐색용)
+def get_top_prompt_usage(since: str, limit: int = 10):
+    db = Database()
+    db.connect()
+
+    try:
+        rows = db.fetchall("""
+            SELECT community_key, prompt_version, generation_type,
+                   COUNT(*) AS requests,
+                   SUM(total_tokens) AS total_tokens,
+                   AVG(prompt_tokens) AS avg_prompt_tokens,
+                   AVG(output_tokens) AS avg_output_tokens
+            FROM usage_ledger
+            WHERE created_at >= ?
+            GROUP BY community_key, prompt_version, generation_type
+            ORDER BY total_tokens DESC
+            LIMIT ?
+        """, (since, limit))
+        return [dict(row) for row in rows]
+    except Exception as e:
+        print(f"Error retrieving prompt usage: {e}")
+        return []
+    finally:
+        db.close()
+
+# 베스트 사례 다이제스트 조회
+def get_best_case_digest(content_hash: str):
+    db = Database()
+    db.connect()
+    row = db.fetchone("SELECT digest FROM best_case_digests WHERE content_hash = ?", (content_hash,))
+    db.close()
+    return json.loads(row['digest']) if row else None
+
+# 베스트 사례 다이제스트 저장 (동시에 같은 사례를 처리한 경우 먼저 저장된 값 유지)
+def save_best_case_digest(content_hash: str, digest: dict, post_id: str = None):
+    db = Database()
+    db.connect()
+    db.execute("""
+        INSERT OR IGNORE INTO best_case_digests (content_hash, post_id, digest, created_at)
+        VALUES (?, ?, ?, ?)
+    """, (content_hash, post_id, json.dumps(digest, ensure_ascii=False), get_korean_time_str()))
+    db.commit()
+    db.close()
+
+
+# 작업 등록
+def create_job(user_id: str, job_type: str, payload: dict) -> str:
+    db = Database()
+    db.connect()
+    job_id = str(uuid.uuid4())
+
+    db.execute("""
+        INSERT INTO jobs (id, user_id, job_type, payload, status, created_at)
+        VALUES (?, ?, ?, ?, 'queued', ?)
+    """, (job_id, user_id, job_type, json.dumps(payload, ensure_ascii=False), time.time()))
+
+    db.commit()
+    db.close()
+    return job_id
+
+# 다음 작업 선점 (BEGIN IMMEDIATE로 프로세스 간 직렬화)
+# 대기 중인 작업 또는 임대가 만료된 실행 중 작업(비정상 종료된 워커의 작업)을 오래된 순으로 가져옴
+# max_attempts를 넘긴 만료 작업은 실패 처리
+def claim_next_job(worker: str, lease_ttl: float, max_attempts: int):
+    db = Database()
+    db.connect()
+    now = time.time()
+
+    try:
+        db.execute("BEGIN IMMEDIATE")
+
+        db.execute("""
+            UPDATE jobs SET status = 'failed', error = 'worker lost', finished_at = ?
+            WHERE status = 'running' AND lease_expires_at < ? AND attempts >= ?
+        """, (now, now, max_attempts))
+
+        row = db.fetchone("""
+            SELECT * FROM jobs
+            WHERE status = 'queued' OR (status = 'running' AND lease_expires_at < ?)
+            ORDER BY created_at
+            LIMIT 1
+        """, (now,))
+        if not row:
+            db.commit()
+            return None
+
+        db.execute("""
+            UPDATE jobs
+            SET status = 'running', worker = ?, attempts = attempts + 1,
+                started_at = ?, lease_expires_at = ?
+            WHERE id = ?
+        """, (worker, now, now + lease_ttl, row['id']))
+        db.commit()
+
+        return {
+            'id': row['id'],
+            'user_id': row['user_id'],
+            'job_type': row['job_type'],
+            'payload': json.loads(row['payload']),
+            'attempts': row['attempts'] + 1,
+            'created_at': row['created_at']
+        }
+    finally:
+        db.close()
+
+# 실행 중인 작업 임대 연장 (leases: 작업 ID -> 워커), 다른 워커가 이어받은 작업은 변경하지 않음
+def renew_job_leases(leases: dict, lease_ttl: float):
+    if not leases:
+        return
+    db = Database()
+    db.connect()
+    expires_at = time.time() + lease_ttl
+
+    for job_id, worker in leases.items():
+        db.execute("""
+            UPDATE jobs SET lease_expires_at = ?
+            WHERE id = ? AND worker = ? AND status = 'running'
+        """, (expires_at, job_id, worker))
+
+    db.commit()
+    db.close()
+
+# 작업 진행 상태 갱신 (대기열 순번 등)
+def update_job_progress(job_id: str, progress: dict):
+    db = Database()
+    db.connect()
+
+    db.execute("UPDATE jobs SET progress = ? WHERE id = ? AND status = 'running'",
+               (json.dumps(progress, ensure_ascii=False), job_id))
+
+    db.commit()
+    db.close()
+
+# 작업 종료 기록 (status: completed / failed / cancelled), 이미 취소된 작업은 변경하지 않음
+def finish_job(job_id: str, status: str, result: dict = None, error: str = None):
+    db = Database()
+    db.connect()
+
+    db.execute("""
+        UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?, lease_expires_at = NULL
+        WHERE id = ? AND status != 'cancelled'
+    """, (status, json.dumps(result, ensure_ascii=False) if result is not None else None,
+          error, time.time(), job_id))
+
+    db.commit()
+    db.close()
+
+# 작업 취소 (대기 중이거나 실행 중인 작업만), 취소했으면 True
+def cancel_job(job_id: str, reason: str) -> bool:
+    db = Database()
+    db.connect()
+
+    cursor = db.execute("""
+        UPDATE jobs SET status = 'cancelled', error = ?, finished_at = ?, lease_expires_at = NULL
+        WHERE id = ? AND status IN ('queued', 'running')
+    """, (reason, time.time(), job_id))
+    cancelled = cursor.rowcount > 0
+
+    db.commit()
+    db.close()
+    return cancelled
+
+# 실행 중인 작업 중 취소된 작업 ID 조회 (다른 프로세스에서 취소한 작업 감지용)
+def get_cancelled_job_ids(job_ids: list):
+    if not job_ids:
+        return []
+    db = Database()
+    db.connect()
+    rows = db.fetchall(f"""
+        SELECT id FROM jobs WHERE status = 'cancelled' AND id IN ({','.join('?' * len(job_ids))})
+    """, tuple(job_ids))
+    db.close()
+
+    return [row['id'] for row in rows]
+
+# 작업 상태 조회 (UI 폴링용 단건 조회)
+def get_job(job_id: str):
+    db = Database()
+    db.connect()
+    row = db.fetchone("""
+        SELECT id, user_id, job_type, status, progress, result, error, attempts,
+               created_at, started_at, finished_at
+        FROM jobs WHERE id = ?
+    """, (job_id,))
+    # 대기 중이면 앞선 대기 작업 수
+    ahead = None
+    if row and row['status'] == 'queued':
+        ahead = db.fetchone("SELECT COUNT(*) AS count FROM jobs WHERE status = 'queued' AND created_at < ?",
+                            (row['created_at'],))['count']
+    db.close()
+
+    if row:
+        return {
+            'id': row['id'],
+            'user_id': row['user_id'],
+            'job_type': row['job_type'],
+            'status': row['status'],
+            'progress': json.loads(row['progress']) if row['progress'] else None,
+            'result': json.loads(row['result']) if row['result'] else None,
+            'error': row['error'],
+            'attempts': row['attempts'],
+            'jobs_ahead': ahead,
+            'created_at': row['created_at'],
+            'started_at': row['started_at'],
+            'finished_at': row['finished_at']
+        }
+    return None
+
+# 작업 상태별 건수 (대기열 상태 확인용)
+def get_job_counts():
+    db = Database()
+    db.connect()
+    rows = db.fetchall("SELECT status, COUNT(*) AS count FROM jobs GROUP BY status")
+    db.close()
+
+    return {row['status']: row['count'] for row in rows}
+
+# 배치 생성 결과 일괄 저장: 입력/콘텐츠/체크포인트를 한 트랜잭션으로 기록 (중단 후 재실행 시 중복 저장 방지)
+# items: {row_key, row_index, product_data, status, generated_contents, attributes, error, latency, total_tokens}
+def save_batch_results(run_id: str, user_id: str, items: list):
+    db = Database()
+    db.connect()
+    now = get_korean_time_str()
+    content_ids = {}
+
+    try:
+        for item in items:
+            content_id = None
+            if item['status'] == 'completed':
+                product_data = item['product_data']
+                input_id = str(uuid.uuid4())
+                content_id = str(uuid.uuid4())
+                db.execute("""
+                    INSERT INTO user_inputs (id, user_id, product_name, price, product_attribute,
+                                           event, card, coupon, keyword, etc, community, best_case, created_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, (input_id, user_id, product_data.get('product_name', ''), product_data.get('price'),
+                      product_data.get('product_attribute'), product_data.get('event'), product_data.get('card'),
+                      product_data.get('coupon'), product_data.get('keyword'), product_data.get('etc'),
+                      product_data.get('community', ''), product_data.get('best_case'), now))
+                db.execute("""
+                    INSERT INTO contents (id, input_id, parent_generate_id, generation_type,
+                                        product_info, attributes, generated_contents, reason, created_at, product_hash)
+                    VALUES (?, ?, NULL, 'viral_copy', ?, ?, ?, NULL, ?, ?)
+                """, (content_id, input_id,
+                      json.dumps(product_data, ensure_ascii=False),
+                      json.dumps(item['attributes'], ensure_ascii=False),
+                      json.dumps(item['generated_contents'], ensure_ascii=False), now,
+                      _product_hash(product_data)))
+                content_ids[item['row_key']] = content_id
+
+            db.execute("""
+                INSERT OR REPLACE INTO batch_items (run_id, row_key, row_index, status, content_id, error,
+                                                    latency, total_tokens, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (run_id, item['row_key'], item['row_index'], item['status'], content_id,
+                  item.get('error'), item.get('latency'), item.get('total_tokens'), now))
+        db.commit()
+    finally:
+        # 커밋 전에 실패하면 연결 종료 시 전체 롤백
+        db.close()
+
+    return content_ids
+
+# 배치 실행에서 이미 완료된 행 키 조회 (재실행 시 건너뛸 행)
+def get_batch_completed_keys(run_id: str):
+    db = Database()
+    db.connect()
+    rows = db.fetchall("SELECT row_key FROM batch_items WHERE run_id = ? AND status = 'completed'", (run_id,))
+    db.close()
+
+    return {row['row_key'] for row in rows}
+
+# 배치 실행 상태별 건수
+def get_batch_counts(run_id: str):
+    db = Database()
+    db.connect()
+    rows = db.fetchall("SELECT status, COUNT(*) AS count FROM batch_items WHERE run_id = ? GROUP BY status", (run_id,))
+    db.close()
+
+    return {row['status']: row['count'] for row in rows}
@@ -0,0 +1,106 @@
+import time
+
+import streamlit as st
+
+from core.config import settings
+from services import get_job_status, cancel_generation_job
+from utils.get_logger import get_logger
+
+# 로거 초기화
+logger = get_logger()
+
+# 작업 종류별 실패 안내 문구
+FAILURE_MESSAGES = {
+    "generate": "원고 생성에 실패했습니다",
+    "regenerate": "재생성에 실패했습니다"
+}
+
+
+# 결과 안내 문구: 시간 예산 초과, 재생성되지 않은 톤 (정상 응답이면 None)
+def result_notice(result: dict):
+    if result.get("missing_tones"):
+        return f"⚠️ {', '.join(result['missing_tones'])} 톤은 재생성되지 않아 이전 문구를 유지했습니다. 해당 톤만 다시 재생성해주세요."
+    if result.get("cached"):
+        return "⏱️ 응답이 늦어져 이전에 생성된 문구를 표시합니다. 잠시 후 다시 시도해주세요."
+    if result.get("partial"):
+        return "⏱️ 응답이 늦어져 일부 톤은 보완하지 못했습니다. 필요한 톤만 다시 생성해주세요."
+    return None
+
+
+# 진행 중인 생성 작업 취소 (화면 이동, 로그아웃, 새 생성 요청 시 결과를 기다리지 않는 작업)
+def cancel_pending_job(reason: str):
+    pending = st.session_state.get('pending_job')
+    if not pending:
+        return
+    st.session_state.pending_job = None
+    try:
+        cancel_generation_job(pending["id"], reason)
+    except Exception as e:
+        logger.error(f"[cancel_pending_job] Failed to cancel job: job_id={pending['id']}, error={str(e)}")
+        return
+    logger.info(f"CANCEL_ACTION - user_id: {st.session_state.get('user_id')}, job_id: {pending['id']}, generation_type: {pending['type']}, reason: {reason}")
+
+
+# 완료된 작업 결과를 세션에 반영
+def _apply_job_result(pending: dict, result: dict):
+    st.session_state.generated_contents = result["generated_contents"]
+    st.session_state.current_generate_id = result.get("generate_id", "temp_id")
+    st.session_state.result_notice = result_notice(result)
+    st.session_state.show_results = True
+
+    if pending["type"] == "generate":
+        # community 정보와 입력 정보를 세션에 저장 (입력 화면으로 돌아갈 때 사용)
+        st.session_state.selected_community = pending["community"]
+        st.session_state.last_input_data = pending["last_input_data"]
+
+        # 생성 행동 로그 기록
+        logger.info(f"GENERATE_ACTION - user_id: {st.session_state.user_id}, community: {pending['community']}, product_name: {pending['last_input_data'].get('product_name')}, generation_type: viral_copy")
+    else:
+        st.session_state.show_regenerate_modal = False
+
+
+# 진행 중인 작업 상태 조회 (이 영역만 주기적으로 재실행)
+@st.fragment(run_every=settings.JOB_UI_POLL_INTERVAL)
+def _poll_pending_job():
+    pending = st.session_state.get('pending_job')
+    if not pending:
+        return
+
+    job = get_job_status(pending["id"])
+    if job is None or job["status"] == "failed":
+        error = job["error"] if job else "작업을 찾을 수 없습니다"
+        st.session_state.pending_job = None
+        st.session_state.job_error = f"{FAILURE_MESSAGES.get(pending['type'], '요청에 실패했습니다')}: {error}"
+        st.rerun(scope="app")
+
+    if job["status"] == "cancelled":
+        st.session_state.pending_job = None
+        st.rerun(scope="app")
+
+    if job["status"] == "completed":
+        st.session_state.pending_job = None
+        _apply_job_result(pending, job["result"])
+        st.rerun(scope="app")
+
+    elapsed = time.time() - job["created_at"]
+    progress = job.get("progress") or {}
+    if job["status"] == "queued":
+        st.info(f"⏳ 생성 대기 중입니다 · 앞선 요청 {job['jobs_ahead'] or 0}건 · {elapsed:.0f}초 경과")
+    else:
+        # LLM 호출 대기열에서 기다린 적이 있으면 마지막 대기 순번 표시
+        queue_info = f" · 대기 순번 {progress['queue_position']}번" if progress.get("queue_position") else ""
+        st.info(f"✨ {pending.get('label', '원고를 생성하고 있습니다')}... {elapsed:.0f}초 경과{queue_info}")
+
+    if st.button("요청 취소", key=f"cancel_job_{pending['id']}"):
+        cancel_pending_job("user_cancelled")
+        st.rerun(scope="app")
+
+
+# 진행 중인 생성 작업 표시 (작업 완료 시 결과 화면으로 전환)
+def show_pending_job():
+    if st.session_state.get('job_error'):
+        st.error(st.session_state.job_error)
+        st.session_state.job_error = None
+
+    if st.session_state.get('pending_job'):
+        _poll_pending_job()
@@ -3,6 +3,7 @@ from datetime import datetime
 from services.user_service import get_user_history
 from services import user_feedback
 from utils.get_logger import get_logger
+from frontend.components.job_status import cancel_pending_job
 
 # 로거 초기화
 logger = get_logger()
@@ -20,6 +21,8 @@ def show_sidebar(user_id: str, team_name: str, user_name: str):
         
         # 로그아웃 버튼
         if st.button("🚪 로그아웃", type="secondary", use_container_width=True):
+            # 진행 중인 생성 작업 취소
+            cancel_pending_job("logout")
             # 세션 상태 초기화
             for key in list(st.session_state.keys()):
                 del st.session_state[key]
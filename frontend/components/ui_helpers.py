@@ -5,6 +5,7 @@ import platform
 from services import copy_action, get_user_content_history
 from database.crud import record_content_adoption, update_content_text, get_content_adopted_tones
 from utils.get_logger import get_logger
+from .job_status import cancel_pending_job
 
 # 로거 초기화
 logger = get_logger()
@@ -300,6 +301,8 @@ def show_user_info(team_name: str, user_name: str, user_id: str):
         """, unsafe_allow_html=True)
     with col2:
         if st.button("🚪 로그아웃", type="secondary", use_container_width=True):
+            # 진행 중인 생성 작업 취소
+            cancel_pending_job("logout")
             # 세션 상태 초기화
             for key in list(st.session_state.keys()):
                 del st.session_state[key]
@@ -320,6 +323,7 @@ def show_content_history(user_id: str):
                         st.write(f"**커뮤니티:** {generation.attributes.get('community', '')}")
                         if st.button(f"📋 불러오기", key=f"load_{i}"):
                             st.session_state.generated_contents = generation.generated_contents
+                            st.session_state.result_notice = None
                             st.session_state.show_results = True
                             st.rerun()
             else:
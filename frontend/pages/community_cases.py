@@ -1,14 +1,16 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
 from datetime import datetime, timedelta
 from utils.get_logger import get_logger
+from frontend.components.job_status import cancel_pending_job
 
 # 로거 초기화
 logger = get_logger()
 
 def load_community_data():
     """커뮤니티 데이터를 로드하고 분석합니다."""
+    # pandas는 사례 페이지에서만 사용하므로 첫 사용 시점에 import (로그인 화면 시작 시간 단축)
+    import pandas as pd
+    
     try:
         # CSV 파일 로드
         df = pd.read_csv('community_data.csv')
@@ -62,6 +64,8 @@ def get_week_number(date):
 
 def get_top_cases_by_community(df, community, sort_by='composite_score', top_n=100, week_filter=None, category_filter=None, own_company_filter=None):
     """커뮤니티별 상위 사례를 반환합니다."""
+    import pandas as pd
+    
     community_data = df[df['channel'] == community].copy()
     
     if community_data.empty:
@@ -99,6 +103,8 @@ def get_top_cases_by_community(df, community, sort_by='composite_score', top_n=1
 
 def show_community_tab(df, channel, display_name):
     """커뮤니티별 탭 내용을 표시합니다."""
+    import pandas as pd
+    
     # 커뮤니티별 좋아요/추천수 표시 설정
     like_label = "👍 좋아요" if channel == "mam2bebe" else "👍 추천수"
     
@@ -251,6 +257,7 @@ def show_community_tab(df, channel, display_name):
                         
                         # 베스트 사례를 세션에 저장하고 메인 페이지로 이동
                         st.session_state.best_case = case['content']
+                        st.session_state.best_case_id = str(case.get('id', idx))
                         st.session_state.current_page = "main"
                         st.session_state.show_results = False
                         st.session_state[f'show_confirm_{channel}_{idx}'] = False
@@ -348,6 +355,7 @@ def show_community_cases_page(user_id: str):
     
     with col1:
         if st.button("← 메인화면", key="community_back_to_main"):
+            cancel_pending_job("back_to_main")
             st.session_state.current_page = "main"
             st.session_state.show_results = False
             st.rerun()
@@ -1,8 +1,10 @@
 import streamlit as st
 
-from services import regenerate_copy, user_feedback
+from services import submit_regeneration_job, user_feedback, make_idempotency_key
 from utils.get_logger import get_logger
+from utils.request_context import RequestContext
 from ..components.ui_helpers import create_content_cards
+from ..components.job_status import cancel_pending_job
 
 # 로거 초기화
 logger = get_logger()
@@ -19,6 +21,10 @@ def show_results_screen():
     # 사용 안내 문구
     st.info("💡 **사용 방법**: 아래에 표시된 텍스트를 드래그하여 복사하세요!")
     
+    # 시간 예산 초과로 부분/이전 결과를 표시하는 경우 안내
+    if st.session_state.get('result_notice'):
+        st.warning(st.session_state.result_notice)
+    
     # 결과 그리드
     create_content_cards(st.session_state.generated_contents, st.session_state)
     
@@ -57,6 +63,16 @@ def show_results_screen():
             help="재생성 이유를 구체적으로 입력해주세요"
         )
         
+        # 재생성할 톤 선택 (선택한 톤만 새로 생성하고 나머지는 유지)
+        tone_options = {c['id']: c['tone'] for c in st.session_state.generated_contents}
+        selected_tone_ids = st.multiselect(
+            "재생성할 톤",
+            options=list(tone_options.keys()),
+            default=list(tone_options.keys()),
+            format_func=lambda x: tone_options[x],
+            help="선택한 톤만 새로 생성하고, 선택하지 않은 톤은 현재 문구를 그대로 유지합니다"
+        )
+        
         col1, col2, col3 = st.columns([1, 1, 1])
         with col1:
             if st.button("취소", use_container_width=True):
@@ -65,33 +81,37 @@ def show_results_screen():
         
         with col2:
             if st.button("재생성", type="primary", use_container_width=True):
-                if regenerate_reason.strip():
+                if not selected_tone_ids:
+                    st.warning("재생성할 톤을 하나 이상 선택해주세요")
+                elif regenerate_reason.strip():
                     try:
                         # 재생성 행동 로그 기록
                         logger.info(f"REGENERATE_ACTION - user_id: {st.session_state.user_id}, content_id: {st.session_state.current_generate_id}, community: {st.session_state.get('selected_community', 'unknown')}, product_name: {st.session_state.get('last_input_data', {}).get('product_name', 'unknown')}")
                         
-                        # 로딩 위젯 표시
-                        with st.spinner("🔄 문구를 재생성하고 있습니다..."):
-                            # 백엔드 재생성 서비스 호출
-                            result = regenerate_copy(
-                                user_id=st.session_state.user_id,
-                                generate_id=st.session_state.current_generate_id,
-                                reason_text=regenerate_reason
-                            )
-                        
-                        if result and result.get("generate_id"):
-                            # 세션 상태 강제 업데이트
-                            st.session_state.generated_contents = result["generated_contents"]
-                            st.session_state.current_generate_id = result.get("generate_id", "temp_id")
-                            st.session_state.show_regenerate_modal = False
-                            
-                            # 성공 메시지 표시
-                            st.success("재생성 완료! 새로운 문구를 확인해보세요.")
-                            
-                            # 페이지 강제 새로고침
-                            st.rerun()
-                        else:
-                            st.error(f"재생성에 실패했습니다: {result.get('error', '알 수 없는 오류')}")
+                        # 진행 중인 이전 작업은 취소 후 재생성 작업 등록 (결과는 작업 상태 조회 영역에서 세션에 반영)
+                        cancel_pending_job("new_generation")
+                        job_id = submit_regeneration_job(
+                            user_id=st.session_state.user_id,
+                            generate_id=st.session_state.current_generate_id,
+                            reason_text=regenerate_reason,
+                            tone_ids=set(selected_tone_ids),
+                            idempotency_key=make_idempotency_key(
+                                st.session_state.get('session_key', ''),
+                                "regenerate",
+                                {
+                                    "generate_id": st.session_state.current_generate_id,
+                                    "reason": regenerate_reason,
+                                    "tone_ids": sorted(selected_tone_ids)
+                                }
+                            ),
+                            context=RequestContext("regenerate")
+                        )
+                        st.session_state.pending_job = {
+                            "id": job_id,
+                            "type": "regenerate",
+                            "label": "🔄 문구를 재생성하고 있습니다"
+                        }
+                        st.rerun()
                     except Exception as e:
                         st.error(f"재생성 중 오류가 발생했습니다: {str(e)}")
                 else:
@@ -3,6 +3,7 @@ from datetime import datetime, timezone, timedelta
 from services.user_service import get_user_history
 from database.crud import get_user_contents, get_user_adoption_count, get_user_preferred_tone, get_content_adopted_tones
 from utils.get_logger import get_logger
+from frontend.components.job_status import cancel_pending_job
 
 # 로거 초기화
 logger = get_logger()
@@ -31,6 +32,7 @@ def show_history_page(user_id: str):
     col1, col2, col3 = st.columns([1, 2, 1])
     with col1:
         if st.button("← 메인화면", key="history_back_button"):
+            cancel_pending_job("back_to_main")
             st.session_state.current_page = "main"
             st.session_state.show_results = False  # 상품 정보 입력 화면으로 이동
             st.rerun()
@@ -296,6 +298,7 @@ def show_history_page(user_id: str):
                             
                             # 해당 생성 결과를 메인 화면에 표시
                             st.session_state.generated_contents = gen.get('generated_contents', [])
+                            st.session_state.result_notice = None
                             st.session_state.current_generate_id = content_id  # generate_id 설정
                             st.session_state.selected_community = community  # 커뮤니티 정보 저장
                             st.session_state.show_results = True
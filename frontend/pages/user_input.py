@@ -1,9 +1,11 @@
 import streamlit as st
 
-from services import generate_viral_copy, user_feedback
+from services import submit_generation_job, user_feedback, make_idempotency_key
 from utils.validators import validate_input_form
 from utils.get_logger import get_logger
+from utils.request_context import RequestContext
 from ..components.ui_helpers import show_error_message
+from ..components.job_status import cancel_pending_job
 
 # 로거 초기화
 logger = get_logger()
@@ -159,6 +161,7 @@ def show_input_form():
         # 적용 후 세션에서 베스트 사례 제거 (중복 적용 방지)
         if st.button("🔄 베스트 사례 초기화", key="clear_best_case"):
             st.session_state.best_case = None
+            st.session_state.best_case_id = None
             st.rerun()
     
     st.divider()
@@ -174,70 +177,68 @@ def show_input_form():
         ):
             is_valid, error_msg = validate_input_form(product_name, community)
             if is_valid:
-                with st.spinner("원고를 생성하고 있습니다..."):
-                    try:
-                        emphasis_mapping = {
-                            "이벤트": "",
-                            "카드 혜택": "",
-                            "쿠폰": "",
-                            "특정 키워드": "",
-                            "기타": ""
+                try:
+                    emphasis_mapping = {
+                        "이벤트": "",
+                        "카드 혜택": "",
+                        "쿠폰": "",
+                        "특정 키워드": "",
+                        "기타": ""
+                    }
+                    
+                    # 선택된 강조사항에 따라 매핑
+                    for i, emphasis_type in enumerate(selected_emphasis):
+                        if i < len(emphasis_details):
+                            emphasis_mapping[emphasis_type] = emphasis_details[i]
+                    
+                    product_data = {
+                        "product_name": product_name,
+                        "price": price or "",
+                        "product_attribute": product_attribute or "",
+                        "community": community,
+                        "event": emphasis_mapping.get("이벤트", ""),
+                        "card": emphasis_mapping.get("카드 혜택", ""),
+                        "coupon": emphasis_mapping.get("쿠폰", ""),
+                        "keyword": emphasis_mapping.get("특정 키워드", ""),
+                        "etc": emphasis_mapping.get("기타", ""),
+                        "best_case": best_case or "",
+                        # 적용한 사례를 수정하지 않은 경우에만 원본 게시글 id 전달 (다이제스트 출처 기록용)
+                        "best_case_id": st.session_state.get('best_case_id') if best_case and best_case == st.session_state.get('best_case') else None
+                    }
+                    
+                    # 진행 중인 이전 생성 작업은 취소 후 새 작업 등록 (결과는 작업 상태 조회 영역에서 세션에 반영)
+                    cancel_pending_job("new_generation")
+                    job_id = submit_generation_job(
+                        user_id=st.session_state.user_id,
+                        product_data=product_data,
+                        idempotency_key=make_idempotency_key(
+                            st.session_state.get('session_key', ''), "generate", product_data
+                        ),
+                        context=RequestContext("generate")
+                    )
+                    
+                    st.session_state.pending_job = {
+                        "id": job_id,
+                        "type": "generate",
+                        "label": "원고를 생성하고 있습니다",
+                        "community": community,
+                        # 현재 입력 정보 (완료 후 입력 화면으로 돌아갈 때 사용)
+                        "last_input_data": {
+                            'product_name': product_name,
+                            'price': price,
+                            'product_attribute': product_attribute,
+                            'event': emphasis_mapping.get("이벤트", ""),
+                            'card': emphasis_mapping.get("카드 혜택", ""),
+                            'coupon': emphasis_mapping.get("쿠폰", ""),
+                            'keyword': emphasis_mapping.get("특정 키워드", ""),
+                            'etc': emphasis_mapping.get("기타", ""),
+                            'community': community,
+                            'best_case': best_case or ""
                         }
-                        
-                        # 선택된 강조사항에 따라 매핑
-                        for i, emphasis_type in enumerate(selected_emphasis):
-                            if i < len(emphasis_details):
-                                emphasis_mapping[emphasis_type] = emphasis_details[i]
-                        
-                        product_data = {
-                            "product_name": product_name,
-                            "price": price or "",
-                            "product_attribute": product_attribute or "",
-                            "community": community,
-                            "event": emphasis_mapping.get("이벤트", ""),
-                            "card": emphasis_mapping.get("카드 혜택", ""),
-                            "coupon": emphasis_mapping.get("쿠폰", ""),
-                            "keyword": emphasis_mapping.get("특정 키워드", ""),
-                            "etc": emphasis_mapping.get("기타", ""),
-                            "best_case": best_case or ""
-                        }
-                        
-                        result = generate_viral_copy(
-                            user_id=st.session_state.user_id,
-                            product_data=product_data
-                        )
-                        
-                        if result and result.get("generate_id"):
-                            st.session_state.generated_contents = result["generated_contents"]
-                            st.session_state.current_generate_id = result.get("generate_id", "temp_id")
-                            st.session_state.show_results = True
-                            
-                            # community 정보를 세션에 저장
-                            st.session_state.selected_community = community
-                            
-                            # 생성 행동 로그 기록
-                            logger.info(f"GENERATE_ACTION - user_id: {st.session_state.user_id}, community: {community}, product_name: {product_name}, generation_type: viral_copy")
-                            
-                            # 현재 입력 정보를 세션에 저장 (입력 화면으로 돌아갈 때 사용)
-                            st.session_state.last_input_data = {
-                                'product_name': product_name,
-                                'price': price,
-                                'product_attribute': product_attribute,
-                                'event': emphasis_mapping.get("이벤트", ""),
-                                'card': emphasis_mapping.get("카드 혜택", ""),
-                                'coupon': emphasis_mapping.get("쿠폰", ""),
-                                'keyword': emphasis_mapping.get("특정 키워드", ""),
-                                'etc': emphasis_mapping.get("기타", ""),
-                                'community': community,
-                                'best_case': best_case or ""
-                            }
-                            
-                            st.session_state.show_results = True
-                            st.rerun()
-                        else:
-                            st.error(f"원고 생성에 실패했습니다: {result.get('error', '알 수 없는 오류')}")
-                    except Exception as e:
-                        st.error(f"원고 생성 중 오류가 발생했습니다: {str(e)}")
+                    }
+                    st.rerun()
+                except Exception as e:
+                    st.error(f"원고 생성 중 오류가 발생했습니다: {str(e)}")
             else:
                 show_error_message(error_msg)
     
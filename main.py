@@ -1,3 +1,4 @@
+import uuid
 import streamlit as st
 from database import create_tables
 
@@ -15,6 +16,14 @@ from frontend import (
 from frontend.components.sidebar import show_sidebar
 from frontend.pages.history import show_history_page
 from frontend.pages.community_cases import show_community_cases_page
+from frontend.components.job_status import show_pending_job
+from services import ai_service, job_worker_pool
+
+# LLM 연결 예열 및 유지 (백그라운드, 프로세스당 한 번만 시작)
+ai_service.start_transport_warmup()
+
+# 생성 작업 워커 시작 (재실행 시 중복 시작하지 않음)
+job_worker_pool.start()
 
 # 페이지 설정
 st.set_page_config(
@@ -147,6 +156,9 @@ if 'content_history' not in st.session_state:
     st.session_state.content_history = []
 if 'current_generate_id' not in st.session_state:
     st.session_state.current_generate_id = None
+if 'session_key' not in st.session_state:
+    # 멱등성 키 생성용 세션 식별자
+    st.session_state.session_key = uuid.uuid4().hex
 
 def main():
     # 사용자 로그인 확인
@@ -183,6 +195,9 @@ def main():
         </div>
         """, unsafe_allow_html=True)
         
+        # 진행 중인 생성 작업 상태 (완료되면 결과 화면으로 전환)
+        show_pending_job()
+        
         if not st.session_state.show_results:
             show_input_form()
         else:
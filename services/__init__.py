@@ -3,9 +3,13 @@ from .user_service import handle_user_login
 from .content_service import (
     generate_viral_copy, copy_action, user_feedback, 
     regenerate_copy, get_user_content_history,
-    get_community_key, get_community_display_name
+    get_community_key, get_community_display_name,
+    make_idempotency_key
 )
 from .ai_service import ai_service
+from .job_service import (
+    job_worker_pool, submit_generation_job, submit_regeneration_job, cancel_generation_job, get_job_status
+)
 
 __all__ = [
     'handle_user_login',
@@ -16,5 +20,11 @@ __all__ = [
     'get_user_content_history',
     'get_community_key',
     'get_community_display_name',
-    'ai_service'
+    'make_idempotency_key',
+    'ai_service',
+    'job_worker_pool',
+    'submit_generation_job',
+    'submit_regeneration_job',
+    'cancel_generation_job',
+    'get_job_status'
 ]
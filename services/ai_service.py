@@ -1,12 +1,51 @@
 import time
-import google.generativeai as genai
-from typing import Dict, Any, List
+import queue
+import hashlib
+import threading
+from typing import Dict, Any, List, Optional, Callable, Tuple
 from dataclasses import dataclass
 
 from core.config import settings
-from utils.prompt_loader import prompt_loader, load_prompt_template
+from services.resilience import (
+    RetryPolicy, CircuitBreaker, CircuitOpenError, EmptyResponseError, classify_error
+)
+from services.scheduler import llm_scheduler, SchedulerTimeoutError
+from services.quota_coordinator import quota_coordinator, QuotaTimeoutError
+from services.singleflight import SingleFlight
+from services.hedging import hedge_policy, HedgeCancelledError
+from services.keepalive import TransportUnavailableError, transport_keepalive
+from services.generation_cache import generation_cache
+from services.token_accounting import token_estimator, extract_usage, merge_usage
+from services.llm_provider import create_provider
+from services.response_parser import parse_tone_response, build_response_schema
+from services.content_rules import apply_rules
+from services.prompt_budget import measure_fields, compact_previous_contents, trim_best_case
+from utils.prompt_loader import prompt_loader
+from utils.request_context import RequestContext, RequestCancelledError, DeadlineExceededError
 from utils.get_logger import logger
 
+# 톤 처리 순서 (JSON 키, 톤 표시명): 콘텐츠 id는 이 순서를 따름
+TONE_ORDER = [
+    ('information', '정보전달형'),
+    ('review', '후기형'),
+    ('urgent', '긴급/마감 임박형'),
+    ('storytelling', '스토리텔링형'),
+    ('friendly', '친근한 톤'),
+    ('humorous', '유머러스한 형')
+]
+
+# 누락되거나 규칙을 위반한 톤 재요청 지시문 (원래 프롬프트 뒤에 추가)
+REASK_INSTRUCTION = """
+
+## 추가 요청
+{reasons}
+위 지침과 출력 형식을 그대로 따르되, 다음 키만 포함한 JSON으로 응답하세요: {keys}
+"""
+
+# 요청별 대기/시간 예산에 따라 달라지는 실패 (병합된 후속 요청에 공유하지 않음)
+CALLER_ERRORS = (CircuitOpenError, SchedulerTimeoutError, QuotaTimeoutError,
+                 RequestCancelledError, DeadlineExceededError)
+
 @dataclass
 class GenerationConfig:
     # 생성 설정
@@ -22,156 +61,184 @@ class AIService:
     # 초기화
     def __init__(self):
         self.api_key = settings.GEMINI_API_KEY
-        self.model_name = settings.GEMINI_MODEL
         self.max_retries = settings.MAX_RETRIES
         self.retry_delay = settings.RETRY_DELAY
         
-        # API 키 검증
-        if not self.api_key:
-            logger.error("[AIService] Gemini API is not configured")
-            raise ValueError("[AIService] GEMINI_API_KEY is not set.")
+        # 재시도 정책 및 서킷 브레이커
+        self.retry_policy = RetryPolicy(
+            max_attempts=self.max_retries,
+            base_delay=self.retry_delay,
+            max_delay=settings.RETRY_MAX_DELAY,
+            deadline=settings.REQUEST_DEADLINE
+        )
+        self.circuit_breaker = CircuitBreaker(
+            failure_threshold=settings.CIRCUIT_FAILURE_THRESHOLD,
+            recovery_timeout=settings.CIRCUIT_RECOVERY_TIMEOUT,
+            half_open_max_calls=settings.CIRCUIT_HALF_OPEN_MAX_CALLS
+        )
         
-        # Gemini API 설정
-        genai.configure(api_key=self.api_key)
+        # 모델 단계: 빠른/저렴한 모델부터 시작해 파싱/규칙 검사 실패 시 다음 단계로 상향
+        # (None은 공급자 기본 모델)
+        self.model_tiers = settings.MODEL_CASCADE or [None]
         
-        # 모델 초기화
-        self.model = genai.GenerativeModel(self.model_name)
+        # LLM 공급자는 단계별로 첫 호출 시점에 초기화 (로그인 화면 등에서 SDK import/설정 비용 제거)
+        self._providers: Dict[int, Any] = {}
+        self._provider_lock = threading.Lock()
         
         # 생성 설정
         self.generation_config = GenerationConfig()
+        
+        # 진행 중인 동일 요청 병합
+        self._inflight = SingleFlight()
+    
+    # 단계별 LLM 공급자 (첫 접근 시 생성, gemini는 API 키가 없으면 오류 발생)
+    def get_provider(self, tier: int = 0):
+        if tier not in self._providers:
+            with self._provider_lock:
+                if tier not in self._providers:
+                    started = time.perf_counter()
+                    provider = create_provider(settings.LLM_PROVIDER, tones=TONE_ORDER, model_name=self.model_tiers[tier])
+                    self._providers[tier] = provider
+                    logger.info(f"[AIService] Provider initialized: provider={provider.name}, model={provider.model_name}, tier={tier}, elapsed={time.perf_counter() - started:.3f}s")
+        return self._providers[tier]
+    
+    # 전송 계층 예열/유지 시작 (앱 시작 시 호출, 이미 실행 중이면 무시)
+    def start_transport_warmup(self):
+        transport_keepalive.start(
+            warmup=self._warmup_transport if settings.WARMUP_ENABLED else None,
+            ping=self._ping_transport
+        )
+    
+    # 모든 단계 공급자 초기화 후 첫 연결 생성
+    def _warmup_transport(self):
+        for tier in range(len(self.model_tiers)):
+            self._transport_provider(tier)
+        self._ping_transport()
+    
+    # 유휴 연결 유지 요청 (SDK는 모델과 무관하게 클라이언트를 공유하므로 첫 단계만 ping)
+    def _ping_transport(self):
+        self._transport_provider(0).ping()
+    
+    # 예열/ping용 공급자 (생성 실패는 재시도로 복구되지 않으므로 keepalive 중단 사유로 전달)
+    def _transport_provider(self, tier: int):
+        try:
+            return self.get_provider(tier)
+        except Exception as e:
+            raise TransportUnavailableError(f"[AIService] Provider unavailable: {e}") from e
+    
+    # 첫 단계 공급자
+    @property
+    def provider(self):
+        return self.get_provider(0)
+    
+    @property
+    def model_name(self) -> str:
+        return self.provider.model_name
+    
+    # 단계별 모델 이름 (초기화 전이면 설정값)
+    def _tier_model_name(self, tier: int) -> str:
+        if tier in self._providers:
+            return self._providers[tier].model_name
+        return self.model_tiers[tier] or settings.LLM_PROVIDER
     
     # 상품 콘텐츠 생성
     def generate_product_content(self, product_data: Dict[str, Any], 
                                community_key: str = "mam2bebe",
                                content_length: str = "500",
-                               user_id: str = None) -> Dict[str, Any]:
+                               user_id: str = None,
+                               team_name: Optional[str] = None,
+                               on_queue_update: Optional[Callable[[int, float], None]] = None,
+                               context: Optional[RequestContext] = None,
+                               on_discarded_usage: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        # 호출 정보 (대기열 대기 시간, 시도 횟수)
+        # hedge_key: 헤지 기준 지연 분포를 구분하는 키 (첫 단계 본 요청만 사용)
+        call_info = {"queue_wait": 0.0, "queue_position": 0, "attempts": 0, "hedge_key": community_key}
         try:
-            # 커뮤니티별 프롬프트 템플릿 로드
-            prompt_template = load_prompt_template(community_key)
+            # 요청 시간 예산이 이미 소진되었으면 호출하지 않음
+            if context is not None:
+                context.check("llm_call")
             
-            # 데이터베이스 필드를 프롬프트 변수로 변환
-            prompt_variables = {
-                "productName": product_data.get("product_name", ""),
-                "price": product_data.get("price", ""),
-                "productAttribute": product_data.get("product_attribute", ""),
-                "event": product_data.get("event", ""),
-                "card": product_data.get("card", ""),
-                "coupon": product_data.get("coupon", ""),
-                "keyword": product_data.get("keyword", ""),
-                "etc": product_data.get("etc", ""),
-                "bestCase": product_data.get("best_case", ""),
-                # 재생성 변수 추가
-                "regenerateReason": product_data.get("regenerate_reason", ""),
-                "previousContents": product_data.get("previous_contents", ""),
-                # 프롬프트 템플릿 내부 변수들
-                "role_definition": prompt_template.get("role_definition", ""),
-                "guidelines": "\n".join(prompt_template.get("guidelines", [])),
-                "community_style": prompt_template.get("community_style", {}),
-                "output_format": prompt_template.get("output_format", ""),
-                # community_style 딕셔너리의 개별 값들
-                "community_style_core": prompt_template.get("community_style", {}).get("core", ""),
-                "community_style_tone": prompt_template.get("community_style", {}).get("tone", ""),
-                "community_style_characteristics": prompt_template.get("community_style", {}).get("characteristics", ""),
-                "community_style_professional_terms": prompt_template.get("community_style", {}).get("professional_terms", "")
-            }
+            # 현재 프롬프트 세트 고정 (처리 중 재로드되어도 시작한 버전을 끝까지 사용)
+            prompt_set = prompt_loader.snapshot()
+            
+            # 커뮤니티별 컴파일된 프롬프트 템플릿 로드 (정적 섹션은 로드 시점에 치환 완료)
+            prompt_template = prompt_set.load_template(community_key)
+            
+            # 헤지로 결과를 버린 호출의 토큰 사용량 보고 (응답 반환 후에 끝날 수 있음)
+            # on_discarded_usage: {"usage", "model", "prompt_version"}을 받아 사용량 장부에 기록
+            if on_discarded_usage is not None:
+                call_info["on_discarded_usage"] = lambda usage: on_discarded_usage({
+                    "usage": usage, "model": self._tier_model_name(0), "prompt_version": prompt_set.version
+                })
             
-            # 프롬프트 변수 치환
-            system_prompt = prompt_template.get("system_prompt", "")
-            formatted_system_prompt = system_prompt.format(**prompt_variables)
+            # 요청별 변수 토큰 예산 적용 후 치환
+            formatted_system_prompt = prompt_template.render(self._apply_prompt_budget(product_data, community_key))
             
             # AI 콘텐츠 생성 시작 로그 (분석용)
             logger.info(f"[ai_service] CONTENT_GENERATION_START: user_id={user_id}, community_key={community_key}")
             
-            response = self._call_gemini_with_retry(formatted_system_prompt)
+            # 동일 프롬프트가 처리 중이면 진행 중인 호출 결과를 공유
+            response, coalesced = self._call_coalesced(
+                formatted_system_prompt,
+                team_name=team_name,
+                on_queue_update=on_queue_update,
+                call_info=call_info,
+                response_schema=self._response_schema(self._target_tones(product_data)),
+                context=context
+            )
+            if coalesced:
+                logger.info(f"[ai_service] CONTENT_GENERATION_COALESCED: user_id={user_id}, community_key={community_key}")
             
-            # 응답 처리 - JSON 파싱 시도
-            try:
-                import json
-                # JSON 응답인 경우 파싱
-                response_text = response.text.strip()
-                
-                # JSON 부분만 추출 (```json ... ``` 형태일 수 있음)
-                if '```json' in response_text:
-                    start_idx = response_text.find('```json') + 7
-                    end_idx = response_text.find('```', start_idx)
-                    if end_idx != -1:
-                        response_text = response_text[start_idx:end_idx].strip()
-                elif '```' in response_text:
-                    start_idx = response_text.find('```') + 3
-                    end_idx = response_text.find('```', start_idx)
-                    if end_idx != -1:
-                        response_text = response_text[start_idx:end_idx].strip()
+            # 응답 파싱 및 규칙 검사: 완성된 톤은 복구/로컬 수정하고, 누락되거나 수정할 수 없는 톤은 재요청 대상
+            target_tones = self._target_tones(product_data)
+            rules = prompt_template.get("rules")
+            parsed = parse_tone_response(response.text, target_tones)
+            reasons, rule_fixed_tones = self._check_contents(parsed.contents, target_tones, rules)
+            tone_tiers = {key: 0 for key in parsed.contents}
+            reasked_tones = [name for key, name in target_tones if key in reasons]
+            
+            # 재요청 톤만 모아 상위 모델 단계로 올려 다시 요청 (단계가 하나면 같은 모델로 1회)
+            # 요청 시간 예산이 부족하면 재요청을 생략하고 부분 결과로 응답
+            tier = 0
+            deadline_limited = False
+            for _ in range(max(len(self.model_tiers) - 1, 1)):
+                if not reasons:
+                    break
+                if context is not None:
+                    context.raise_if_cancelled()
+                if context is not None and not context.has_budget(settings.REASK_MIN_BUDGET):
+                    deadline_limited = True
+                    logger.info(f"[ai_service] CONTENT_REASK_SKIPPED: user_id={user_id}, community_key={community_key}, remaining={context.remaining():.2f}s, tones={list(reasons)}")
+                    break
+                tier = min(tier + 1, len(self.model_tiers) - 1)
+                retry_tones = [(key, name) for key, name in target_tones if key in reasons]
+                logger.info(f"[ai_service] CONTENT_REASK: user_id={user_id}, community_key={community_key}, method={parsed.method}, tier={tier}, reasons={reasons}")
+                reasked = self._reask_tones(formatted_system_prompt, retry_tones, reasons, team_name, call_info, tier, context)
+                retry_reasons, retry_fixed = self._check_contents(reasked, retry_tones, rules)
                 
-                if response_text.startswith('{'):
-                    parsed_content = json.loads(response_text)
-                    
-                    # 톤별로 콘텐츠 분리
-                    generated_contents = []
-                    tone_mapping = {
-                        'information': '정보전달형',
-                        'review': '후기형', 
-                        'urgent': '긴급/마감 임박형',
-                        'storytelling': '스토리텔링형',
-                        'friendly': '친근한 톤',
-                        'humorous': '유머러스한 형'
-                    }
-                    
-                    # 원하는 순서로 톤 처리
-                    tone_order = [
-                        ('information', '정보전달형'),
-                        ('review', '후기형'),
-                        ('urgent', '긴급/마감 임박형'),
-                        ('storytelling', '스토리텔링형'),
-                        ('friendly', '친근한 톤'),
-                        ('humorous', '유머러스한 형')
-                    ]
-                    
-                    for i, (key, tone_name) in enumerate(tone_order, 1):
-                        if key in parsed_content and 'content' in parsed_content[key]:
-                            generated_contents.append({
-                                'id': i,
-                                'tone': tone_name,
-                                'text': parsed_content[key]['content']
-                            })
-                    
-                    
-                    # JSON에 예상된 키가 없으면 기본 처리
-                    if not generated_contents:
-                        generated_contents = [{
-                            'id': 1,
-                            'tone': 'AI 생성',
-                            'text': response.text
-                        }]
-                elif response_text.startswith('['):
-                    # 배열 형태의 JSON 응답 처리 (재생성 시 발생할 수 있음)
-                    parsed_content = json.loads(response_text)
-                    
-                    generated_contents = []
-                    for i, item in enumerate(parsed_content, 1):
-                        if isinstance(item, dict) and 'tone' in item and 'text' in item:
-                            generated_contents.append({
-                                'id': i,
-                                'tone': item['tone'],
-                                'text': item['text']
-                            })
-                    
-                    
-                    # 배열에 예상된 형식이 없으면 기본 처리
-                    if not generated_contents:
-                        generated_contents = [{
-                            'id': 1,
-                            'tone': 'AI 생성',
-                            'text': response.text
-                        }]
-                else:
-                    # 일반 텍스트인 경우 기본 형식으로 변환
-                    generated_contents = [{
-                        'id': 1,
-                        'tone': 'AI 생성',
-                        'text': response.text
-                    }]
-            except json.JSONDecodeError as e:
-                # JSON 파싱 실패 시 기본 형식으로 변환
+                for key, _ in retry_tones:
+                    if key not in reasked:
+                        continue
+                    # 새 결과가 규칙을 통과했거나, 기존에 없던 톤이면 채택 (위반이면 로컬 수정본 유지)
+                    if key not in retry_reasons or key not in parsed.contents:
+                        parsed.contents[key] = reasked[key]
+                        tone_tiers[key] = tier
+                        if key in retry_fixed:
+                            rule_fixed_tones.add(key)
+                    if key not in retry_reasons:
+                        reasons.pop(key)
+                    else:
+                        reasons[key] = retry_reasons[key]
+            
+            if parsed.contents:
+                # 원하는 순서로 톤 처리 (콘텐츠 id는 TONE_ORDER 순번)
+                generated_contents = [
+                    {'id': i, 'tone': tone_name, 'text': parsed.contents[key]}
+                    for i, (key, tone_name) in enumerate(TONE_ORDER, 1)
+                    if key in parsed.contents
+                ]
+            else:
+                # JSON을 전혀 복구하지 못한 경우 원문을 그대로 표시
                 generated_contents = [{
                     'id': 1,
                     'tone': 'AI 생성',
@@ -183,11 +250,25 @@ class AIService:
                 "content": response.text,
                 "generated_contents": generated_contents,
                 "model": self.model_name,
-                "tokens_used": self._estimate_tokens(formatted_system_prompt + response.text),
+                "prompt_version": prompt_set.version,
+                "tokens_used": call_info["usage"]["total_tokens"] if call_info.get("usage") else 0,
+                "usage": call_info.get("usage"),
                 "generation_time": time.time(),
                 "community_tone": community_key,
                 "content_length": content_length,
-                "product_data": product_data
+                "product_data": product_data,
+                "queue_wait": call_info["queue_wait"],
+                "queue_position": call_info["queue_position"],
+                "coalesced": coalesced,
+                "parse_method": parsed.method,
+                "reasked_tones": reasked_tones,
+                "rule_fixed_tones": [name for key, name in TONE_ORDER if key in rule_fixed_tones],
+                # 톤별 응답 모델 단계 (0: 첫 단계)
+                "model_tier": max(tone_tiers.values(), default=0),
+                "tone_models": {name: self._tier_model_name(tone_tiers[key]) for key, name in TONE_ORDER if key in tone_tiers},
+                # 시간 예산 부족으로 재요청을 생략해 누락/위반 톤이 남은 경우
+                "partial": deadline_limited,
+                "deadline_exceeded": context is not None and context.expired
             }
             
             # AI 콘텐츠 생성 완료 로그 (분석용)
@@ -196,16 +277,31 @@ class AIService:
             return result
             
         except Exception as e:
-            logger.error(f"[ai_service] CONTENT_GENERATION_FAILED: user_id={user_id}, community_key={community_key}, error={str(e)}")
+            if isinstance(e, RequestCancelledError):
+                reason = context.cancel_reason if context is not None else None
+                logger.info(f"[ai_service] CONTENT_GENERATION_CANCELLED: user_id={user_id}, community_key={community_key}, reason={reason}")
+            else:
+                logger.error(f"[ai_service] CONTENT_GENERATION_FAILED: user_id={user_id}, community_key={community_key}, error={str(e)}")
             return {
                 "success": False,
                 "error": str(e),
                 "content": "",
-                "model": "gemini",
-                "generation_time": 0
+                "model": self._tier_model_name(0),
+                "generation_time": 0,
+                "queue_wait": call_info["queue_wait"],
+                "queue_position": call_info["queue_position"],
+                "deadline_exceeded": context is not None and context.expired,
+                "cancelled": context is not None and context.cancelled
             }
     
     
+    # 선택적 호출(추측 생성 등)을 보낼 여유가 있는지: 서킷 정상 + 대기 없이 실행 가능 + headroom 슬롯 여유
+    # 프롬프트 토큰은 알 수 없으므로 출력 한도의 두 배로 예약 토큰을 근사
+    def has_spare_capacity(self, headroom: int = 0) -> bool:
+        if self.circuit_breaker.state != CircuitBreaker.CLOSED:
+            return False
+        return llm_scheduler.has_capacity(self.generation_config.max_output_tokens * 2, headroom)
+    
     # 사용 가능한 커뮤니티 목록 반환
     def get_available_communities(self) -> List[Dict[str, Any]]:
         try:
@@ -226,39 +322,364 @@ class AIService:
         except Exception as e:
             return []
     
+    # 동일 요청 병합 호출: 모델과 렌더링된 프롬프트의 해시를 키로 사용
+    def _call_coalesced(self, prompt: str, team_name: Optional[str] = None,
+                        on_queue_update: Optional[Callable[[int, float], None]] = None,
+                        call_info: Optional[Dict[str, Any]] = None,
+                        response_schema: Optional[Dict[str, Any]] = None,
+                        tier: int = 0, context: Optional[RequestContext] = None) -> Tuple[Any, bool]:
+        if not settings.SINGLEFLIGHT_ENABLED:
+            return self._call_gemini_with_retry(prompt, team_name, on_queue_update, call_info, response_schema, tier, context), False
+        
+        key = hashlib.sha256(f"{self.get_provider(tier).model_name}\n{prompt}".encode("utf-8")).hexdigest()
+        timeout = self.retry_policy.deadline
+        if context is not None:
+            timeout = min(timeout, context.remaining())
+        # 후속 요청은 성공한 응답과 공급자의 영구 오류만 공유하고, 리더 요청에 한정된 실패면 직접 호출
+        return self._inflight.do(
+            key,
+            lambda: self._call_gemini_with_retry(prompt, team_name, on_queue_update, call_info, response_schema, tier, context),
+            timeout=timeout,
+            share_error=self._is_shared_error
+        )
+    
+    # 병합된 후속 요청에 공유할 실패: 잘못된 요청/안전 필터 차단/쿼터 초과처럼 누가 호출해도 같은 결과인 오류
+    # 대기열/쿼터 대기 초과, 서킷 차단, 취소, 리더의 데드라인 안에 끝나지 않은 일시 오류는 공유하지 않음
+    @staticmethod
+    def _is_shared_error(error: BaseException) -> bool:
+        return not isinstance(error, CALLER_ERRORS) and classify_error(error) != "retriable"
+    
     # Gemini API 호출 (재시도 로직 포함)
-    def _call_gemini_with_retry(self, prompt: str) -> Any:
-        last_error = None
+    # 재시도 가능한 오류만 decorrelated jitter로 재시도하고, 요청 데드라인을 넘기지 않음
+    def _call_gemini_with_retry(self, prompt: str, team_name: Optional[str] = None,
+                                on_queue_update: Optional[Callable[[int, float], None]] = None,
+                                call_info: Optional[Dict[str, Any]] = None,
+                                response_schema: Optional[Dict[str, Any]] = None,
+                                tier: int = 0, context: Optional[RequestContext] = None) -> Any:
+        policy = self.retry_policy
+        # 호출 데드라인: 재시도 정책 데드라인과 요청 컨텍스트 데드라인 중 이른 쪽
+        deadline = time.monotonic() + policy.deadline
+        if context is not None:
+            deadline = min(deadline, context.deadline)
+        delay = policy.base_delay
+        call_info = call_info if call_info is not None else {}
         
-        for attempt in range(self.max_retries):
+        for attempt in range(policy.max_attempts):
+            call_info["attempts"] = attempt + 1
             try:
-                response = self.model.generate_content(
-                    prompt,
-                    generation_config=genai.types.GenerationConfig(
-                        temperature=self.generation_config.temperature,
-                        top_p=self.generation_config.top_p,
-                        top_k=self.generation_config.top_k,
-                        max_output_tokens=self.generation_config.max_output_tokens
-                    )
-                )
+                if context is not None:
+                    context.raise_if_cancelled()
+                return self._generate_hedged(prompt, team_name, on_queue_update, deadline, call_info, response_schema, tier, context)
+            
+            except (CircuitOpenError, SchedulerTimeoutError, QuotaTimeoutError, RequestCancelledError):
+                raise
+            
+            except Exception as e:
+                error_class = classify_error(e)
+                
+                if error_class != "retriable":
+                    # 공급자는 응답했으므로 장애로 집계하지 않음
+                    self.circuit_breaker.record_success()
+                    logger.error(f"[_call_gemini_with_retry] Non-retriable error ({error_class}): {type(e).__name__}: {e}")
+                    raise
+                
+                # 요청 시간 예산(SLO)이 먼저 소진되어 끊긴 호출은 공급자 장애로 집계하지 않음
+                if context is not None and context.expired and deadline == context.deadline:
+                    logger.error(f"[_call_gemini_with_retry] Request context deadline exceeded after {attempt + 1} attempts: {type(e).__name__}: {e}")
+                    raise
+                
+                self.circuit_breaker.record_failure()
+                
+                if attempt == policy.max_attempts - 1:
+                    raise
+                
+                # 다음 시도까지 데드라인이 남아있지 않으면 중단
+                delay = policy.next_delay(delay)
+                if time.monotonic() + delay >= deadline:
+                    logger.error(f"[_call_gemini_with_retry] Request deadline exceeded after {attempt + 1} attempts: {type(e).__name__}: {e}")
+                    raise
                 
-                if response.text:
-                    return response
+                logger.info(f"[_call_gemini_with_retry] Retrying in {delay:.2f}s (attempt {attempt + 1}/{policy.max_attempts}): {type(e).__name__}")
+                # 재시도 대기 중 요청이 취소되면 즉시 중단
+                if context is not None:
+                    if context.wait(delay):
+                        context.raise_if_cancelled()
                 else:
-                    raise ValueError("[_call_gemini_with_retry] Empty response received")
-                    
+                    time.sleep(delay)
+    
+    # 헤지 호출: 첫 요청이 공급자에 전달된 뒤 p90 지연을 넘기면 동일 요청을 한 번 더 보내 먼저 끝난 응답 사용
+    # 헤지는 헤지 예산과 스케줄러 여유가 있을 때만 보내며, 늦은 쪽은 공급자 호출 전이면 취소하고 이후면 결과를 버림
+    def _generate_hedged(self, prompt: str, team_name: Optional[str],
+                         on_queue_update: Optional[Callable[[int, float], None]],
+                         deadline: float, call_info: Dict[str, Any],
+                         response_schema: Optional[Dict[str, Any]] = None,
+                         tier: int = 0, context: Optional[RequestContext] = None) -> Any:
+        hedge_delay = hedge_policy.delay_for(call_info.get("hedge_key"))
+        if hedge_delay is None:
+            return self._generate_once(prompt, team_name, on_queue_update, deadline, call_info, response_schema, tier, context=context)
+        
+        events = queue.Queue()
+        cancel = threading.Event()
+        # 이전 시도의 전달 시각은 제외 (새 호출이 공급자에 전달되기 전에 헤지가 나가지 않도록)
+        infos = {"primary": {key: value for key, value in call_info.items() if key != "dispatched_at"}}
+        # 결과를 버린 호출도 공급자가 응답했으면 토큰을 사용했으므로 사용량을 따로 보고
+        # finished: 끝난 호출, discarded: 결과를 버리기로 했지만 아직 진행 중인 호출 (끝나면 스레드에서 보고)
+        usage_lock = threading.Lock()
+        finished, discarded = set(), set()
+        
+        def report_discarded_usage(label: str):
+            usage = infos[label].get("usage")
+            report = call_info.get("on_discarded_usage")
+            if not usage or report is None:
+                return
+            try:
+                report(usage)
             except Exception as e:
-                last_error = e
-                if attempt < self.max_retries - 1:
-                    time.sleep(self.retry_delay * (2 ** attempt))
-                else:
-                    raise last_error
+                logger.error(f"[_generate_hedged] Failed to report discarded call usage: label={label}, error={e}")
+        
+        # 승자 외 호출의 결과 버림: 이미 끝났으면 바로 보고하고, 진행 중이면 끝날 때 보고
+        def discard_others(winner_label: Optional[str]):
+            with usage_lock:
+                done_labels = [label for label in infos if label != winner_label and label in finished]
+                discarded.update(label for label in infos if label != winner_label and label not in finished)
+            for label in done_labels:
+                report_discarded_usage(label)
+        
+        def run(label: str):
+            # 대기열 상태 콜백은 호출 스레드에서 실행 (Streamlit 요소는 스크립트 스레드에서만 갱신 가능)
+            update = (lambda position, waited: events.put(("queue", label, (position, waited)))) if label == "primary" else None
+            try:
+                response = self._generate_once(prompt, team_name, update, deadline, infos[label], response_schema, tier, cancel, context)
+                events.put(("done", label, response))
+            except Exception as e:
+                events.put(("error", label, e))
+            finally:
+                with usage_lock:
+                    finished.add(label)
+                    late = label in discarded
+                if late:
+                    report_discarded_usage(label)
+        
+        threading.Thread(target=run, args=("primary",), daemon=True).start()
+        pending = {"primary"}
+        hedge_checked = False
+        winner, error = None, None
+        
+        while pending:
+            try:
+                kind, label, payload = events.get(timeout=0.05)
+            except queue.Empty:
+                # 요청이 취소되면 진행 중인 호출 결과를 기다리지 않고 중단 (공급자 호출 전이면 호출하지 않음)
+                if context is not None and context.cancelled:
+                    cancel.set()
+                    discard_others(None)
+                    context.raise_if_cancelled()
+                dispatched_at = infos["primary"].get("dispatched_at")
+                if not hedge_checked and dispatched_at and time.monotonic() - dispatched_at >= hedge_delay:
+                    hedge_checked = True
+                    reserved_tokens = self._estimate_tokens(prompt) + self.generation_config.max_output_tokens
+                    if not llm_scheduler.has_capacity(reserved_tokens):
+                        hedge_policy.record_suppressed()
+                    elif hedge_policy.try_acquire():
+                        logger.info(f"[_generate_hedged] Hedging request: key={call_info.get('hedge_key')}, delay={hedge_delay:.2f}s")
+                        infos["hedge"] = {"queue_wait": 0.0, "queue_position": 0, "hedge_key": call_info.get("hedge_key")}
+                        threading.Thread(target=run, args=("hedge",), daemon=True).start()
+                        pending.add("hedge")
+                continue
+            
+            if kind == "queue":
+                if on_queue_update:
+                    on_queue_update(*payload)
+                continue
+            
+            pending.discard(label)
+            if kind == "done":
+                winner = label
+                break
+            # 한쪽이 실패해도 다른 쪽이 진행 중이면 계속 대기
+            error = payload
+        
+        cancel.set()
+        if "hedge" in infos:
+            hedge_policy.record_outcome(winner or "both_failed")
+        if winner is None:
+            raise error
+        discard_others(winner)
+        
+        # 승자의 호출 정보 반영 (대기 시간은 첫 요청 기준)
+        call_info.update({key: value for key, value in infos[winner].items() if key not in ("queue_wait", "queue_position")})
+        call_info["queue_wait"] = infos["primary"].get("queue_wait", 0.0)
+        call_info["queue_position"] = infos["primary"].get("queue_position", 0)
+        call_info["hedge"] = winner
+        return payload
+    
+    # 단일 호출: 스케줄러 슬롯 획득 후 LLM 공급자 호출
+    def _generate_once(self, prompt: str, team_name: Optional[str],
+                       on_queue_update: Optional[Callable[[int, float], None]],
+                       deadline: float, call_info: Dict[str, Any],
+                       response_schema: Optional[Dict[str, Any]] = None,
+                       tier: int = 0, cancel: Optional[threading.Event] = None,
+                       context: Optional[RequestContext] = None) -> Any:
+        # 공급자 장애 중에는 대기열에 들어가지 않고 즉시 실패
+        if self.circuit_breaker.state == CircuitBreaker.OPEN:
+            raise CircuitOpenError("[_generate_once] Gemini circuit breaker is open")
         
-        raise last_error
+        # TPM 예약량: 프롬프트 + 최대 출력 토큰 (호출 종료 시 실제 사용량으로 정산)
+        prompt_tokens = self._estimate_tokens(prompt)
+        reserved_tokens = prompt_tokens + self.generation_config.max_output_tokens
+        # 정산할 사용량: 공급자 호출 전 중단이면 0, 호출 후 실패면 프롬프트 추정치, 성공이면 실제 사용량
+        charged_tokens = 0
+        
+        with llm_scheduler.acquire(team_name, reserved_tokens, on_update=on_queue_update,
+                                   timeout=max(deadline - time.monotonic(), 0.0),
+                                   cancel=context.cancel_event if context is not None else None) as ticket:
+            try:
+                call_info["queue_wait"] = call_info.get("queue_wait", 0.0) + ticket.wait_time
+                if not call_info.get("queue_position"):
+                    call_info["queue_position"] = ticket.initial_position
+                
+                # 프로세스 간 전역 쿼터 임대 (비활성화 시 즉시 통과)
+                with quota_coordinator.lease(reserved_tokens, timeout=max(deadline - time.monotonic(), 0.0)) as lease:
+                    try:
+                        if lease:
+                            call_info["queue_wait"] += lease.wait_time
+                        
+                        # 헤지 상대가 먼저 끝났으면 공급자 호출 없이 중단
+                        if cancel is not None and cancel.is_set():
+                            raise HedgeCancelledError("[_generate_once] Cancelled by hedged request")
+                        # 요청이 취소되었으면 공급자 호출 없이 중단
+                        if context is not None:
+                            context.raise_if_cancelled()
+                        
+                        if not self.circuit_breaker.allow_request():
+                            raise CircuitOpenError("[_generate_once] Gemini circuit breaker is open")
+                        
+                        provider = self.get_provider(tier)
+                        reused = transport_keepalive.begin_call()
+                        call_info["dispatched_at"] = time.monotonic()
+                        charged_tokens = prompt_tokens
+                        try:
+                            # 남은 데드라인을 공급자 호출 제한 시간으로 전달 (응답 지연 중에도 데드라인을 넘기지 않음)
+                            response = provider.generate(prompt, self.generation_config, response_schema,
+                                                         timeout=max(deadline - time.monotonic(), 0.01))
+                        finally:
+                            transport_keepalive.end_call(reused, time.monotonic() - call_info["dispatched_at"])
+                        hedge_policy.record_latency(call_info.get("hedge_key"), time.monotonic() - call_info["dispatched_at"])
+                        
+                        # 안전 필터 차단 시 response.text 접근에서 ValueError 발생 (재시도 대상 아님)
+                        if not response.text:
+                            raise EmptyResponseError("[_generate_once] Empty response received")
+                        
+                        # 실제 토큰 사용량 (usage_metadata가 없으면 보정된 추정치)
+                        usage = self._measure_usage(prompt, response)
+                        call_info["usage"] = usage
+                        charged_tokens = usage["total_tokens"]
+                        self.circuit_breaker.record_success()
+                        return response
+                    finally:
+                        if lease:
+                            lease.actual_tokens = charged_tokens
+            finally:
+                # 실패/중단 시에도 예약한 최대 출력 토큰을 돌려줌 (장애 중 재시도가 TPM을 소진하지 않도록)
+                llm_scheduler.reconcile(ticket, charged_tokens)
     
-    # 토큰 수 추정
+    # 토큰 수 추정 (실제 사용량으로 보정되는 로컬 추정기)
     def _estimate_tokens(self, text: str) -> int:
-        return len(text) // 3
+        return token_estimator.estimate(text)
+    
+    # 생성 대상 톤 (재생성은 target_tones에 지정된 톤만)
+    def _target_tones(self, product_data: Dict[str, Any]) -> List[Tuple[str, str]]:
+        names = {name.strip() for name in (product_data.get("target_tones") or "").split(",") if name.strip()}
+        if not names:
+            return TONE_ORDER
+        return [(key, name) for key, name in TONE_ORDER if name in names] or TONE_ORDER
+    
+    # 구조화 출력 스키마 (비활성화 시 None, 미지원 공급자는 무시)
+    def _response_schema(self, target_tones: List[Tuple[str, str]]) -> Optional[Dict[str, Any]]:
+        if not settings.STRUCTURED_OUTPUT_ENABLED:
+            return None
+        return build_response_schema(TONE_ORDER, [key for key, _ in target_tones])
+    
+    # 파싱된 톤 검사: 규칙 위반은 로컬 수정(contents 갱신), 재요청 사유와 로컬 수정한 톤 반환
+    def _check_contents(self, contents: Dict[str, str], target_tones: List[Tuple[str, str]],
+                        rules: Optional[Dict[str, Any]]) -> Tuple[Dict[str, List[str]], set]:
+        reasons = {}
+        if settings.PARSE_REASK_ENABLED:
+            reasons = {key: ["누락되었거나 JSON이 중간에 잘림"] for key, _ in target_tones if key not in contents}
+        
+        fixed = set()
+        for key, text in list(contents.items()):
+            check = apply_rules(text, rules)
+            contents[key] = check.text
+            if check.fixes:
+                fixed.add(key)
+            if check.violations and settings.RULES_REASK_ENABLED:
+                reasons[key] = check.violations
+        return reasons, fixed
+    
+    # 누락되거나 규칙을 위반한 톤만 다시 요청 (1회), 실패해도 기존 결과는 유지
+    def _reask_tones(self, prompt: str, tones: List[Tuple[str, str]], reasons: Dict[str, List[str]],
+                     team_name: Optional[str], call_info: Dict[str, Any], tier: int = 0,
+                     context: Optional[RequestContext] = None) -> Dict[str, str]:
+        reask_prompt = prompt + REASK_INSTRUCTION.format(
+            reasons="\n".join(f"- {name}: {', '.join(reasons[key])}" for key, name in tones),
+            keys=", ".join(key for key, _ in tones)
+        )
+        reask_info = {"queue_wait": 0.0, "queue_position": 0, "attempts": 0}
+        try:
+            response, coalesced = self._call_coalesced(
+                reask_prompt,
+                team_name=team_name,
+                call_info=reask_info,
+                response_schema=self._response_schema(tones),
+                tier=tier,
+                context=context
+            )
+        except Exception as e:
+            logger.error(f"[_reask_tones] Re-ask failed: tones={[name for _, name in tones]}, error={str(e)}")
+            return {}
+        
+        call_info["queue_wait"] += reask_info["queue_wait"]
+        if not coalesced and reask_info.get("usage"):
+            call_info["usage"] = merge_usage(call_info.get("usage"), reask_info["usage"])
+        return parse_tone_response(response.text, tones).contents
+    
+    # 프롬프트 변수 예산 적용 (원본 product_data는 변경하지 않음)
+    def _apply_prompt_budget(self, product_data: Dict[str, Any], community_key: str) -> Dict[str, Any]:
+        budgeted = dict(product_data)
+        
+        if "previous_contents" in budgeted:
+            budgeted["previous_contents"] = compact_previous_contents(budgeted["previous_contents"])
+        
+        best_case, trimmed = trim_best_case(budgeted.get("best_case"), settings.BEST_CASE_TOKEN_BUDGET)
+        if trimmed:
+            before = self._estimate_tokens(product_data["best_case"])
+            after = self._estimate_tokens(best_case)
+            budgeted["best_case"] = best_case
+            logger.info(f"[_apply_prompt_budget] best_case trimmed: community_key={community_key}, "
+                        f"tokens={before}->{after}, budget={settings.BEST_CASE_TOKEN_BUDGET}, "
+                        f"fields={measure_fields(budgeted)}")
+        
+        return budgeted
+    
+    # 응답 토큰 사용량 측정: usage_metadata 우선, 없으면 추정
+    def _measure_usage(self, prompt: str, response: Any) -> Dict[str, Any]:
+        usage = extract_usage(response)
+        if usage:
+            # 추정기 보정 (프롬프트/출력 각각)
+            token_estimator.calibrate(prompt, usage["prompt_tokens"])
+            token_estimator.calibrate(response.text, usage["output_tokens"])
+            return usage
+        
+        prompt_tokens = self._estimate_tokens(prompt)
+        output_tokens = self._estimate_tokens(response.text)
+        return {
+            "prompt_tokens": prompt_tokens,
+            "output_tokens": output_tokens,
+            "cached_tokens": 0,
+            "total_tokens": prompt_tokens + output_tokens,
+            "estimated": True
+        }
     
     # 서비스 상태 확인
     def get_service_status(self) -> Dict[str, Any]:
@@ -269,7 +690,10 @@ class AIService:
             return {
                 "status": "active",
                 "model_info": {
-                    "model_name": self.model_name,
+                    "provider": settings.LLM_PROVIDER,
+                    "provider_initialized": 0 in self._providers,
+                    "model_name": self._tier_model_name(0),
+                    "model_cascade": [self._tier_model_name(tier) for tier in range(len(self.model_tiers))],
                     "api_key_configured": bool(self.api_key),
                     "generation_config": {
                         "temperature": self.generation_config.temperature,
@@ -277,11 +701,17 @@ class AIService:
                         "top_k": self.generation_config.top_k,
                         "max_output_tokens": self.generation_config.max_output_tokens
                     },
-                    "retry_settings": {
-                        "max_retries": self.max_retries,
-                        "retry_delay": self.retry_delay
-                    }
+                    "retry_settings": self.retry_policy.to_dict()
                 },
+                "provider": {self._tier_model_name(tier): provider.snapshot() for tier, provider in self._providers.items()},
+                "circuit_breaker": self.circuit_breaker.snapshot(),
+                "scheduler": llm_scheduler.snapshot(),
+                "global_quota": quota_coordinator.snapshot(),
+                "singleflight": self._inflight.snapshot(),
+                "hedging": hedge_policy.snapshot(),
+                "transport": transport_keepalive.snapshot(),
+                "generation_cache": generation_cache.snapshot(),
+                "token_estimator": token_estimator.snapshot(),
                 "available_communities": available_communities,
                 "prompts_loaded": True
             }
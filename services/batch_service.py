@@ -0,0 +1,237 @@
+import os
+import csv
+import json
+import time
+import hashlib
+import statistics
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Any, List, Optional, Callable
+
+from core.config import settings
+from database.crud import save_batch_results, get_batch_completed_keys
+from services.content_service import (
+    COMMUNITY_KEYS, generate_batch_copy, get_community_key, get_community_display_name, get_user_team
+)
+from utils.validators import validate_input_form
+from utils.get_logger import logger
+from utils.request_context import RequestContext
+
+# 입력 행 필드 (user_inputs 테이블과 동일)
+BATCH_FIELDS = ["product_name", "price", "product_attribute", "event", "card",
+                "coupon", "keyword", "etc", "community", "best_case"]
+
+
+# 상품 목록 파일 읽기 (CSV: 헤더 행 필요, JSONL: 한 줄에 객체 하나)
+def load_batch_rows(path: str) -> List[Dict[str, Any]]:
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        if path.lower().endswith(".jsonl"):
+            raw_rows = [json.loads(line) for line in f if line.strip()]
+        else:
+            raw_rows = list(csv.DictReader(f))
+
+    rows = []
+    for raw in raw_rows:
+        row = {field: str(raw.get(field) or "").strip() for field in BATCH_FIELDS}
+        # 커뮤니티는 프롬프트 키 또는 표시명(맘이베베/뽐뿌/에펨코리아)
+        if row["community"] not in COMMUNITY_KEYS:
+            community_key = get_community_key(row["community"])
+            if get_community_display_name(community_key) == row["community"]:
+                row["community"] = community_key
+        rows.append(row)
+    return rows
+
+
+# 실행 ID 기본값: 입력 파일 이름 + 경로 해시 (같은 파일로 다시 실행하면 이어서 처리)
+def default_run_id(path: str) -> str:
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return f"{stem}-{hashlib.sha256(os.path.abspath(path).encode('utf-8')).hexdigest()[:8]}"
+
+
+# 행 키: 행 순번 + 행 내용 해시 (행 내용이 바뀌면 새 행으로 보고 다시 생성)
+def row_key(index: int, row: Dict[str, Any]) -> str:
+    serialized = json.dumps(row, ensure_ascii=False, sort_keys=True)
+    return f"{index}:{hashlib.sha256(serialized.encode('utf-8')).hexdigest()[:16]}"
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+# 배치 생성 실행기
+# 상품 행을 제한된 수의 워커 스레드로 나눠 AIService(스케줄러 속도 제한 적용)에 보내고,
+# 완료된 결과는 commit_size건씩 모아 콘텐츠와 체크포인트를 한 트랜잭션으로 저장한다.
+# 중단 후 같은 run_id로 다시 실행하면 완료된 행은 건너뛰고 실패한 행과 남은 행만 처리한다.
+class BatchRunner:
+    def __init__(self, run_id: str, user_id: str, workers: int, commit_size: int,
+                 row_timeout: float, on_progress: Optional[Callable[[int, int, float], None]] = None):
+        self.run_id = run_id
+        self.user_id = user_id
+        self.team_name = get_user_team(user_id)
+        self.workers = workers
+        self.commit_size = commit_size
+        self.row_timeout = row_timeout
+        # 진행 상황 콜백 (처리 건수, 처리 대상 건수, 경과 시간), 저장 단위마다 호출
+        self.on_progress = on_progress
+
+        self._lock = threading.Lock()
+        self._contexts: Dict[str, RequestContext] = {}
+        self._buffer: List[Dict[str, Any]] = []
+        self._items: List[Dict[str, Any]] = []
+        self._transactions = 0
+
+    # 행 1건 생성 (저장하지 않고 결과 항목 반환)
+    def _generate_row(self, index: int, key: str, row: Dict[str, Any]) -> Dict[str, Any]:
+        item = {"row_key": key, "row_index": index, "product_data": row}
+        is_valid, error_msg = validate_input_form(row["product_name"], row["community"])
+        if is_valid and row["community"] not in COMMUNITY_KEYS:
+            is_valid, error_msg = False, f"지원하지 않는 커뮤니티입니다: {row['community']}"
+        if not is_valid:
+            return dict(item, status="invalid", error=error_msg)
+
+        context = RequestContext("batch", timeout=self.row_timeout)
+        with self._lock:
+            self._contexts[key] = context
+        started = time.monotonic()
+        try:
+            result = generate_batch_copy(self.user_id, self.team_name, row, context=context)
+        except Exception as e:
+            result = {"success": False, "error": str(e)}
+        finally:
+            with self._lock:
+                self._contexts.pop(key, None)
+
+        item.update(
+            latency=time.monotonic() - started,
+            queue_wait=result.get("queue_wait", 0.0),
+            total_tokens=(result.get("usage") or {}).get("total_tokens", 0)
+        )
+        if result.get("cancelled"):
+            return dict(item, status="cancelled", error=result.get("error"))
+        if not result["success"]:
+            return dict(item, status="failed", error=result.get("error", "Unknown error"))
+        return dict(
+            item,
+            status="completed",
+            generated_contents=result["generated_contents"],
+            attributes={
+                "community": row["community"],
+                "prompt_version": result.get("prompt_version"),
+                "model_tier": result.get("model_tier", 0),
+                "tone_models": result.get("tone_models", {}),
+                "partial": result.get("partial", False),
+                "batch_run": self.run_id
+            }
+        )
+
+    # 모아 둔 결과 저장 (취소된 행은 체크포인트에 남기지 않아 다음 실행에서 다시 처리)
+    # 저장에 실패하면 버퍼를 비우지 않고 예외를 그대로 전달
+    def _flush(self):
+        items = [item for item in self._buffer if item["status"] != "cancelled"]
+        if items:
+            save_batch_results(self.run_id, self.user_id, items)
+            self._transactions += 1
+        self._buffer = []
+
+    # 완료된 행 결과 수집
+    def _collect(self, item: Dict[str, Any]):
+        self._items.append(item)
+        self._buffer.append(item)
+
+    # 실행 중인 행 취소 (중단 시)
+    def _cancel_running(self, reason: str):
+        with self._lock:
+            contexts = list(self._contexts.values())
+        for context in contexts:
+            context.cancel(reason)
+
+    # 배치 실행: 처리 결과 요약 반환
+    def run(self, rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+        done = get_batch_completed_keys(self.run_id)
+        pending = [(index, key, row) for index, row in enumerate(rows)
+                   if (key := row_key(index, row)) not in done]
+        logger.info(f"[BatchRunner] Run started: run_id={self.run_id}, rows={len(rows)}, skipped={len(rows) - len(pending)}, workers={self.workers}")
+
+        started = time.monotonic()
+        interrupted = False
+        aborted = False
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="batch")
+        futures = [executor.submit(self._generate_row, index, key, row) for index, key, row in pending]
+        collected = set()
+        try:
+            for future in as_completed(futures):
+                collected.add(future)
+                self._collect(future.result())
+                if len(self._buffer) >= self.commit_size:
+                    self._flush()
+                    elapsed = time.monotonic() - started
+                    logger.info(f"[BatchRunner] Progress: run_id={self.run_id}, processed={len(self._items)}/{len(pending)}, elapsed={elapsed:.0f}s")
+                    if self.on_progress:
+                        self.on_progress(len(self._items), len(pending), elapsed)
+        except KeyboardInterrupt:
+            # 대기 중인 행은 취소하고 실행 중인 행은 요청 취소 후, 완료된 결과만 저장
+            interrupted = True
+            executor.shutdown(wait=False, cancel_futures=True)
+            self._cancel_running("batch_interrupted")
+            logger.warning(f"[BatchRunner] Run interrupted: run_id={self.run_id}, saving completed rows")
+        except Exception as e:
+            # 저장 실패 시 남은 행은 생성하지 않고 중단 (저장되지 않은 행은 다음 실행에서 다시 처리)
+            aborted = True
+            executor.shutdown(wait=False, cancel_futures=True)
+            self._cancel_running("batch_aborted")
+            logger.error(f"[BatchRunner] Run aborted: run_id={self.run_id}, error={e}")
+            raise
+        finally:
+            executor.shutdown(wait=True)
+            if not aborted:
+                for future in futures:
+                    if future not in collected and future.done() and not future.cancelled():
+                        self._collect(future.result())
+                self._flush()
+
+        return self._summary(len(rows), len(rows) - len(pending), time.monotonic() - started, interrupted)
+
+    # 처리량/지연 요약
+    def _summary(self, total: int, skipped: int, elapsed: float, interrupted: bool) -> Dict[str, Any]:
+        counts = {status: sum(1 for item in self._items if item["status"] == status)
+                  for status in ("completed", "failed", "invalid", "cancelled")}
+        latencies = [item["latency"] for item in self._items if "latency" in item and item["status"] != "cancelled"]
+        summary = {
+            "run_id": self.run_id,
+            "rows": total,
+            "skipped": skipped,
+            **counts,
+            "interrupted": interrupted,
+            "elapsed": round(elapsed, 2),
+            "throughput_per_min": round(len(latencies) / elapsed * 60, 2) if elapsed > 0 else 0.0,
+            "transactions": self._transactions,
+            "total_tokens": sum(item.get("total_tokens") or 0 for item in self._items)
+        }
+        if latencies:
+            summary["latency"] = {
+                "mean": round(statistics.mean(latencies), 2),
+                "p50": round(percentile(latencies, 0.5), 2),
+                "p90": round(percentile(latencies, 0.9), 2),
+                "p99": round(percentile(latencies, 0.99), 2),
+                "max": round(max(latencies), 2)
+            }
+            summary["avg_queue_wait"] = round(statistics.mean(item.get("queue_wait", 0.0) for item in self._items
+                                                              if "latency" in item), 2)
+        logger.info(f"[BatchRunner] Run finished: {summary}")
+        return summary
+
+
+# 배치 생성 실행 (CLI 진입점에서 호출)
+def run_batch(path: str, user_id: str, run_id: Optional[str] = None,
+              workers: Optional[int] = None,
+              on_progress: Optional[Callable[[int, int, float], None]] = None) -> Dict[str, Any]:
+    runner = BatchRunner(
+        run_id=run_id or default_run_id(path),
+        user_id=user_id,
+        workers=workers or settings.BATCH_WORKERS,
+        commit_size=settings.BATCH_COMMIT_SIZE,
+        row_timeout=settings.BATCH_ROW_TIMEOUT,
+        on_progress=on_progress
+    )
+    return runner.run(load_batch_rows(path))
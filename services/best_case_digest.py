@@ -0,0 +1,96 @@
+import re
+import hashlib
+from collections import Counter
+from typing import Dict, Any
+
+# 핵심 표현 최대 개수
+MAX_KEY_PHRASES = 8
+# 도입부/마무리 최대 길이(자)
+MAX_EDGE_CHARS = 60
+
+# 핵심 표현 후보에서 제외할 흔한 어절
+STOPWORDS = {
+    "그리고", "그런데", "근데", "이거", "저거", "그거", "진짜", "너무", "정말", "있어요", "있음",
+    "합니다", "하는", "해서", "하고", "이번", "같은", "같아요", "있는", "없는", "the", "and"
+}
+
+_WORD_PATTERN = re.compile(r"[0-9A-Za-z가-힣%,.~]+")
+_PRICE_PATTERN = re.compile(r"\d[\d,.]*\s*(?:원|만원|%|프로)")
+_LAUGH_PATTERN = re.compile(r"[ㅋㅎ]{2,}|\^\^|ㅠㅠ|ㅜㅜ")
+_EMOJI_PATTERN = re.compile(r"[\U0001F300-\U0001FAFF☀-➿]")
+
+
+# 베스트 사례 본문 해시 (다이제스트 캐시 키)
+def content_hash(text: str) -> str:
+    normalized = "\n".join(line.strip() for line in text.strip().splitlines() if line.strip())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def _clip(text: str) -> str:
+    return text if len(text) <= MAX_EDGE_CHARS else text[:MAX_EDGE_CHARS] + "…"
+
+
+# 핵심 표현 추출: 가격/할인 표현 우선, 나머지는 빈도순 (동률이면 먼저 나온 순서)
+def _key_phrases(text: str) -> list:
+    phrases = []
+    for match in _PRICE_PATTERN.findall(text):
+        if match not in phrases:
+            phrases.append(match)
+
+    words = [word.strip(",.~") for word in _WORD_PATTERN.findall(text)]
+    words = [word for word in words if len(word) >= 2 and word not in STOPWORDS and not word.isdigit()]
+    counts = Counter(words)
+    first_seen = {word: i for i, word in reversed(list(enumerate(words)))}
+    for word, _ in sorted(counts.items(), key=lambda item: (-item[1], first_seen[item[0]])):
+        if len(phrases) >= MAX_KEY_PHRASES:
+            break
+        if not any(word in phrase for phrase in phrases):
+            phrases.append(word)
+    return phrases[:MAX_KEY_PHRASES]
+
+
+# 베스트 사례 스타일 다이제스트 생성 (로컬 분석, LLM 호출 없음)
+def build_digest(text: str) -> Dict[str, Any]:
+    lines = [line.strip() for line in text.strip().splitlines() if line.strip()]
+    line_lengths = [len(line) for line in lines] or [0]
+
+    return {
+        "chars": len(text.strip()),
+        "lines": len(lines),
+        "avg_line_chars": round(sum(line_lengths) / len(line_lengths)),
+        "max_line_chars": max(line_lengths),
+        "paragraphs": len([block for block in re.split(r"\n\s*\n", text.strip()) if block.strip()]),
+        "opening_hook": _clip(lines[0]) if lines else "",
+        "closing_line": _clip(lines[-1]) if len(lines) > 1 else "",
+        "key_phrases": _key_phrases(text),
+        "laugh_markers": sorted(set(_LAUGH_PATTERN.findall(text))),
+        "emoji_count": len(_EMOJI_PATTERN.findall(text)),
+        "exclamations": text.count("!"),
+        "questions": text.count("?")
+    }
+
+
+# 다이제스트를 프롬프트에 넣을 요약 문자열로 변환
+def format_digest(digest: Dict[str, Any]) -> str:
+    parts = [
+        f"분량 약 {digest['chars']}자, {digest['lines']}줄(줄당 평균 {digest['avg_line_chars']}자, 문단 {digest['paragraphs']}개)",
+        f"도입부: \"{digest['opening_hook']}\""
+    ]
+    if digest.get("closing_line"):
+        parts.append(f"마무리: \"{digest['closing_line']}\"")
+    if digest.get("key_phrases"):
+        parts.append(f"핵심 표현: {', '.join(digest['key_phrases'])}")
+
+    expressions = []
+    if digest.get("laugh_markers"):
+        expressions.append(f"{' '.join(digest['laugh_markers'])} 사용")
+    if digest.get("emoji_count"):
+        expressions.append(f"이모지 {digest['emoji_count']}개")
+    if digest.get("exclamations"):
+        expressions.append(f"느낌표 {digest['exclamations']}개")
+    if digest.get("questions"):
+        expressions.append(f"물음표 {digest['questions']}개")
+    if expressions:
+        parts.append(f"표현: {', '.join(expressions)}")
+
+    return "[스타일 요약] " + " / ".join(parts)
@@ -0,0 +1,92 @@
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional
+
+# 로컬 수정으로 잘라낼 수 있는 최대 비율 (이보다 많이 잘라야 하면 재요청)
+MAX_TRUNCATE_RATIO = 0.3
+
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?~])\s+")
+_CLAUSE_BREAK = re.compile(r"(?<=,)\s+")
+
+
+# 톤 1개에 대한 규칙 검사 결과
+@dataclass
+class RuleCheck:
+    text: str
+    # 로컬에서 수정한 항목
+    fixes: List[str] = field(default_factory=list)
+    # 로컬에서 수정할 수 없는 위반 (재요청 대상)
+    violations: List[str] = field(default_factory=list)
+
+
+# 단위들을 max_line_chars 이내로 이어 붙임
+def _pack(units: List[str], max_line_chars: int) -> List[str]:
+    packed, current = [], ""
+    for unit in units:
+        candidate = f"{current} {unit}" if current else unit
+        if current and len(candidate) > max_line_chars:
+            packed.append(current)
+            current = unit
+        else:
+            current = candidate
+    if current:
+        packed.append(current)
+    return packed
+
+
+# 긴 줄 재배치: 문장 단위로 줄을 나누고, 그래도 긴 문장은 쉼표/공백 단위로 나눔
+def _wrap_line(line: str, max_line_chars: int) -> List[str]:
+    if len(line) <= max_line_chars:
+        return [line]
+
+    wrapped = []
+    for sentence in _SENTENCE_BREAK.split(line):
+        if len(sentence) <= max_line_chars:
+            wrapped.append(sentence)
+            continue
+        units = []
+        for clause in _CLAUSE_BREAK.split(sentence):
+            units.extend([clause] if len(clause) <= max_line_chars else clause.split(" "))
+        wrapped.extend(_pack(units, max_line_chars))
+    return wrapped
+
+
+# 프롬프트 YAML의 rules로 문구 검사 및 로컬 수정
+# rules: max_lines / max_line_chars / max_chars / forbidden_terms (모두 선택)
+def apply_rules(text: str, rules: Optional[Dict[str, Any]]) -> RuleCheck:
+    check = RuleCheck(text=text)
+    if not rules:
+        return check
+
+    lines = [line.strip() for line in text.strip().splitlines() if line.strip()]
+    original_chars = len("\n".join(lines))
+
+    max_line_chars = rules.get("max_line_chars")
+    if max_line_chars and any(len(line) > max_line_chars for line in lines):
+        lines = [wrapped for line in lines for wrapped in _wrap_line(line, max_line_chars)]
+        check.fixes.append("rewrap")
+
+    max_lines = rules.get("max_lines")
+    if max_lines and len(lines) > max_lines:
+        lines = lines[:max_lines]
+        check.fixes.append("truncate_lines")
+
+    max_chars = rules.get("max_chars")
+    if max_chars and len("\n".join(lines)) > max_chars:
+        while len(lines) > 1 and len("\n".join(lines)) > max_chars:
+            lines.pop()
+        check.fixes.append("truncate_chars")
+
+    check.text = "\n".join(lines)
+
+    # 너무 많이 잘렸거나 한 줄만으로도 길이를 넘으면 로컬 수정 불가
+    dropped = original_chars - len(check.text)
+    if (original_chars and dropped / original_chars > MAX_TRUNCATE_RATIO) or \
+            (max_chars and len(check.text) > max_chars):
+        check.violations.append(f"분량 초과(최대 {max_lines or '-'}줄, {max_chars or '-'}자)")
+
+    for term in rules.get("forbidden_terms", []):
+        if term in check.text:
+            check.violations.append(f"금지 표현 '{term}' 사용")
+
+    return check
@@ -1,64 +1,253 @@
-from typing import Dict, List, Any
+import json
+import time
+import hashlib
+import threading
+from typing import Dict, List, Any, Optional, Set, Callable
 
+from core.config import settings
 from database.crud import (
     create_content, get_content, get_user_contents,
-    create_user_feedback, create_user_input
+    create_user_feedback, create_user_input, get_user,
+    claim_idempotency_key, complete_idempotency_key,
+    release_idempotency_key, get_idempotency_key, record_usage,
+    get_best_case_digest, save_best_case_digest, get_recent_contents_by_product
 )
-from services.ai_service import ai_service
+from services.ai_service import ai_service, TONE_ORDER
+from services.generation_cache import generation_cache
+from services.best_case_digest import content_hash, build_digest, format_digest
 from utils.get_logger import logger
+from utils.request_context import RequestContext
 
 
-# 커뮤니티 매핑 함수: 커뮤니티 표시명을 프롬프트 키로 변환
-def get_community_key(community_display_name: str) -> str:
+# 커뮤니티 프롬프트 키 -> 표시명 (입력 화면의 커뮤니티 선택지, 첫 항목이 기본값)
+COMMUNITY_DISPLAY_NAMES = {
+    "mam2bebe": "맘이베베",
+    "ppomppu": "뽐뿌",
+    "fmkorea": "에펨코리아"
+}
 
-    community_mapping = {
-        "맘이베베": "mam2bebe",
-        "뽐뿌": "ppomppu", 
-        "에펨코리아": "fmkorea",    
-    }
+# 추측 생성/배치 대상 커뮤니티
+COMMUNITY_KEYS = list(COMMUNITY_DISPLAY_NAMES)
+
+# 추측 생성 호출의 스케줄러 대기열 이름 (사용자 팀 대기열과 분리, TEAM_WEIGHTS로 가중치 조정 가능)
+SPECULATIVE_TEAM = "speculative"
 
-    return community_mapping.get(community_display_name, "mam2bebe")
+# 동시에 진행할 추측 생성 수 제한
+_speculation_slots = threading.Semaphore(settings.SPECULATIVE_MAX_INFLIGHT)
+
+
+# 커뮤니티 매핑 함수: 커뮤니티 표시명을 프롬프트 키로 변환
+def get_community_key(community_display_name: str) -> str:
+    community_mapping = {name: key for key, name in COMMUNITY_DISPLAY_NAMES.items()}
+    return community_mapping.get(community_display_name, COMMUNITY_KEYS[0])
 
 
 # 커뮤니티 매핑 함수: 프롬프트 키를 커뮤니티 표시명으로 변환
 def get_community_display_name(community_key: str) -> str:
-    display_mapping = {
-        "mam2bebe": "맘이베베",
-        "ppomppu": "뽐뿌",
-        "fmkorea": "에펨코리아"
-    }
-    return display_mapping.get(community_key, "맘이베베")
+    return COMMUNITY_DISPLAY_NAMES.get(community_key, COMMUNITY_DISPLAY_NAMES[COMMUNITY_KEYS[0]])
 
 
-# 문구 생성 요청 함수
-def generate_viral_copy(user_id: str, product_data: Dict[str, Any]) -> Dict[str, Any]:
+# 사용자 소속 팀 조회 (스케줄러의 팀별 공정 대기열에 사용)
+def get_user_team(user_id: str) -> Optional[str]:
+    user = get_user(user_id) if user_id else None
+    return user['team_name'] if user else None
+
+
+# 헤지로 결과를 버린 호출의 토큰 사용량 기록 콜백 (generation_type="hedge", 응답 반환 후 호출될 수 있음)
+def _discarded_usage_recorder(user_id: str, team_name: Optional[str],
+                              community_key: str) -> Callable[[Dict[str, Any]], None]:
+    return lambda result: _record_usage(user_id, team_name, community_key, "hedge", result)
+
+
+# 토큰 사용량 기록 (병합된 호출의 후속 요청은 비용이 없으므로 제외)
+def _record_usage(user_id: str, team_name: Optional[str], community_key: str,
+                  generation_type: str, result: Dict[str, Any]):
+    usage = result.get("usage")
+    if not usage or result.get("coalesced"):
+        return
+    try:
+        record_usage(
+            user_id=user_id,
+            team_name=team_name,
+            community_key=community_key,
+            generation_type=generation_type,
+            model=result.get("model"),
+            usage=usage,
+            prompt_version=result.get("prompt_version")
+        )
+    except Exception as e:
+        logger.error(f"[_record_usage] Failed to record usage: user_id={user_id}, error={str(e)}")
+
+
+# 베스트 사례를 스타일 다이제스트로 교체 (사례별로 한 번만 분석 후 재사용)
+def _with_best_case_digest(product_data: Dict[str, Any]) -> Dict[str, Any]:
+    best_case = product_data.get("best_case")
+    if not settings.BEST_CASE_DIGEST_ENABLED or not best_case or not best_case.strip():
+        return product_data
+
+    try:
+        key = content_hash(best_case)
+        digest = get_best_case_digest(key)
+        if digest is None:
+            digest = build_digest(best_case)
+            save_best_case_digest(key, digest, post_id=product_data.get("best_case_id"))
+            logger.info(f"[_with_best_case_digest] Digest created: hash={key[:12]}, chars={digest['chars']}")
+    except Exception as e:
+        logger.error(f"[_with_best_case_digest] Failed to load digest, using original best_case: {str(e)}")
+        return product_data
+
+    return {**product_data, "best_case": format_digest(digest)}
+
+
+# 멱등성 키 생성: 세션 + 작업 종류 + 폼 상태 해시
+def make_idempotency_key(session_id: str, operation: str, payload: Dict[str, Any]) -> str:
+    serialized = json.dumps(payload, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(f"{session_id}:{operation}:{serialized}".encode("utf-8")).hexdigest()
+
+
+# 멱등성 키 기반 실행: 같은 키로 이미 처리된 요청이면 저장된 결과를 그대로 반환
+def _run_idempotent(idempotency_key: Optional[str], user_id: str, operation: str,
+                    fn: Callable[[], Dict[str, Any]],
+                    context: Optional[RequestContext] = None) -> Dict[str, Any]:
+    if not idempotency_key:
+        return fn()
     
-    # 1. 사용자 입력 정보 저장
-    input_id = create_user_input(
-        user_id=user_id,
-        product_name=product_data.get("product_name", ""),
-        price=product_data.get("price"),
-        product_attribute=product_data.get("product_attribute"),
-        event=product_data.get("event"),
-        card=product_data.get("card"),
-        coupon=product_data.get("coupon"),
-        keyword=product_data.get("keyword"),
-        etc=product_data.get("etc"),
-        community=product_data.get("community", ""),
-        best_case=product_data.get("best_case")
+    existing = claim_idempotency_key(idempotency_key, user_id, operation, settings.IDEMPOTENCY_TTL)
+    if existing is not None:
+        result = existing['result'] if existing['status'] == 'completed' else _wait_for_idempotent_result(idempotency_key, context)
+        # 앞선 실행이 취소/실패로 키를 반납했으면 이 요청이 이어서 실행
+        if result is None and get_idempotency_key(idempotency_key) is None:
+            existing = claim_idempotency_key(idempotency_key, user_id, operation, settings.IDEMPOTENCY_TTL)
+            # 다시 선점하는 사이 다른 실행이 먼저 완료했으면 저장된 결과 사용
+            if existing is not None and existing['status'] == 'completed':
+                result = existing['result']
+    if existing is not None:
+        if result is None:
+            return {"error": "같은 요청이 아직 처리 중입니다. 잠시 후 다시 시도해주세요."}
+        logger.info(f"[_run_idempotent] Replayed stored result: user_id={user_id}, operation={operation}")
+        return {**result, "replayed": True}
+    
+    try:
+        result = fn()
+    except Exception:
+        release_idempotency_key(idempotency_key)
+        raise
+    
+    # 실패 응답과 데드라인 초과로 이전 결과를 돌려준 응답은 저장하지 않음 (재시도 허용)
+    # 실패 기록도 generate_id를 가지므로 모델 호출 성공 여부(success)로 판단
+    if result.get("success") and not result.get("cached"):
+        complete_idempotency_key(idempotency_key, result)
+    else:
+        release_idempotency_key(idempotency_key)
+    return result
+
+
+# 다른 실행이 처리 중인 요청 결과 대기
+def _wait_for_idempotent_result(idempotency_key: str,
+                                context: Optional[RequestContext] = None) -> Optional[Dict[str, Any]]:
+    deadline = time.monotonic() + settings.REQUEST_DEADLINE
+    if context is not None:
+        deadline = min(deadline, context.deadline)
+    while time.monotonic() < deadline:
+        record = get_idempotency_key(idempotency_key)
+        if record is None:
+            return None
+        if record['status'] == 'completed':
+            return record['result']
+        if context is not None:
+            if context.wait(0.5):
+                return None
+        else:
+            time.sleep(0.5)
+    return None
+
+
+# 문구 생성 요청 함수
+# on_queue_update: 대기열 순번/대기 시간 콜백 (UI 표시용)
+# idempotency_key: 같은 키의 반복 요청은 모델 호출 없이 저장된 결과 반환
+# context: 요청 시간 예산 (초과 시 부분 결과 또는 같은 입력의 이전 결과 반환)
+def generate_viral_copy(user_id: str, product_data: Dict[str, Any],
+                        on_queue_update: Optional[Callable[[int, float], None]] = None,
+                        idempotency_key: Optional[str] = None,
+                        context: Optional[RequestContext] = None) -> Dict[str, Any]:
+    return _run_idempotent(
+        idempotency_key, user_id, "generate",
+        lambda: _generate_viral_copy(user_id, product_data, on_queue_update, context),
+        context
     )
+
+
+# 취소된 요청 응답 (생성 결과는 저장하지 않음)
+def _cancelled_result(user_id: str, operation: str, context: RequestContext) -> Dict[str, Any]:
+    logger.info(f"[{operation}] Generation cancelled, result discarded: user_id={user_id}, reason={context.cancel_reason}")
+    return {"error": "요청이 취소되었습니다", "cancelled": True, "cancel_reason": context.cancel_reason}
+
+
+# 데드라인 초과 시 같은 입력으로 생성했던 최근 결과 조회 (실패 기록은 제외)
+def _find_cached_generation(user_id: str, product_data: Dict[str, Any],
+                            context: Optional[RequestContext] = None) -> Optional[Dict[str, Any]]:
+    try:
+        for content in get_recent_contents_by_product(user_id, product_data, context=context):
+            contents = content['generated_contents']
+            if contents and contents[0].get('tone') != '생성 실패':
+                return content
+    except Exception as e:
+        logger.error(f"[_find_cached_generation] Failed to load cached generation: user_id={user_id}, error={str(e)}")
+    return None
+
+
+def _generate_viral_copy(user_id: str, product_data: Dict[str, Any],
+                         on_queue_update: Optional[Callable[[int, float], None]] = None,
+                         context: Optional[RequestContext] = None) -> Dict[str, Any]:
+    if context is not None and context.cancelled:
+        return _cancelled_result(user_id, "generate_viral_copy", context)
     
-    # 2. AI 서비스를 사용한 콘텐츠 생성
+    # 1. AI 서비스를 사용한 콘텐츠 생성
     community_key = product_data.get("community", "mam2bebe")
     
     
-    # AI 서비스 호출
-    result = ai_service.generate_product_content(
-        product_data=product_data,
-        community_key=community_key,
-        content_length="500",
-        user_id=user_id
-    )
+    # 미리 생성해 둔 결과가 있으면 사용 (토큰은 추측 생성 시 기록됨), 없으면 AI 서비스 호출
+    team_name = get_user_team(user_id)
+    result = _pop_speculative_result(user_id, community_key, product_data)
+    if result is None:
+        result = ai_service.generate_product_content(
+            product_data=_with_best_case_digest(product_data),
+            community_key=community_key,
+            content_length="500",
+            user_id=user_id,
+            team_name=team_name,
+            on_queue_update=on_queue_update,
+            context=context,
+            on_discarded_usage=_discarded_usage_recorder(user_id, team_name, community_key)
+        )
+        _record_usage(user_id, team_name, community_key, "viral_copy", result)
+    
+    # 취소된 요청은 콘텐츠로 저장하지 않음 (사용한 토큰은 위에서 기록)
+    if context is not None and context.cancelled:
+        return _cancelled_result(user_id, "generate_viral_copy", context)
+    
+    # 시간 예산 초과로 실패하면 같은 입력의 이전 결과로 응답 (새 기록은 남기지 않음)
+    if not result['success'] and result.get('deadline_exceeded'):
+        cached = _find_cached_generation(user_id, product_data, context)
+        if cached:
+            logger.info(f"[generate_viral_copy] Deadline exceeded, returning cached generation: user_id={user_id}, content_id={cached['id']}")
+            return {
+                "success": True,
+                "generate_id": cached['id'],
+                "input_id": cached['input_id'],
+                "generated_contents": cached['generated_contents'],
+                "queue_wait": result.get("queue_wait", 0.0),
+                "cached": True,
+                "deadline_exceeded": True
+            }
+        # 이전 결과도 없으면 기록 없이 오류 응답 (실패 기록을 남기지 않아 다시 시도 가능)
+        logger.info(f"[generate_viral_copy] Deadline exceeded, no cached generation: user_id={user_id}")
+        return {
+            "success": False,
+            "error": "응답이 늦어져 원고를 생성하지 못했습니다. 잠시 후 다시 시도해주세요.",
+            "queue_wait": result.get("queue_wait", 0.0),
+            "deadline_exceeded": True
+        }
     
     if result['success']:
         generated_contents = result.get('generated_contents', [{
@@ -76,26 +265,140 @@ def generate_viral_copy(user_id: str, product_data: Dict[str, Any]) -> Dict[str,
         # 콘텐츠 생성 실패 추적 로그
         logger.error(f"[generate_viral_copy] Content generation failed: user_id={user_id}, error={result.get('error', 'Unknown error')}")
     
+    # 2. 사용자 입력 정보 저장 (모델 결과를 기록할 때만 저장, 캐시/오류 응답은 입력 기록을 남기지 않음)
+    input_id = create_user_input(
+        user_id=user_id,
+        product_name=product_data.get("product_name", ""),
+        price=product_data.get("price"),
+        product_attribute=product_data.get("product_attribute"),
+        event=product_data.get("event"),
+        card=product_data.get("card"),
+        coupon=product_data.get("coupon"),
+        keyword=product_data.get("keyword"),
+        etc=product_data.get("etc"),
+        community=product_data.get("community", ""),
+        best_case=product_data.get("best_case"),
+        context=context
+    )
+    
     # 3. 콘텐츠 생성 기록 저장 (input_id 사용)
     content_id = create_content(
         input_id=input_id,
         parent_generate_id=None,
         generation_type="viral_copy",
         product_info=product_data,
-        attributes={"community": community_key},
-        generated_contents=generated_contents
+        attributes={
+            "community": community_key,
+            "prompt_version": result.get("prompt_version"),
+            "model_tier": result.get("model_tier", 0),
+            "tone_models": result.get("tone_models", {}),
+            "partial": result.get("partial", False),
+            "speculative": result.get("speculative", False)
+        },
+        generated_contents=generated_contents,
+        context=context
     )
     
     # 콘텐츠 생성 성공 추적 로그 (content_id 생성 후)
     if result['success']:
         logger.info(f"[generate_viral_copy] Content generation successful: user_id={user_id}, content_id={content_id}")
+        # 미리 생성된 결과를 쓴 경우 나머지 커뮤니티는 이미 추측 생성을 시도했으므로 다시 시작하지 않음
+        if not result.get("speculative"):
+            _start_speculation(user_id, team_name, product_data)
     
     return {
+        "success": result['success'],
+        "error": None if result['success'] else result.get('error', 'Unknown error'),
         "generate_id": content_id,
         "input_id": input_id,
-        "generated_contents": generated_contents
+        "generated_contents": generated_contents,
+        "queue_wait": result.get("queue_wait", 0.0),
+        "partial": result.get("partial", False),
+        "deadline_exceeded": result.get("deadline_exceeded", False),
+        "speculative": result.get("speculative", False)
     }
 
+
+# 배치 생성용 문구 생성 (결과 저장은 호출 측에서 여러 행을 모아 한 트랜잭션으로 처리)
+# 사용 토큰은 generation_type="batch"로 따로 기록
+def generate_batch_copy(user_id: str, team_name: Optional[str], product_data: Dict[str, Any],
+                        context: Optional[RequestContext] = None) -> Dict[str, Any]:
+    community_key = product_data.get("community", "mam2bebe")
+    result = ai_service.generate_product_content(
+        product_data=_with_best_case_digest(product_data),
+        community_key=community_key,
+        content_length="500",
+        user_id=user_id,
+        team_name=team_name,
+        context=context,
+        on_discarded_usage=_discarded_usage_recorder(user_id, team_name, community_key)
+    )
+    _record_usage(user_id, team_name, community_key, "batch", result)
+    return result
+
+
+# 미리 생성해 둔 다른 커뮤니티 결과 조회 (없거나 추측 생성 비활성화면 None)
+def _pop_speculative_result(user_id: str, community_key: str,
+                            product_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    if not settings.SPECULATIVE_ENABLED:
+        return None
+    result = generation_cache.pop(generation_cache.key_for(user_id, community_key, product_data))
+    if result is None:
+        return None
+    logger.info(f"[generate_viral_copy] Speculative result used: user_id={user_id}, community_key={community_key}")
+    return {**result, "speculative": True}
+
+
+# 추측 생성 시작: 같은 입력으로 다른 커뮤니티 문구를 백그라운드에서 미리 생성
+# 사용자가 커뮤니티만 바꿔 다시 생성하면 결과를 바로 보여줄 수 있도록 생성 결과 캐시에 보관한다.
+def _start_speculation(user_id: str, team_name: Optional[str], product_data: Dict[str, Any]):
+    if not settings.SPECULATIVE_ENABLED or not _speculation_slots.acquire(blocking=False):
+        return
+    threading.Thread(target=_speculate, args=(user_id, team_name, product_data),
+                     name="speculative-generation", daemon=True).start()
+
+
+# 다른 커뮤니티 문구 미리 생성 (여유 용량이 없어지면 중단)
+# 사용 토큰은 generation_type="speculative"로 따로 기록
+def _speculate(user_id: str, team_name: Optional[str], product_data: Dict[str, Any]):
+    try:
+        for community_key in COMMUNITY_KEYS:
+            if community_key == product_data.get("community"):
+                continue
+            if not ai_service.has_spare_capacity(settings.SPECULATIVE_HEADROOM):
+                logger.info(f"[_speculate] No spare capacity, speculation stopped: user_id={user_id}, community_key={community_key}")
+                return
+            
+            key = generation_cache.key_for(user_id, community_key, product_data)
+            if not generation_cache.reserve(key):
+                continue
+            
+            stored = False
+            try:
+                result = ai_service.generate_product_content(
+                    product_data=_with_best_case_digest({**product_data, "community": community_key}),
+                    community_key=community_key,
+                    content_length="500",
+                    user_id=user_id,
+                    team_name=SPECULATIVE_TEAM,
+                    context=RequestContext("speculative", timeout=settings.SPECULATIVE_TIMEOUT),
+                    on_discarded_usage=_discarded_usage_recorder(user_id, team_name, community_key)
+                )
+                _record_usage(user_id, team_name, community_key, "speculative", result)
+                
+                # 부분 결과는 보관하지 않음 (실제 요청에서 다시 생성)
+                if result['success'] and not result.get('partial'):
+                    generation_cache.put(key, result, tokens=(result.get("usage") or {}).get("total_tokens", 0))
+                    stored = True
+                    logger.info(f"[_speculate] Speculative result cached: user_id={user_id}, community_key={community_key}")
+            finally:
+                if not stored:
+                    generation_cache.release(key)
+    except Exception as e:
+        logger.error(f"[_speculate] Speculative generation failed: user_id={user_id}, error={str(e)}")
+    finally:
+        _speculation_slots.release()
+
 # 결과물 채택 기록 (복사 버튼 클릭 시 호출)
 def copy_action(user_id: str, generate_id: str, version_id: str, tone: str = None) -> bool:
     # 톤 선택 추적 로그 (분석용)
@@ -113,17 +416,49 @@ def user_feedback(user_id: str, feedback_text: str, rating: int = 5) -> bool:
         return False
 
 # 재생성 요청
-def regenerate_copy(user_id: str, generate_id: str, reason_text: str) -> Dict[str, Any]:
+# tone_ids: 재생성할 콘텐츠 id 집합 (None이면 전체 톤 재생성)
+def regenerate_copy(user_id: str, generate_id: str, reason_text: str,
+                    tone_ids: Optional[Set[int]] = None,
+                    on_queue_update: Optional[Callable[[int, float], None]] = None,
+                    idempotency_key: Optional[str] = None,
+                    context: Optional[RequestContext] = None) -> Dict[str, Any]:
+    return _run_idempotent(
+        idempotency_key, user_id, "regenerate",
+        lambda: _regenerate_copy(user_id, generate_id, reason_text, tone_ids, on_queue_update, context),
+        context
+    )
+
+
+def _regenerate_copy(user_id: str, generate_id: str, reason_text: str,
+                     tone_ids: Optional[Set[int]] = None,
+                     on_queue_update: Optional[Callable[[int, float], None]] = None,
+                     context: Optional[RequestContext] = None) -> Dict[str, Any]:
+    if context is not None and context.cancelled:
+        return _cancelled_result(user_id, "regenerate_copy", context)
+    
     # 원본 생성 정보 조회 (이전 생성 또는 최초 생성)
-    original_content = get_content(generate_id)
+    original_content = get_content(generate_id, context=context)
     if not original_content:
         return {"error": "Original content not found"}
     
-    # 재생성용 product_data 구성
+    parent_contents = original_content['generated_contents']
+    
+    # 재생성 대상 톤 선택 (지정하지 않으면 전체)
+    if tone_ids:
+        target_contents = [c for c in parent_contents if c.get('id') in tone_ids]
+    else:
+        target_contents = parent_contents
+    if not target_contents:
+        return {"error": "No tones selected for regeneration"}
+    
+    target_tones = [c['tone'] for c in target_contents]
+    
+    # 재생성용 product_data 구성 (대상 톤의 이전 문구만 전달)
     product_data = {
         **original_content['product_info'],
         "regenerate_reason": reason_text,
-        "previous_contents": original_content['generated_contents']
+        "previous_contents": target_contents,
+        "target_tones": ", ".join(target_tones)
     }
     
     # 커뮤니티 정보 추출 및 매핑
@@ -131,51 +466,129 @@ def regenerate_copy(user_id: str, generate_id: str, reason_text: str) -> Dict[st
     
     regenerate_community = f"regenerate_{community_key}"
     
+    team_name = get_user_team(user_id)
     result = ai_service.generate_product_content(
-        product_data=product_data,
+        product_data=_with_best_case_digest(product_data),
         community_key=regenerate_community,
-        user_id=user_id
+        user_id=user_id,
+        team_name=team_name,
+        on_queue_update=on_queue_update,
+        context=context,
+        on_discarded_usage=_discarded_usage_recorder(user_id, team_name, regenerate_community)
     )
+    _record_usage(user_id, team_name, regenerate_community, "regenerate", result)
     
+    # 취소된 요청은 콘텐츠로 저장하지 않음 (사용한 토큰은 위에서 기록)
+    if context is not None and context.cancelled:
+        return _cancelled_result(user_id, "regenerate_copy", context)
+    
+    # 시간 예산 초과로 실패하면 현재 문구를 그대로 유지 (새 기록은 남기지 않음)
+    if not result['success'] and result.get('deadline_exceeded'):
+        logger.info(f"[regenerate_copy] Deadline exceeded, keeping current contents: user_id={user_id}, content_id={generate_id}")
+        return {
+            "success": True,
+            "generate_id": generate_id,
+            "input_id": original_content['input_id'],
+            "generated_contents": parent_contents,
+            "queue_wait": result.get("queue_wait", 0.0),
+            "cached": True,
+            "deadline_exceeded": True
+        }
+    
+    # 응답에 없는 대상 톤 확인 (원본이 톤 구분 없는 원문이면 전체 톤을 요청했으므로 전체 톤 기준)
+    tone_names = [name for _, name in TONE_ORDER]
+    expected_tones = [tone for tone in target_tones if tone in tone_names] or tone_names
+    missing_tones = []
     if result['success']:
-        generated_contents = result.get('generated_contents', [{
+        regenerated = result.get('generated_contents', [{
             'id': 1,
             'tone': 'AI 재생성',
             'text': result['content']
         }])
+        regenerated_tones = {c['tone'] for c in regenerated}
+        missing_tones = [tone for tone in expected_tones if tone not in regenerated_tones]
+        
+        # 대상 톤을 하나도 받지 못하면 (JSON 복구 실패 포함) 이전 문구를 재생성 결과로 보여주지 않고 실패 처리
+        if len(missing_tones) == len(expected_tones):
+            result = {**result, "success": False, "error": "재생성 응답에서 선택한 톤을 찾지 못했습니다"}
+            missing_tones = []
+    
+    if result['success']:
+        # 재생성된 콘텐츠에 이유 추가
+        for content in regenerated:
+            content["regenerate_reason"] = reason_text
+        
+        # 대상 톤만 교체하고 나머지 톤(응답에 없는 대상 톤 포함)은 원본에서 그대로 유지
+        if any(c['tone'] in tone_names for c in parent_contents):
+            generated_contents = _merge_regenerated_contents(parent_contents, target_contents, regenerated)
+        else:
+            generated_contents = regenerated
+        if missing_tones:
+            logger.info(f"[regenerate_copy] Regeneration partial, tones kept from parent: user_id={user_id}, content_id={generate_id}, missing_tones={missing_tones}")
     else:
         generated_contents = [{
             'id': 1,
             'tone': '재생성 실패',
-            'text': f"재생성 실패: {result.get('error', 'Unknown error')}"
+            'text': f"재생성 실패: {result.get('error', 'Unknown error')}",
+            'regenerate_reason': reason_text
         }]
         logger.error(f"[regenerate_copy] Regeneration failed: user_id={user_id}, error={result.get('error', 'Unknown error')}")
     
-    # 재생성된 콘텐츠에 이유 추가
-    for content in generated_contents:
-        content["regenerate_reason"] = reason_text
-    
     # 새로운 콘텐츠 생성 기록 저장
     content_id = create_content(
         input_id=original_content['input_id'],
         parent_generate_id=generate_id,
         generation_type="regenerate",
         product_info=product_data,
-        attributes={"community": community_key, "regenerate_reason": reason_text},
+        attributes={
+            "community": community_key,
+            "regenerate_reason": reason_text,
+            "regenerated_tones": [tone for tone in target_tones if tone not in missing_tones],
+            "missing_tones": missing_tones,
+            "prompt_version": result.get("prompt_version"),
+            "model_tier": result.get("model_tier", 0),
+            "tone_models": result.get("tone_models", {}),
+            "partial": result.get("partial", False) or bool(missing_tones)
+        },
         generated_contents=generated_contents,
-        reason=reason_text
+        reason=reason_text,
+        context=context
     )
     
     # 재생성 성공 추적 로그 (content_id 생성 후)
     if result['success']:
-        logger.info(f"[regenerate_copy] Regeneration successful: user_id={user_id}, new_content_id={content_id}")
+        logger.info(f"[regenerate_copy] Regeneration successful: user_id={user_id}, new_content_id={content_id}, tones={len(target_tones)}/{len(parent_contents)}")
     
     return {
+        "success": result['success'],
+        "error": None if result['success'] else result.get('error', 'Unknown error'),
         "generate_id": content_id,
         "input_id": original_content['input_id'],
-        "generated_contents": generated_contents
+        "generated_contents": generated_contents,
+        "queue_wait": result.get("queue_wait", 0.0),
+        "partial": result.get("partial", False) or bool(missing_tones),
+        # 응답에 없어 이전 문구를 유지한 대상 톤
+        "missing_tones": missing_tones,
+        "deadline_exceeded": result.get("deadline_exceeded", False)
     }
 
+
+# 선택 재생성 결과 병합: 톤 이름 기준으로 대상 톤만 교체 (콘텐츠 id는 원본 유지)
+def _merge_regenerated_contents(parent_contents: List[Dict[str, Any]],
+                                target_contents: List[Dict[str, Any]],
+                                regenerated: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    regenerated_by_tone = {c['tone']: c for c in regenerated}
+    target_ids = {c['id'] for c in target_contents}
+    
+    merged = []
+    for content in parent_contents:
+        new_content = regenerated_by_tone.get(content['tone'])
+        if content['id'] in target_ids and new_content:
+            merged.append({**new_content, 'id': content['id']})
+        else:
+            merged.append(dict(content))
+    return merged
+
 # 사용자의 콘텐츠 생성 이력 조회
 def get_user_content_history(user_id: str, limit: int = 5) -> List[Dict[str, Any]]:
     return get_user_contents(user_id, limit)
@@ -0,0 +1,98 @@
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+from core.config import settings
+
+
+# 생성 결과 캐시 (추측 생성 결과 보관)
+# 사용자가 다른 커뮤니티로 바꿔 같은 상품을 생성하면 미리 만들어 둔 결과를 모델 호출 없이 사용한다.
+# 결과는 한 번 사용하면 제거하고, ttl이 지나거나 용량을 넘으면 버린다 (버린 결과의 토큰은 낭비로 집계).
+class GenerationCache:
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # 생성 중인 키 (같은 키의 중복 추측 생성 방지)
+        self._pending = set()
+        self._stats = {"stored": 0, "hits": 0, "misses": 0, "expired": 0, "evicted": 0,
+                       "stored_tokens": 0, "hit_tokens": 0, "wasted_tokens": 0}
+
+    # 캐시 키: 사용자 + 커뮤니티 + 커뮤니티를 제외한 입력 필드
+    @staticmethod
+    def key_for(user_id: str, community_key: str, product_data: Dict[str, Any]) -> str:
+        fields = {key: value for key, value in product_data.items() if key != "community"}
+        serialized = json.dumps(fields, ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha256(f"{user_id}:{community_key}:{serialized}".encode("utf-8")).hexdigest()
+
+    # 만료된 항목 제거 (락 안에서 호출)
+    def _purge(self, now: float):
+        for key in [key for key, entry in self._entries.items() if entry["expires_at"] <= now]:
+            self._discard(key, "expired")
+
+    def _discard(self, key: str, reason: str):
+        entry = self._entries.pop(key)
+        self._stats[reason] += 1
+        self._stats["wasted_tokens"] += entry["tokens"]
+
+    # 생성 시작 예약: 이미 결과가 있거나 생성 중이면 False
+    def reserve(self, key: str) -> bool:
+        with self._lock:
+            self._purge(time.monotonic())
+            if key in self._entries or key in self._pending:
+                return False
+            self._pending.add(key)
+            return True
+
+    # 예약 해제 (생성 실패/중단 시)
+    def release(self, key: str):
+        with self._lock:
+            self._pending.discard(key)
+
+    # 결과 저장 (tokens: 결과 생성에 사용한 토큰, 사용되지 않으면 낭비로 집계)
+    def put(self, key: str, result: Dict[str, Any], tokens: int = 0):
+        with self._lock:
+            self._pending.discard(key)
+            if key in self._entries:
+                self._discard(key, "evicted")
+            self._entries[key] = {"result": result, "tokens": tokens,
+                                  "expires_at": time.monotonic() + self.ttl}
+            self._stats["stored"] += 1
+            self._stats["stored_tokens"] += tokens
+            while len(self._entries) > self.max_entries:
+                self._discard(next(iter(self._entries)), "evicted")
+
+    # 결과 꺼내기 (한 번만 사용), 없으면 None
+    def pop(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._purge(time.monotonic())
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats["hits"] += 1
+            self._stats["hit_tokens"] += entry["tokens"]
+            return entry["result"]
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            self._purge(time.monotonic())
+            stored = self._stats["stored"]
+            return dict(
+                self._stats,
+                entries=len(self._entries),
+                pending=len(self._pending),
+                hit_ratio=round(self._stats["hits"] / stored, 3) if stored else 0.0
+            )
+
+
+# 전역 인스턴스 생성
+generation_cache = GenerationCache(
+    max_entries=settings.SPECULATIVE_CACHE_SIZE,
+    ttl=settings.SPECULATIVE_CACHE_TTL
+)
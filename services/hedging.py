@@ -0,0 +1,94 @@
+import threading
+from collections import deque
+from typing import Dict, Any, Optional
+
+from core.config import settings
+
+# 헤지 예산 최대 적립량 (순간적으로 몰리는 헤지 요청 상한)
+MAX_HEDGE_CREDIT = 5.0
+
+
+# 헤지 요청 취소 (상대 요청이 먼저 끝나 공급자 호출 전에 중단한 경우)
+class HedgeCancelledError(Exception):
+    pass
+
+
+# 헤지 정책: community_key별 최근 응답 지연 분포의 백분위를 넘기면 동일 요청을 한 번 더 보냄
+# 헤지 요청 수는 일반 요청 수의 max_ratio 이내로 제한 (요청마다 예산 적립, 헤지마다 1 차감)
+class HedgePolicy:
+    def __init__(self, enabled: bool, percentile: float = 0.9, min_samples: int = 20,
+                 min_delay: float = 2.0, max_ratio: float = 0.1, window: int = 200):
+        self.enabled = enabled
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.max_ratio = max_ratio
+        self.window = window
+
+        self._lock = threading.Lock()
+        self._latencies: Dict[str, deque] = {}
+        self._credit = 1.0
+        self._stats = {"requests": 0, "hedged": 0, "hedge_wins": 0, "primary_wins": 0,
+                       "both_failed": 0, "suppressed": 0}
+
+    # 공급자 응답 지연 기록 (성공한 호출만)
+    def record_latency(self, key: Optional[str], seconds: float):
+        if not key:
+            return
+        with self._lock:
+            self._latencies.setdefault(key, deque(maxlen=self.window)).append(seconds)
+
+    # 백분위 지연 (표본이 부족하면 None)
+    def _quantile(self, key: str) -> Optional[float]:
+        samples = self._latencies.get(key)
+        if not samples or len(samples) < self.min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * self.percentile))]
+
+    # 헤지 대기 시간 (비활성화 또는 표본 부족이면 None), 호출 시 헤지 예산 적립
+    def delay_for(self, key: Optional[str]) -> Optional[float]:
+        if not self.enabled or not key:
+            return None
+        with self._lock:
+            self._stats["requests"] += 1
+            self._credit = min(MAX_HEDGE_CREDIT, self._credit + self.max_ratio)
+            quantile = self._quantile(key)
+        return max(self.min_delay, quantile) if quantile is not None else None
+
+    # 헤지 예산 차감 (부족하면 False)
+    def try_acquire(self) -> bool:
+        with self._lock:
+            if self._credit >= 1.0:
+                self._credit -= 1.0
+                self._stats["hedged"] += 1
+                return True
+            self._stats["suppressed"] += 1
+            return False
+
+    # 헤지 결과 기록: "hedge" / "primary" / "both_failed"
+    def record_outcome(self, winner: str):
+        key = {"hedge": "hedge_wins", "primary": "primary_wins"}.get(winner, "both_failed")
+        with self._lock:
+            self._stats[key] += 1
+
+    # 일시적으로 헤지를 막은 경우 (스케줄러 여유 없음)
+    def record_suppressed(self):
+        with self._lock:
+            self._stats["suppressed"] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            thresholds = {key: round(value, 2) for key in self._latencies
+                          if (value := self._quantile(key)) is not None}
+            return dict(self._stats, enabled=self.enabled, credit=round(self._credit, 2), thresholds=thresholds)
+
+
+# 전역 인스턴스 생성
+hedge_policy = HedgePolicy(
+    enabled=settings.HEDGE_ENABLED,
+    percentile=settings.HEDGE_PERCENTILE,
+    min_samples=settings.HEDGE_MIN_SAMPLES,
+    min_delay=settings.HEDGE_MIN_DELAY,
+    max_ratio=settings.HEDGE_MAX_RATIO
+)
@@ -0,0 +1,244 @@
+import os
+import time
+import socket
+import threading
+from typing import Dict, Any, List, Optional, Set
+
+from core.config import settings
+from database.crud import (
+    create_job, claim_next_job, update_job_progress, finish_job, get_job, get_job_counts,
+    cancel_job, get_cancelled_job_ids, renew_job_leases
+)
+from services.content_service import generate_viral_copy, regenerate_copy
+from utils.get_logger import logger
+from utils.request_context import RequestContext
+
+# 작업 종류
+JOB_GENERATE = "generate"
+JOB_REGENERATE = "regenerate"
+
+
+# 생성 작업 워커 풀
+# 작업은 jobs 테이블에 저장되므로 Streamlit 재실행/화면 이동과 무관하게 끝까지 실행되고,
+# 임대가 만료된 작업은 다른 워커(재시작한 프로세스 포함)가 이어서 실행한다.
+# LLM 호출 대기가 대부분이라 스레드로 실행하며, 여러 프로세스에서 워커를 띄워도 작업 선점은 DB에서 직렬화된다.
+# 실행 중인 작업은 임대를 주기적으로 연장하므로 임대 시간보다 오래 걸려도 다른 워커가 중복 실행하지 않는다.
+# 취소된 작업은 DB에 cancelled로 기록되고, 실행 중이면 요청 컨텍스트를 취소해 이후 단계(대기열, 재시도, 재요청)를 중단한다.
+class JobWorkerPool:
+    def __init__(self, workers: int, poll_interval: float, lease_ttl: float, max_attempts: int):
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.lease_ttl = lease_ttl
+        self.max_attempts = max_attempts
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._threads: List[threading.Thread] = []
+        # 실행 중인 작업의 요청 컨텍스트 (작업 ID -> 컨텍스트)
+        self._running: Dict[str, RequestContext] = {}
+        # 실행 중인 작업의 워커 (작업 ID -> 워커, 임대 연장용)
+        self._leases: Dict[str, str] = {}
+        self._stats = {"completed": 0, "failed": 0, "cancelled": 0, "busy": 0}
+
+    # 워커 시작 (이미 실행 중이면 무시)
+    def start(self):
+        with self._lock:
+            if self._threads or self.workers <= 0:
+                return
+            prefix = f"{socket.gethostname()}:{os.getpid()}"
+            for index in range(self.workers):
+                thread = threading.Thread(target=self._run, args=(f"{prefix}:{index}",),
+                                          name=f"job-worker-{index}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+            watcher = threading.Thread(target=self._watch_running, name="job-watcher", daemon=True)
+            watcher.start()
+        logger.info(f"[JobWorkerPool] Started {self.workers} workers")
+
+    # 작업 등록 후 대기 중인 워커 깨우기
+    def submit(self, user_id: str, job_type: str, payload: Dict[str, Any]) -> str:
+        job_id = create_job(user_id, job_type, payload)
+        self._wakeup.set()
+        logger.info(f"[JobWorkerPool] Job submitted: job_id={job_id}, user_id={user_id}, job_type={job_type}")
+        return job_id
+
+    # 작업 취소: DB에 기록하고, 이 프로세스에서 실행 중이면 즉시 컨텍스트 취소
+    def cancel(self, job_id: str, reason: str) -> bool:
+        cancelled = cancel_job(job_id, reason)
+        with self._lock:
+            context = self._running.get(job_id)
+        if context is not None:
+            context.cancel(reason)
+        if cancelled:
+            logger.info(f"[JobWorkerPool] Job cancelled: job_id={job_id}, reason={reason}")
+        return cancelled
+
+    # 실행 중인 작업 감시: 다른 프로세스에서 취소한 작업 감지, 임대 시간의 1/3마다 임대 연장
+    def _watch_running(self):
+        renewed_at = time.monotonic()
+        while True:
+            time.sleep(self.poll_interval)
+            with self._lock:
+                running = dict(self._running)
+                leases = dict(self._leases)
+            if not running:
+                continue
+            try:
+                for job_id in get_cancelled_job_ids(list(running)):
+                    running[job_id].cancel("cancelled")
+            except Exception as e:
+                logger.error(f"[JobWorkerPool] Failed to check cancelled jobs: {str(e)}")
+            if time.monotonic() - renewed_at < self.lease_ttl / 3:
+                continue
+            try:
+                renew_job_leases(leases, self.lease_ttl)
+                renewed_at = time.monotonic()
+            except Exception as e:
+                logger.error(f"[JobWorkerPool] Failed to renew job leases: {str(e)}")
+
+    def _run(self, worker: str):
+        while True:
+            try:
+                job = claim_next_job(worker, self.lease_ttl, self.max_attempts)
+            except Exception as e:
+                logger.error(f"[JobWorkerPool] Failed to claim job: worker={worker}, error={str(e)}")
+                job = None
+
+            if job is None:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+
+            with self._lock:
+                self._stats["busy"] += 1
+            try:
+                self._execute(job, worker)
+            except Exception as e:
+                # 결과 기록 실패(DB 잠금 등)로 워커 스레드가 종료되지 않도록 기록만 하고 계속 실행
+                # 기록하지 못한 작업은 임대 만료 후 다시 실행됨
+                logger.error(f"[JobWorkerPool] Failed to record job result: job_id={job['id']}, worker={worker}, error={str(e)}")
+            finally:
+                with self._lock:
+                    self._stats["busy"] -= 1
+
+    # 작업 실행 및 결과 저장
+    def _execute(self, job: Dict[str, Any], worker: str):
+        job_id = job['id']
+        payload = job['payload']
+
+        # 요청 시간 예산: 화면에서 등록한 시점부터 계산 (다른 워커가 이어받은 작업은 새 예산)
+        timeout = payload.get("timeout", settings.GENERATION_SLO)
+        if job['attempts'] == 1:
+            timeout = max(timeout - (time.time() - job['created_at']), 0.0)
+        context = RequestContext(job['job_type'], timeout=timeout)
+        with self._lock:
+            self._running[job_id] = context
+            self._leases[job_id] = worker
+
+        def on_queue_update(position: int, waited: float):
+            try:
+                update_job_progress(job_id, {"queue_position": position, "queue_wait": round(waited, 1)})
+            except Exception as e:
+                logger.error(f"[JobWorkerPool] Failed to update progress: job_id={job_id}, error={str(e)}")
+
+        try:
+            result = self._dispatch(job, payload, context, on_queue_update)
+        except Exception as e:
+            logger.error(f"[JobWorkerPool] Job failed: job_id={job_id}, error={str(e)}")
+            finish_job(job_id, "failed", error=str(e))
+            self._count("failed")
+            return
+        finally:
+            with self._lock:
+                self._running.pop(job_id, None)
+                self._leases.pop(job_id, None)
+
+        if result.get("cancelled"):
+            finish_job(job_id, "cancelled", error=result.get("cancel_reason"))
+            self._count("cancelled")
+        elif result.get("success"):
+            finish_job(job_id, "completed", result=result)
+            self._count("completed")
+        else:
+            finish_job(job_id, "failed", result=result, error=result.get("error", "Unknown error"))
+            self._count("failed")
+
+    def _count(self, key: str):
+        with self._lock:
+            self._stats[key] += 1
+
+    # 작업 종류별 서비스 함수 호출
+    def _dispatch(self, job: Dict[str, Any], payload: Dict[str, Any], context: RequestContext,
+                  on_queue_update) -> Dict[str, Any]:
+        if job['job_type'] == JOB_GENERATE:
+            return generate_viral_copy(
+                user_id=job['user_id'],
+                product_data=payload["product_data"],
+                on_queue_update=on_queue_update,
+                idempotency_key=payload.get("idempotency_key"),
+                context=context
+            )
+        if job['job_type'] == JOB_REGENERATE:
+            return regenerate_copy(
+                user_id=job['user_id'],
+                generate_id=payload["generate_id"],
+                reason_text=payload["reason_text"],
+                tone_ids=set(payload["tone_ids"]) if payload.get("tone_ids") else None,
+                on_queue_update=on_queue_update,
+                idempotency_key=payload.get("idempotency_key"),
+                context=context
+            )
+        raise ValueError(f"Unknown job type: {job['job_type']}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats, workers=len(self._threads))
+        try:
+            stats["jobs"] = get_job_counts()
+        except Exception as e:
+            stats["jobs"] = {"error": str(e)}
+        return stats
+
+
+# 전역 인스턴스 생성
+job_worker_pool = JobWorkerPool(
+    workers=settings.JOB_WORKERS,
+    poll_interval=settings.JOB_POLL_INTERVAL,
+    lease_ttl=settings.JOB_LEASE_TTL,
+    max_attempts=settings.JOB_MAX_ATTEMPTS
+)
+
+
+# 문구 생성 작업 등록
+def submit_generation_job(user_id: str, product_data: Dict[str, Any],
+                          idempotency_key: Optional[str] = None,
+                          context: Optional[RequestContext] = None) -> str:
+    return job_worker_pool.submit(user_id, JOB_GENERATE, {
+        "product_data": product_data,
+        "idempotency_key": idempotency_key,
+        "timeout": context.timeout if context else settings.GENERATION_SLO
+    })
+
+
+# 재생성 작업 등록
+def submit_regeneration_job(user_id: str, generate_id: str, reason_text: str,
+                            tone_ids: Optional[Set[int]] = None,
+                            idempotency_key: Optional[str] = None,
+                            context: Optional[RequestContext] = None) -> str:
+    return job_worker_pool.submit(user_id, JOB_REGENERATE, {
+        "generate_id": generate_id,
+        "reason_text": reason_text,
+        "tone_ids": sorted(tone_ids) if tone_ids else None,
+        "idempotency_key": idempotency_key,
+        "timeout": context.timeout if context else settings.GENERATION_SLO
+    })
+
+
+# 작업 취소 (화면 이동, 로그아웃, 새 생성 요청 시)
+def cancel_generation_job(job_id: str, reason: str = "cancelled") -> bool:
+    return job_worker_pool.cancel(job_id, reason)
+
+
+# 작업 상태 조회 (화면 폴링용)
+def get_job_status(job_id: str) -> Optional[Dict[str, Any]]:
+    return get_job(job_id)
@@ -0,0 +1,156 @@
+import time
+import threading
+from typing import Dict, Any, Callable, Optional
+
+from core.config import settings
+from utils.get_logger import logger
+
+
+# 공급자를 만들 수 없어 예열/ping을 계속할 수 없음 (API 키 누락 등, 재시도해도 복구되지 않음)
+class TransportUnavailableError(Exception):
+    pass
+
+
+# 전송 계층 예열/유지
+# 시작 시 백그라운드에서 공급자를 초기화하고 연결(TLS/채널)을 열어 두고,
+# 실제 호출이 없는 동안 주기적으로 가벼운 요청(ping)을 보내 유휴 연결이 끊기지 않게 한다.
+# SDK 내부 연결 풀은 직접 볼 수 없으므로, 마지막 전송 활동(호출/ping)이 idle_timeout 이내인 호출을
+# 기존 연결 재사용으로 집계한다.
+class TransportKeepAlive:
+    def __init__(self, interval: float, idle_timeout: float, max_idle: float):
+        # ping 주기(초), 0이면 keepalive 비활성화
+        self.interval = interval
+        # 이 시간 이상 전송 활동이 없으면 연결이 끊긴 것으로 간주
+        self.idle_timeout = idle_timeout
+        # 실제 호출이 이 시간 이상 없으면 ping 중단 (다음 호출 후 재개)
+        self.max_idle = max_idle
+
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        # 프로세스당 한 번만 시작 (Streamlit 재실행마다 예열/ping을 반복하지 않도록)
+        self._started = False
+        self._last_activity: Optional[float] = None
+        self._last_call = time.monotonic()
+        # 연속 실패 횟수와 마지막 실패 시각 (실패 후에는 간격을 늘려 재시도)
+        self._failures = 0
+        self._last_failure: Optional[float] = None
+        self._unavailable = False
+        self._stats = {"warmups": 0, "warmup_failures": 0, "pings": 0, "ping_failures": 0,
+                       "reused_calls": 0, "cold_calls": 0}
+        self._latency_total = {"reused": 0.0, "cold": 0.0}
+        self._last_latency = {"warmup": None, "ping": None}
+
+    # 호출 시작: 기존 연결 재사용 여부
+    def begin_call(self) -> bool:
+        with self._lock:
+            return self._last_activity is not None and time.monotonic() - self._last_activity < self.idle_timeout
+
+    # 호출 종료 (성공/실패 모두 연결을 사용한 것으로 기록)
+    def end_call(self, reused: bool, latency: float):
+        now = time.monotonic()
+        kind = "reused" if reused else "cold"
+        with self._lock:
+            self._stats[f"{kind}_calls"] += 1
+            self._latency_total[kind] += latency
+            self._last_activity = now
+            self._last_call = now
+
+    # 예열/ping 실행 및 기록 (공급자를 만들 수 없으면 False를 반환해 중단)
+    def _run(self, kind: str, action: Callable[[], None]) -> bool:
+        started = time.monotonic()
+        try:
+            action()
+        except TransportUnavailableError as e:
+            with self._lock:
+                self._stats[f"{kind}_failures"] += 1
+                self._unavailable = True
+            logger.error(f"[TransportKeepAlive] {kind} failed, keepalive stopped: {e}")
+            return False
+        except Exception as e:
+            with self._lock:
+                self._stats[f"{kind}_failures"] += 1
+                self._failures += 1
+                self._last_failure = time.monotonic()
+                backoff = self._backoff()
+            logger.error(f"[TransportKeepAlive] {kind} failed: {e}, retry in {backoff:.0f}s")
+            return True
+
+        now = time.monotonic()
+        with self._lock:
+            self._stats[f"{kind}s"] += 1
+            self._last_latency[kind] = now - started
+            self._last_activity = now
+            self._failures = 0
+            self._last_failure = None
+        if kind == "warmup":
+            logger.info(f"[TransportKeepAlive] Transport warmed up in {now - started:.3f}s")
+        return True
+
+    # 실패 후 재시도 대기 시간: interval부터 연속 실패마다 2배 (max_idle 상한, 락 안에서 호출)
+    def _backoff(self) -> float:
+        return min(max(self.interval, 1.0) * 2 ** (self._failures - 1), self.max_idle)
+
+    # 다음 ping까지 대기 시간 (0이면 지금 ping, None이면 실제 호출이 오래 없어 중단 상태)
+    def _next_ping_in(self) -> Optional[float]:
+        with self._lock:
+            now = time.monotonic()
+            if now - self._last_call >= self.max_idle:
+                return None
+            if self._last_failure is not None:
+                return max(self._backoff() - (now - self._last_failure), 0.0)
+            if self._last_activity is None:
+                return 0.0
+            return max(self.interval - (now - self._last_activity), 0.0)
+
+    # 백그라운드 스레드 시작 (프로세스에서 이미 시작했거나 공급자를 만들 수 없으면 무시)
+    # warmup: 시작 시 1회 실행, ping: 유휴 interval마다 실행
+    def start(self, warmup: Optional[Callable[[], None]], ping: Callable[[], None]):
+        with self._lock:
+            if self._started or self._unavailable:
+                return
+            self._started = True
+        if warmup is None and self.interval <= 0:
+            return
+
+        def run():
+            if warmup is not None and not self._run("warmup", warmup):
+                return
+            while self.interval > 0:
+                wait = self._next_ping_in()
+                if wait is None:
+                    time.sleep(self.interval)
+                elif wait > 0:
+                    time.sleep(wait)
+                elif not self._run("ping", ping):
+                    return
+
+        with self._lock:
+            self._last_call = time.monotonic()
+        self._thread = threading.Thread(target=run, name="llm-keepalive", daemon=True)
+        self._thread.start()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            reused, cold = self._stats["reused_calls"], self._stats["cold_calls"]
+            idle = time.monotonic() - self._last_activity if self._last_activity is not None else None
+            return dict(
+                self._stats,
+                running=bool(self._thread and self._thread.is_alive()),
+                interval=self.interval,
+                unavailable=self._unavailable,
+                consecutive_failures=self._failures,
+                reuse_ratio=round(reused / (reused + cold), 3) if reused + cold else 0.0,
+                avg_reused_latency=round(self._latency_total["reused"] / reused, 3) if reused else None,
+                avg_cold_latency=round(self._latency_total["cold"] / cold, 3) if cold else None,
+                last_warmup_latency=round(self._last_latency["warmup"], 3) if self._last_latency["warmup"] is not None else None,
+                last_ping_latency=round(self._last_latency["ping"], 3) if self._last_latency["ping"] is not None else None,
+                idle_seconds=round(idle, 1) if idle is not None else None
+            )
+
+
+# 전역 인스턴스 생성
+transport_keepalive = TransportKeepAlive(
+    interval=settings.KEEPALIVE_INTERVAL,
+    idle_timeout=settings.CONNECTION_IDLE_TIMEOUT,
+    max_idle=settings.KEEPALIVE_MAX_IDLE
+)
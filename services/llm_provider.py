@@ -0,0 +1,366 @@
+import os
+import re
+import json
+import time
+import hashlib
+import math
+import random
+import threading
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Dict, Any, List, Optional, Tuple
+
+from core.config import settings
+from services.token_accounting import token_estimator
+from utils.get_logger import logger
+
+
+# 공급자 응답 (Gemini 응답과 같은 text / usage_metadata 속성 제공)
+@dataclass
+class ProviderResponse:
+    text: str
+    usage_metadata: Any = None
+
+
+# LLM 공급자 기본 클래스
+class LLMProvider:
+    name = "base"
+    # response_schema(JSON 구조화 출력) 지원 여부
+    supports_structured_output = False
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+
+    # 프롬프트 1회 호출 (generation_config: temperature/top_p/top_k/max_output_tokens 속성)
+    # response_schema는 지원하는 공급자에서만 적용되고, 그 외에는 무시된다.
+    # timeout: 호출 제한 시간(초), 초과하면 TimeoutError 계열 오류
+    def generate(self, prompt: str, generation_config: Any, response_schema: Optional[Dict[str, Any]] = None,
+                 timeout: Optional[float] = None) -> Any:
+        raise NotImplementedError
+
+    # 연결 예열/유지용 가벼운 요청 (토큰을 소비하지 않는 호출, 연결이 없는 공급자는 무시)
+    def ping(self):
+        pass
+
+    # 공급자 상태 (서비스 상태 확인용)
+    def snapshot(self) -> Dict[str, Any]:
+        return {}
+
+
+# Gemini 공급자
+class GeminiProvider(LLMProvider):
+    name = "gemini"
+
+    def __init__(self, api_key: str, model_name: str,
+                 api_endpoint: Optional[str] = None, transport: Optional[str] = None):
+        super().__init__(model_name)
+
+        # API 키 검증
+        if not api_key:
+            logger.error("[GeminiProvider] Gemini API is not configured")
+            raise ValueError("[GeminiProvider] GEMINI_API_KEY is not set.")
+
+        import google.generativeai as genai
+        self._genai = genai
+
+        # Gemini API 설정 및 모델 초기화 (엔드포인트 지정 시 로컬 스텁 서버 등으로 연결)
+        options = {}
+        if api_endpoint:
+            options["client_options"] = {"api_endpoint": api_endpoint}
+        if transport:
+            options["transport"] = transport
+        genai.configure(api_key=api_key, **options)
+        self.model = genai.GenerativeModel(model_name)
+
+        # JSON 모드/응답 스키마는 gemini-1.5 이후 모델에서 지원
+        self.supports_structured_output = not model_name.startswith(("gemini-1.0", "gemini-pro"))
+
+    def generate(self, prompt: str, generation_config: Any, response_schema: Optional[Dict[str, Any]] = None,
+                 timeout: Optional[float] = None) -> Any:
+        options = {}
+        if response_schema and self.supports_structured_output:
+            options = {"response_mime_type": "application/json", "response_schema": response_schema}
+
+        return self.model.generate_content(
+            prompt,
+            generation_config=self._genai.types.GenerationConfig(
+                temperature=generation_config.temperature,
+                top_p=generation_config.top_p,
+                top_k=generation_config.top_k,
+                max_output_tokens=generation_config.max_output_tokens,
+                **options
+            ),
+            request_options={"timeout": timeout} if timeout else None
+        )
+
+    # countTokens 호출: 생성 없이 generate_content와 같은 클라이언트/연결을 사용
+    def ping(self):
+        self.model.count_tokens("ping")
+
+
+# 가짜 공급자 오류 (classify_error가 클래스 이름으로 재시도 대상 판별)
+class ServiceUnavailable(Exception):
+    pass
+
+
+# 지연 시간 분포 파싱: "fixed:1.0" / "uniform:0.5,2.0" / "lognormal:1.5,0.4"(중앙값, 시그마)
+def parse_latency(spec: str) -> Tuple[str, List[float]]:
+    kind, _, raw = spec.partition(":")
+    kind = kind.strip().lower()
+    params = [float(value) for value in raw.split(",") if value.strip()]
+
+    expected = {"fixed": 1, "uniform": 2, "lognormal": 2}
+    if kind not in expected or len(params) != expected[kind]:
+        raise ValueError(f"[parse_latency] Invalid latency spec: {spec}")
+    return kind, params
+
+
+# 오프라인 부하 테스트용 가짜 공급자
+# 6개 톤 JSON을 반환하며 지연 시간 분포, 오류율, 잘못된 출력 비율을 설정할 수 있다.
+class FakeProvider(LLMProvider):
+    name = "fake"
+
+    def __init__(self, tones: List[Tuple[str, str]], latency: str = "lognormal:1.5,0.4",
+                 error_rate: float = 0.0, malformed_rate: float = 0.0,
+                 seed: Optional[int] = None, model_name: str = "fake-gemini"):
+        super().__init__(model_name)
+        self.tones = tones
+        self.latency_kind, self.latency_params = parse_latency(latency)
+        self.error_rate = error_rate
+        self.malformed_rate = malformed_rate
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "errors": 0, "malformed": 0}
+
+    # 지연 시간 샘플링
+    def _sample_latency(self) -> float:
+        if self.latency_kind == "fixed":
+            return self.latency_params[0]
+        if self.latency_kind == "uniform":
+            return self._random.uniform(*self.latency_params)
+        median, sigma = self.latency_params
+        return self._random.lognormvariate(math.log(max(median, 1e-6)), sigma)
+
+    # 재생성 프롬프트면 대상 톤만, 아니면 전체 톤
+    def _target_tones(self, prompt: str) -> List[Tuple[str, str]]:
+        match = re.search(r"재생성 대상 톤: (.+)", prompt)
+        if not match:
+            return self.tones
+        names = {name.strip() for name in match.group(1).split(",")}
+        return [(key, name) for key, name in self.tones if name in names] or self.tones
+
+    def _build_text(self, prompt: str, malformed: bool) -> str:
+        match = re.search(r"상품명: (.*)", prompt)
+        product_name = match.group(1).strip() if match else "상품"
+
+        contents = {
+            key: {"content": f"{product_name} {name} 원고입니다\n가격 혜택 확인해보세요\n오늘만 이 가격이에요"}
+            for key, name in self._target_tones(prompt)
+        }
+        text = json.dumps(contents, ensure_ascii=False, indent=2)
+
+        if not malformed:
+            return text
+        # 잘못된 출력: 중간에 잘린 JSON 또는 JSON 없는 설명문
+        if self._random.random() < 0.5:
+            return "```json\n" + text[:len(text) // 2]
+        return f"{product_name} 원고를 작성했습니다. 요청하신 톤으로 정리해 드릴게요."
+
+    def generate(self, prompt: str, generation_config: Any, response_schema: Optional[Dict[str, Any]] = None,
+                 timeout: Optional[float] = None) -> Any:
+        with self._lock:
+            latency = self._sample_latency()
+            failed = self._random.random() < self.error_rate
+            malformed = not failed and self._random.random() < self.malformed_rate
+            self._stats["calls"] += 1
+            self._stats["errors"] += int(failed)
+            self._stats["malformed"] += int(malformed)
+
+        if timeout is not None and latency > timeout:
+            time.sleep(timeout)
+            raise TimeoutError(f"[FakeProvider] Simulated call exceeded timeout {timeout:.2f}s")
+        time.sleep(latency)
+        if failed:
+            raise ServiceUnavailable("[FakeProvider] Simulated service unavailable")
+
+        text = self._build_text(prompt, malformed)
+        prompt_tokens = token_estimator.estimate(prompt)
+        output_tokens = token_estimator.estimate(text)
+        return ProviderResponse(
+            text=text,
+            usage_metadata=SimpleNamespace(
+                prompt_token_count=prompt_tokens,
+                candidates_token_count=output_tokens,
+                total_token_count=prompt_tokens + output_tokens
+            )
+        )
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._stats, latency=f"{self.latency_kind}:{','.join(map(str, self.latency_params))}")
+
+
+# 프롬프트 해시 (카세트 조회 키)
+def prompt_hash(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+
+# 녹화 공급자: 실제 공급자 호출을 그대로 전달하면서 요청/응답/지연 시간을 JSONL 카세트에 기록
+class RecordingProvider(LLMProvider):
+    def __init__(self, inner: LLMProvider, path: str):
+        super().__init__(inner.model_name)
+        self.name = f"{inner.name}+record"
+        self.inner = inner
+        self.supports_structured_output = inner.supports_structured_output
+        self.path = path
+        self._lock = threading.Lock()
+        self._recorded = 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    def _append(self, entry: Dict[str, Any]):
+        try:
+            line = json.dumps(entry, ensure_ascii=False)
+            with self._lock:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(line + "\n")
+                self._recorded += 1
+        except Exception as e:
+            logger.error(f"[RecordingProvider] Failed to write cassette: {e}")
+
+    def generate(self, prompt: str, generation_config: Any, response_schema: Optional[Dict[str, Any]] = None,
+                 timeout: Optional[float] = None) -> Any:
+        entry = {
+            "prompt_hash": prompt_hash(prompt),
+            "prompt": prompt,
+            "model": self.model_name,
+            "recorded_at": time.time()
+        }
+        started = time.monotonic()
+        try:
+            response = self.inner.generate(prompt, generation_config, response_schema, timeout)
+        except Exception as e:
+            entry.update(latency=time.monotonic() - started, error={"type": type(e).__name__, "message": str(e)})
+            self._append(entry)
+            raise
+
+        entry["latency"] = time.monotonic() - started
+        try:
+            entry["text"] = response.text
+        except Exception as e:
+            # 안전 필터 차단 등 text 접근 오류도 그대로 재현
+            entry["error"] = {"type": type(e).__name__, "message": str(e)}
+        metadata = getattr(response, "usage_metadata", None)
+        if metadata is not None:
+            entry["usage"] = {
+                "prompt_token_count": getattr(metadata, "prompt_token_count", 0) or 0,
+                "candidates_token_count": getattr(metadata, "candidates_token_count", 0) or 0,
+                "cached_content_token_count": getattr(metadata, "cached_content_token_count", 0) or 0,
+                "total_token_count": getattr(metadata, "total_token_count", 0) or 0
+            }
+        self._append(entry)
+        return response
+
+    # ping은 카세트에 기록하지 않음
+    def ping(self):
+        self.inner.ping()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return dict(self.inner.snapshot(), cassette=self.path, recorded=self._recorded)
+
+
+# 재생 공급자: 카세트의 응답을 녹화 당시 지연 시간(배율 적용)으로 재생
+# 프롬프트가 같은 기록이 있으면 그 응답을, 없으면(프롬프트 변경 후 벤치마크 등) 녹화 순서대로 순환 재생
+class ReplayProvider(LLMProvider):
+    name = "replay"
+
+    def __init__(self, path: str, speed: float = 1.0):
+        self.path = path
+        self.speed = speed
+        self.entries: List[Dict[str, Any]] = []
+        self._by_hash: Dict[str, List[Dict[str, Any]]] = {}
+
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self.entries.append(entry)
+                    self._by_hash.setdefault(entry["prompt_hash"], []).append(entry)
+        if not self.entries:
+            raise ValueError(f"[ReplayProvider] Cassette is empty: {path}")
+
+        super().__init__(self.entries[0].get("model", "replay"))
+        self._lock = threading.Lock()
+        self._cursor = 0
+        self._hash_cursor: Dict[str, int] = {}
+        self._stats = {"calls": 0, "exact_hits": 0}
+
+    # 재생할 기록 선택
+    def _next_entry(self, prompt: str) -> Dict[str, Any]:
+        key = prompt_hash(prompt)
+        with self._lock:
+            self._stats["calls"] += 1
+            if key in self._by_hash:
+                matches = self._by_hash[key]
+                index = self._hash_cursor.get(key, 0)
+                self._hash_cursor[key] = index + 1
+                self._stats["exact_hits"] += 1
+                return matches[index % len(matches)]
+            entry = self.entries[self._cursor % len(self.entries)]
+            self._cursor += 1
+            return entry
+
+    def generate(self, prompt: str, generation_config: Any, response_schema: Optional[Dict[str, Any]] = None,
+                 timeout: Optional[float] = None) -> Any:
+        entry = self._next_entry(prompt)
+        if self.speed > 0:
+            latency = entry.get("latency", 0.0) * self.speed
+            if timeout is not None and latency > timeout:
+                time.sleep(timeout)
+                raise TimeoutError(f"[ReplayProvider] Replayed call exceeded timeout {timeout:.2f}s")
+            time.sleep(latency)
+
+        # 녹화된 오류는 같은 클래스 이름으로 재현 (classify_error가 이름으로 분류)
+        if entry.get("error"):
+            error_type = type(entry["error"]["type"], (Exception,), {})
+            raise error_type(entry["error"]["message"])
+
+        usage = entry.get("usage")
+        return ProviderResponse(
+            text=entry.get("text", ""),
+            usage_metadata=SimpleNamespace(**usage) if usage else None
+        )
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._stats, cassette=self.path, entries=len(self.entries), speed=self.speed)
+
+
+# 설정에 따라 공급자 생성
+# model_name을 지정하지 않으면 공급자 기본 모델 사용 (replay는 카세트의 모델)
+def create_provider(name: str, tones: List[Tuple[str, str]], model_name: Optional[str] = None) -> LLMProvider:
+    if name == "replay":
+        return ReplayProvider(settings.LLM_CASSETTE_PATH, speed=settings.REPLAY_SPEED)
+
+    if name == "gemini":
+        provider = GeminiProvider(
+            api_key=settings.GEMINI_API_KEY,
+            model_name=model_name or settings.GEMINI_MODEL,
+            api_endpoint=settings.GEMINI_API_ENDPOINT or None,
+            transport=settings.GEMINI_TRANSPORT or None
+        )
+    elif name == "fake":
+        provider = FakeProvider(
+            tones=tones,
+            latency=settings.FAKE_LATENCY,
+            error_rate=settings.FAKE_ERROR_RATE,
+            malformed_rate=settings.FAKE_MALFORMED_RATE,
+            seed=settings.FAKE_SEED,
+            model_name=model_name or "fake-gemini"
+        )
+    else:
+        raise ValueError(f"[create_provider] Unknown LLM provider: {name}")
+
+    if settings.LLM_CASSETTE_RECORD:
+        return RecordingProvider(provider, settings.LLM_CASSETTE_PATH)
+    return provider
@@ -0,0 +1,79 @@
+from typing import Dict, Any, List, Tuple
+
+from utils.prompt_loader import REQUEST_FIELDS
+from services.token_accounting import token_estimator
+
+# 베스트 사례 중간 생략 표시
+ELISION_MARKER = "…(중략)…"
+
+
+# 변수별 추정 토큰 수 측정
+def measure_fields(product_data: Dict[str, Any]) -> Dict[str, int]:
+    sizes = {}
+    for data_key in REQUEST_FIELDS.values():
+        value = product_data.get(data_key)
+        if value:
+            sizes[data_key] = token_estimator.estimate(str(value))
+    return sizes
+
+
+# 이전 콘텐츠 직렬화: id/재생성 사유 등 메타데이터는 제외하고 "톤: 본문"만 남김
+def compact_previous_contents(contents: Any) -> str:
+    if not isinstance(contents, list):
+        return contents or ""
+
+    lines = []
+    for content in contents:
+        if not isinstance(content, dict):
+            continue
+        text = " ".join(str(content.get("text", "")).split())
+        lines.append(f"{content.get('tone', '')}: {text}")
+    return "\n".join(lines)
+
+
+# 토큰 예산에 맞게 문자열 앞부분만 남김
+def _truncate(text: str, budget: int) -> str:
+    if token_estimator.estimate(text) <= budget:
+        return text
+    low, high = 0, len(text)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if token_estimator.estimate(text[:mid]) <= budget:
+            low = mid
+        else:
+            high = mid - 1
+    return text[:low]
+
+
+# 베스트 사례 축약: 첫 줄(도입부)과 마지막 줄(마무리)은 유지하고 중간을 앞에서부터 예산만큼 채움
+def trim_best_case(text: str, budget: int) -> Tuple[str, bool]:
+    if not text or budget <= 0 or token_estimator.estimate(text) <= budget:
+        return text, False
+
+    lines = [line for line in text.strip().splitlines() if line.strip()]
+    if len(lines) <= 2:
+        return _truncate(text.strip(), budget), True
+
+    first, middle, last = lines[0], lines[1:-1], lines[-1]
+    remaining = budget - token_estimator.estimate(ELISION_MARKER)
+
+    # 도입부/마무리만으로 예산을 넘으면 두 줄을 절반씩 잘라 사용
+    edge_tokens = token_estimator.estimate(first) + token_estimator.estimate(last)
+    if edge_tokens >= remaining:
+        half = max(remaining // 2, 1)
+        return "\n".join([_truncate(first, half), ELISION_MARKER, _truncate(last, half)]), True
+
+    remaining -= edge_tokens
+    kept: List[str] = []
+    for line in middle:
+        tokens = token_estimator.estimate(line)
+        if tokens > remaining:
+            break
+        kept.append(line)
+        remaining -= tokens
+
+    # 줄 단위 추정치 합과 전체 추정치의 반올림 차이 보정
+    while kept and token_estimator.estimate("\n".join([first, *kept, ELISION_MARKER, last])) > budget:
+        kept.pop()
+
+    return "\n".join([first, *kept, ELISION_MARKER, last]), True
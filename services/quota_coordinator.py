@@ -0,0 +1,97 @@
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, Optional
+
+from core.config import settings
+from database.crud import try_acquire_quota_lease, release_quota_lease, get_quota_usage
+from utils.get_logger import logger
+
+
+# 전역 쿼터 대기 타임아웃 오류
+class QuotaTimeoutError(Exception):
+    pass
+
+
+# 쿼터 임대 정보
+class QuotaLease:
+    def __init__(self, lease_id: str, tokens: int, wait_time: float):
+        self.lease_id = lease_id
+        self.tokens = tokens
+        self.wait_time = wait_time
+        self.actual_tokens: Optional[int] = None
+
+
+# 프로세스 간 쿼터 조정자
+# 같은 호스트의 여러 Streamlit 프로세스가 SQLite 임대 테이블로 전역 RPM/TPM/동시 실행 수를 공유한다.
+# 임대에는 만료 시각이 있어 비정상 종료된 워커의 슬롯도 자동으로 회수된다.
+class QuotaCoordinator:
+    def __init__(self, enabled: bool, rpm: int, tpm: int, max_concurrency: int, lease_ttl: float):
+        self.enabled = enabled
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_concurrency = max_concurrency
+        self.lease_ttl = lease_ttl
+
+    # 임대 획득 (한도 여유가 생길 때까지 대기)
+    def acquire(self, tokens: int, timeout: Optional[float] = None) -> QuotaLease:
+        started_at = time.monotonic()
+
+        while True:
+            lease_id, retry_after = try_acquire_quota_lease(
+                tokens=tokens,
+                rpm=self.rpm,
+                tpm=self.tpm,
+                max_concurrency=self.max_concurrency,
+                lease_ttl=self.lease_ttl
+            )
+            waited = time.monotonic() - started_at
+            if lease_id:
+                return QuotaLease(lease_id, tokens, waited)
+
+            if timeout is not None and waited + retry_after > timeout:
+                raise QuotaTimeoutError(f"[QuotaCoordinator] Global quota wait exceeded {timeout:.1f}s")
+
+            time.sleep(min(retry_after, 1.0))
+
+    # 임대 반납
+    def release(self, lease: QuotaLease):
+        try:
+            release_quota_lease(lease.lease_id, lease.actual_tokens)
+        except Exception as e:
+            # 반납 실패 시에도 임대 만료 시각이 지나면 회수됨
+            logger.error(f"[QuotaCoordinator] Failed to release lease {lease.lease_id}: {e}")
+
+    # 임대 컨텍스트 (비활성화 시 None)
+    @contextmanager
+    def lease(self, tokens: int, timeout: Optional[float] = None):
+        if not self.enabled:
+            yield None
+            return
+
+        lease = self.acquire(tokens, timeout)
+        try:
+            yield lease
+        finally:
+            self.release(lease)
+
+    # 쿼터 사용 현황 (서비스 상태 확인용)
+    def snapshot(self) -> Dict[str, Any]:
+        status = {
+            "enabled": self.enabled,
+            "rpm": self.rpm,
+            "tpm": self.tpm,
+            "max_concurrency": self.max_concurrency
+        }
+        if self.enabled:
+            status["usage"] = get_quota_usage()
+        return status
+
+
+# 전역 인스턴스 생성
+quota_coordinator = QuotaCoordinator(
+    enabled=settings.QUOTA_COORDINATOR_ENABLED,
+    rpm=settings.GLOBAL_RPM,
+    tpm=settings.GLOBAL_TPM,
+    max_concurrency=settings.GLOBAL_MAX_CONCURRENCY,
+    lease_ttl=settings.QUOTA_LEASE_TTL
+)
@@ -0,0 +1,150 @@
+import time
+import random
+import threading
+from typing import Dict, Any
+
+from utils.get_logger import logger
+
+# 재시도 가능한 오류 (일시적인 서버/네트워크 장애)
+RETRIABLE_ERRORS = {
+    "ServiceUnavailable",
+    "InternalServerError",
+    "DeadlineExceeded",
+    "GatewayTimeout",
+    "TooManyRequests",
+    "Aborted",
+    "Unknown",
+    "EmptyResponseError",
+    "ConnectionError",
+    "TimeoutError",
+}
+
+# 쿼터 초과 오류 (재시도해도 같은 결과이므로 즉시 실패)
+QUOTA_ERRORS = {
+    "ResourceExhausted",
+}
+
+# 그 외 오류(잘못된 API 키, 안전 필터 차단, 잘못된 요청 등)는 재시도하지 않음
+
+
+# 빈 응답 오류 (재시도 대상)
+class EmptyResponseError(Exception):
+    pass
+
+
+# 서킷 브레이커가 열려 있어 호출을 차단한 경우
+class CircuitOpenError(Exception):
+    pass
+
+
+# 오류 분류: "retriable" / "quota" / "fatal"
+# google.api_core 예외를 직접 import하지 않도록 클래스 이름(MRO)으로 판별
+def classify_error(error: Exception) -> str:
+    names = {cls.__name__ for cls in type(error).__mro__}
+    if names & QUOTA_ERRORS:
+        return "quota"
+    if names & RETRIABLE_ERRORS:
+        return "retriable"
+    return "fatal"
+
+
+# 재시도 정책 (decorrelated jitter + 요청 단위 데드라인)
+class RetryPolicy:
+    def __init__(self, max_attempts: int, base_delay: float, max_delay: float, deadline: float):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+
+    # 다음 대기 시간 계산: min(max_delay, random(base, 이전 대기 * 3))
+    def next_delay(self, previous_delay: float) -> float:
+        upper = max(self.base_delay, previous_delay * 3)
+        return min(self.max_delay, random.uniform(self.base_delay, upper))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "max_retries": self.max_attempts,
+            "retry_delay": self.base_delay,
+            "max_delay": self.max_delay,
+            "deadline": self.deadline
+        }
+
+
+# 서킷 브레이커 (closed -> open -> half_open -> closed)
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, recovery_timeout: float, half_open_max_calls: int = 1):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        self._total_rejected = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._refresh_state()
+            return self._state
+
+    # open 상태에서 복구 대기 시간이 지나면 half_open으로 전환
+    def _refresh_state(self):
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+            self._state = self.HALF_OPEN
+            self._half_open_calls = 0
+            logger.info("[CircuitBreaker] State changed: open -> half_open")
+
+    # 호출 허용 여부 (half_open에서는 제한된 수의 탐색 요청만 허용)
+    def allow_request(self) -> bool:
+        with self._lock:
+            self._refresh_state()
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN and self._half_open_calls < self.half_open_max_calls:
+                self._half_open_calls += 1
+                return True
+            self._total_rejected += 1
+            return False
+
+    # 호출 성공 기록 (공급자가 응답한 경우)
+    def record_success(self):
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info(f"[CircuitBreaker] State changed: {self._state} -> closed")
+            self._state = self.CLOSED
+            self._consecutive_failures = 0
+            self._half_open_calls = 0
+
+    # 호출 실패 기록 (재시도 가능한 장애만 집계)
+    def record_failure(self):
+        with self._lock:
+            self._consecutive_failures += 1
+            if self._state == self.HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.error(f"[CircuitBreaker] State changed: {self._state} -> open (failures={self._consecutive_failures})")
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._half_open_calls = 0
+
+    # 상태 정보 (서비스 상태 확인용)
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            self._refresh_state()
+            retry_after = 0.0
+            if self._state == self.OPEN:
+                retry_after = max(0.0, self.recovery_timeout - (time.monotonic() - self._opened_at))
+            return {
+                "state": self._state,
+                "consecutive_failures": self._consecutive_failures,
+                "failure_threshold": self.failure_threshold,
+                "recovery_timeout": self.recovery_timeout,
+                "retry_after": round(retry_after, 1),
+                "total_rejected": self._total_rejected
+            }
@@ -0,0 +1,128 @@
+import re
+import json
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Tuple
+
+_decoder = json.JSONDecoder()
+_FENCE_PATTERN = re.compile(r"```(?:json|JSON)?\s*")
+
+
+# 톤별 응답 파싱 결과
+@dataclass
+class ParseResult:
+    # 톤 키 -> 본문 (온전히 파싱된 톤만 포함)
+    contents: Dict[str, str] = field(default_factory=dict)
+    # json: 그대로 파싱 / repaired: 잘린 응답 등에서 복구 / none: JSON 없음
+    method: str = "none"
+
+
+# 톤 응답 JSON 스키마 (구조화 출력 지원 모델용, required는 요청한 톤만)
+def build_response_schema(tones: List[Tuple[str, str]], required_keys: Optional[List[str]] = None) -> Dict[str, Any]:
+    tone_schema = {
+        "type": "object",
+        "properties": {"content": {"type": "string"}},
+        "required": ["content"]
+    }
+    return {
+        "type": "object",
+        "properties": {key: tone_schema for key, _ in tones},
+        "required": list(required_keys) if required_keys is not None else [key for key, _ in tones]
+    }
+
+
+# 코드 펜스와 앞뒤 설명문 제거 후 JSON 시작 위치부터 반환
+def _strip_wrapping(text: str) -> str:
+    text = _FENCE_PATTERN.sub("", text)
+    starts = [index for index in (text.find("{"), text.find("[")) if index != -1]
+    return text[min(starts):] if starts else ""
+
+
+def _skip_whitespace(text: str, index: int) -> int:
+    while index < len(text) and text[index] in " \t\r\n":
+        index += 1
+    return index
+
+
+# 톤 값에서 본문 추출: {"content": "..."} 또는 문자열
+def _tone_text(value: Any) -> Optional[str]:
+    if isinstance(value, dict):
+        value = value.get("content")
+    if isinstance(value, str) and value.strip():
+        return value
+    return None
+
+
+# 객체를 키-값 단위로 읽으며 끝까지 읽힌 항목만 수집 (잘린 마지막 톤은 버림)
+def _scan_object(text: str) -> Dict[str, Any]:
+    items = {}
+    index = _skip_whitespace(text, 1)
+    while index < len(text) and text[index] != "}":
+        try:
+            key, index = _decoder.raw_decode(text, index)
+            index = _skip_whitespace(text, index)
+            if index >= len(text) or text[index] != ":":
+                break
+            value, index = _decoder.raw_decode(text, _skip_whitespace(text, index + 1))
+        except json.JSONDecodeError:
+            break
+        items[key] = value
+        index = _skip_whitespace(text, index)
+        if index < len(text) and text[index] == ",":
+            index = _skip_whitespace(text, index + 1)
+    return items
+
+
+# 배열을 원소 단위로 읽으며 끝까지 읽힌 원소만 수집
+def _scan_array(text: str) -> List[Any]:
+    elements = []
+    index = _skip_whitespace(text, 1)
+    while index < len(text) and text[index] != "]":
+        try:
+            value, index = _decoder.raw_decode(text, index)
+        except json.JSONDecodeError:
+            break
+        elements.append(value)
+        index = _skip_whitespace(text, index)
+        if index < len(text) and text[index] == ",":
+            index = _skip_whitespace(text, index + 1)
+    return elements
+
+
+# 파싱된 JSON을 톤 키 -> 본문으로 변환 (재생성 시 나오는 [{"tone": ..., "text": ...}] 배열도 처리)
+def _collect(parsed: Any, tones: List[Tuple[str, str]]) -> Dict[str, str]:
+    key_by_name = {name: key for key, name in tones}
+    contents = {}
+
+    if isinstance(parsed, dict):
+        for key, value in parsed.items():
+            tone_key = key if key in dict(tones) else key_by_name.get(key)
+            text = _tone_text(value)
+            if tone_key and text:
+                contents[tone_key] = text
+    elif isinstance(parsed, list):
+        for item in parsed:
+            if isinstance(item, dict) and "tone" in item:
+                tone_key = key_by_name.get(item["tone"]) or (item["tone"] if item["tone"] in dict(tones) else None)
+                text = _tone_text(item.get("text", item.get("content")))
+                if tone_key and text:
+                    contents[tone_key] = text
+    return contents
+
+
+# 톤별 응답 파싱: 정상 JSON -> 앞뒤 설명문 제거 -> 잘린 JSON 부분 복구 순으로 시도
+def parse_tone_response(text: str, tones: List[Tuple[str, str]]) -> ParseResult:
+    body = _strip_wrapping(text or "")
+    if not body:
+        return ParseResult()
+
+    # 1) 그대로 파싱 (뒤에 붙은 설명문은 raw_decode가 무시)
+    try:
+        parsed, _ = _decoder.raw_decode(body)
+        return ParseResult(contents=_collect(parsed, tones), method="json")
+    except json.JSONDecodeError:
+        pass
+
+    # 2) 잘린 응답: 완성된 톤만 복구
+    parsed = _scan_object(body) if body[0] == "{" else _scan_array(body)
+    contents = _collect(parsed, tones)
+    return ParseResult(contents=contents, method="repaired" if contents else "none")
@@ -0,0 +1,239 @@
+import time
+import heapq
+import itertools
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, Callable
+
+from core.config import settings
+from utils.get_logger import logger
+from utils.request_context import RequestCancelledError
+
+# 팀 정보가 없는 요청의 큐 이름
+DEFAULT_TEAM = "default"
+
+
+# 대기열 타임아웃 오류
+class SchedulerTimeoutError(Exception):
+    pass
+
+
+# 팀별 가중치 파싱: "브랜드패션팀:2,뷰티팀:1" -> {"브랜드패션팀": 2.0, "뷰티팀": 1.0}
+def parse_team_weights(raw: str) -> Dict[str, float]:
+    weights = {}
+    for item in raw.split(","):
+        if ":" not in item:
+            continue
+        team_name, weight = item.rsplit(":", 1)
+        try:
+            weights[team_name.strip()] = max(float(weight), 0.01)
+        except ValueError:
+            logger.error(f"[parse_team_weights] Invalid team weight: {item}")
+    return weights
+
+
+# 토큰 버킷 (분당 한도 기준, 초 단위로 보충)
+class TokenBucket:
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = float(per_minute)
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    # amount만큼 사용 가능해질 때까지 남은 시간(초)
+    def time_until(self, amount: float, now: float) -> float:
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float, now: float):
+        self._refill(now)
+        self.tokens -= min(amount, self.capacity)
+
+    # 예약량과 실제 사용량 차이 정산 (음수면 반환)
+    def adjust(self, delta: float):
+        self.tokens = min(self.capacity, self.tokens - delta)
+
+
+# 대기열 티켓
+@dataclass(eq=False)
+class QueueTicket:
+    team_name: str
+    tokens: int
+    virtual_start: float
+    virtual_finish: float
+    enqueued_at: float = field(default_factory=time.monotonic)
+    started_at: Optional[float] = None
+    initial_position: int = 0
+    seq: int = 0
+
+    @property
+    def wait_time(self) -> float:
+        end = self.started_at if self.started_at is not None else time.monotonic()
+        return end - self.enqueued_at
+
+
+# LLM 호출 스케줄러: 전역 동시 실행 제한 + RPM/TPM 토큰 버킷 + 팀별 가중 공정 대기열
+class LLMScheduler:
+    def __init__(self, max_concurrency: int, rpm: int, tpm: int,
+                 team_weights: Optional[Dict[str, float]] = None):
+        self.max_concurrency = max_concurrency
+        self.request_bucket = TokenBucket(rpm)
+        self.token_bucket = TokenBucket(tpm)
+        self.team_weights = team_weights or {}
+
+        self._cond = threading.Condition()
+        self._queue = []
+        self._seq = itertools.count()
+        self._active = 0
+        self._virtual_time = 0.0
+        self._team_finish: Dict[str, float] = {}
+        self._stats = {"dispatched": 0, "timeouts": 0, "cancelled": 0, "total_wait": 0.0}
+
+    # 팀 가중치 조회
+    def _weight(self, team_name: str) -> float:
+        return self.team_weights.get(team_name, 1.0)
+
+    # 대기열 순번 (1부터 시작)
+    def _position(self, ticket: QueueTicket) -> int:
+        key = (ticket.virtual_finish, ticket.seq)
+        return sum(1 for virtual_finish, seq, _ in self._queue if (virtual_finish, seq) < key) + 1
+
+    # 대기열 등록: 팀별 가상 종료 시각 계산 (가중치가 클수록 먼저 처리)
+    def _enqueue(self, team_name: str, tokens: int) -> QueueTicket:
+        with self._cond:
+            virtual_start = max(self._virtual_time, self._team_finish.get(team_name, 0.0))
+            virtual_finish = virtual_start + 1.0 / self._weight(team_name)
+            self._team_finish[team_name] = virtual_finish
+
+            ticket = QueueTicket(team_name=team_name, tokens=tokens, virtual_start=virtual_start,
+                                 virtual_finish=virtual_finish, seq=next(self._seq))
+            heapq.heappush(self._queue, (ticket.virtual_finish, ticket.seq, ticket))
+            ticket.initial_position = self._position(ticket)
+            return ticket
+
+    # 실행 차례 대기
+    def _wait(self, ticket: QueueTicket, on_update: Optional[Callable[[int, float], None]],
+              timeout: Optional[float], cancel: Optional[threading.Event] = None):
+        last_position = None
+
+        while True:
+            with self._cond:
+                now = time.monotonic()
+                is_head = self._queue and self._queue[0][2] is ticket
+                wait = 1.0
+
+                if is_head and self._active < self.max_concurrency:
+                    wait = max(self.request_bucket.time_until(1, now),
+                               self.token_bucket.time_until(ticket.tokens, now))
+                    if wait <= 0:
+                        heapq.heappop(self._queue)
+                        self.request_bucket.consume(1, now)
+                        self.token_bucket.consume(ticket.tokens, now)
+                        self._active += 1
+                        self._virtual_time = max(self._virtual_time, ticket.virtual_start)
+                        ticket.started_at = now
+                        self._stats["dispatched"] += 1
+                        self._stats["total_wait"] += ticket.wait_time
+                        self._cond.notify_all()
+                        return
+
+                if timeout is not None and ticket.wait_time >= timeout:
+                    self._remove(ticket)
+                    self._stats["timeouts"] += 1
+                    raise SchedulerTimeoutError(f"[LLMScheduler] Queue wait exceeded {timeout:.1f}s (team={ticket.team_name})")
+                
+                # 요청이 취소되면 대기열에서 빠짐
+                if cancel is not None and cancel.is_set():
+                    self._remove(ticket)
+                    self._stats["cancelled"] += 1
+                    raise RequestCancelledError(f"[LLMScheduler] Request cancelled while queued (team={ticket.team_name})")
+
+                position = self._position(ticket)
+                if timeout is not None:
+                    wait = min(wait, max(timeout - ticket.wait_time, 0.0))
+                self._cond.wait(min(max(wait, 0.01), 1.0))
+
+            # 대기 상태 콜백 (락 밖에서 호출)
+            if on_update and position != last_position:
+                last_position = position
+                try:
+                    on_update(position, ticket.wait_time)
+                except Exception as e:
+                    logger.error(f"[LLMScheduler] Queue update callback failed: {e}")
+
+    # 대기열에서 제거 (락 안에서 호출)
+    def _remove(self, ticket: QueueTicket):
+        self._queue.remove((ticket.virtual_finish, ticket.seq, ticket))
+        heapq.heapify(self._queue)
+        self._cond.notify_all()
+    
+    # 실행 종료
+    def _release(self, ticket: QueueTicket):
+        with self._cond:
+            if ticket.started_at is not None:
+                self._active -= 1
+            self._cond.notify_all()
+
+    # 실행 슬롯 획득 (with 블록 동안 슬롯 점유)
+    # cancel: 설정되면 대기 중 RequestCancelledError 발생
+    @contextmanager
+    def acquire(self, team_name: Optional[str], tokens: int,
+                on_update: Optional[Callable[[int, float], None]] = None,
+                timeout: Optional[float] = None,
+                cancel: Optional[threading.Event] = None):
+        ticket = self._enqueue(team_name or DEFAULT_TEAM, tokens)
+        try:
+            self._wait(ticket, on_update, timeout, cancel)
+            yield ticket
+        finally:
+            self._release(ticket)
+
+    # 대기 없이 즉시 실행 가능한지 (대기열 없음 + 동시 실행/RPM/TPM 여유): 헤지/추측 생성 허용 판단용
+    # headroom: 실행 후에도 남겨 둘 동시 실행/요청 슬롯 수
+    def has_capacity(self, tokens: int, headroom: int = 0) -> bool:
+        with self._cond:
+            now = time.monotonic()
+            return (not self._queue and self._active + headroom < self.max_concurrency
+                    and self.request_bucket.time_until(1 + headroom, now) <= 0
+                    and self.token_bucket.time_until(tokens, now) <= 0)
+    
+    # 예약한 토큰과 실제 사용 토큰 정산
+    def reconcile(self, ticket: QueueTicket, actual_tokens: int):
+        with self._cond:
+            self.token_bucket.adjust(actual_tokens - ticket.tokens)
+            self._cond.notify_all()
+
+    # 스케줄러 상태 (서비스 상태 확인용)
+    def snapshot(self) -> Dict[str, Any]:
+        with self._cond:
+            waiting_by_team: Dict[str, int] = {}
+            for _, _, ticket in self._queue:
+                waiting_by_team[ticket.team_name] = waiting_by_team.get(ticket.team_name, 0) + 1
+            dispatched = self._stats["dispatched"]
+            return {
+                "active": self._active,
+                "max_concurrency": self.max_concurrency,
+                "waiting": len(self._queue),
+                "waiting_by_team": waiting_by_team,
+                "dispatched": dispatched,
+                "timeouts": self._stats["timeouts"],
+                "cancelled": self._stats["cancelled"],
+                "avg_wait": round(self._stats["total_wait"] / dispatched, 3) if dispatched else 0.0
+            }
+
+
+# 전역 인스턴스 생성
+llm_scheduler = LLMScheduler(
+    max_concurrency=settings.LLM_MAX_CONCURRENCY,
+    rpm=settings.LLM_RPM,
+    tpm=settings.LLM_TPM,
+    team_weights=parse_team_weights(settings.TEAM_WEIGHTS)
+)
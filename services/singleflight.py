@@ -0,0 +1,67 @@
+import time
+import threading
+from concurrent.futures import Future
+from typing import Dict, Any, Callable, Optional, Tuple
+
+
+# 동일 요청 병합 (singleflight)
+# 같은 키로 진행 중인 호출이 있으면 새로 호출하지 않고 그 결과를 함께 받는다.
+# 리더 요청에만 해당하는 실패(share_error가 False)는 공유하지 않고, 후속 호출이 직접 다시 실행한다.
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+        self._stats = {"leaders": 0, "followers": 0, "rejoined": 0}
+
+    # 호출 실행: (결과, 다른 호출의 결과를 공유했는지 여부) 반환
+    # share_error: 리더의 예외를 후속 호출에 그대로 전달할지 판단 (None이면 모든 예외 공유)
+    def do(self, key: str, fn: Callable[[], Any], timeout: Optional[float] = None,
+           share_error: Optional[Callable[[BaseException], bool]] = None) -> Tuple[Any, bool]:
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            with self._lock:
+                future = self._calls.get(key)
+                is_leader = future is None
+                if is_leader:
+                    future = Future()
+                    self._calls[key] = future
+                    self._stats["leaders"] += 1
+                else:
+                    self._stats["followers"] += 1
+
+            if is_leader:
+                break
+
+            # 진행 중인 호출 결과 대기 (공유 대상 실패면 같은 예외 발생)
+            try:
+                remaining = max(deadline - time.monotonic(), 0.0) if deadline is not None else None
+                return future.result(timeout=remaining), True
+            except Exception as e:
+                # 대기 시간 초과는 그대로 전달 (리더 예외와 구분: TimeoutError는 FutureTimeoutError와 같은 클래스일 수 있음)
+                leader_failed = future.done() and not future.cancelled() and future.exception() is e
+                if not leader_failed or share_error is None or share_error(e):
+                    raise
+                # 리더 요청에만 해당하는 실패: 새 리더로 다시 실행하거나 다른 진행 중인 호출에 합류
+                with self._lock:
+                    self._stats["rejoined"] += 1
+
+        try:
+            result = fn()
+            future.set_result(result)
+            return result, False
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    # 병합 통계 (서비스 상태 확인용)
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "in_flight": len(self._calls),
+                "leaders": self._stats["leaders"],
+                "followers": self._stats["followers"],
+                "rejoined": self._stats["rejoined"]
+            }
@@ -0,0 +1,85 @@
+import threading
+from typing import Dict, Any, Optional
+
+# 기본 추정 계수: 한글 음절 1자당 토큰 수 / 그 외 문자 몇 자당 1토큰
+HANGUL_TOKENS_PER_CHAR = 0.9
+OTHER_CHARS_PER_TOKEN = 3.8
+
+
+# 한글 음절/자모 여부
+def _is_hangul(char: str) -> bool:
+    code = ord(char)
+    return 0xAC00 <= code <= 0xD7A3 or 0x1100 <= code <= 0x11FF or 0x3130 <= code <= 0x318F
+
+
+# 보정 가능한 로컬 토큰 추정기
+# usage_metadata가 없을 때 사용하며, 실제 토큰 수가 들어올 때마다 보정 계수를 갱신한다.
+class TokenEstimator:
+    def __init__(self, smoothing: float = 0.1):
+        self.smoothing = smoothing
+        self.correction = 1.0
+        self.samples = 0
+        self._lock = threading.Lock()
+
+    # 보정 전 추정치
+    def _raw_estimate(self, text: str) -> float:
+        hangul = sum(1 for char in text if _is_hangul(char))
+        other = len(text) - hangul
+        return hangul * HANGUL_TOKENS_PER_CHAR + other / OTHER_CHARS_PER_TOKEN
+
+    def estimate(self, text: str) -> int:
+        if not text:
+            return 0
+        return max(1, int(self._raw_estimate(text) * self.correction))
+
+    # 실제 토큰 수로 보정 계수 갱신 (지수 이동 평균)
+    def calibrate(self, text: str, actual_tokens: int):
+        raw = self._raw_estimate(text)
+        if raw <= 0 or actual_tokens <= 0:
+            return
+        with self._lock:
+            ratio = actual_tokens / raw
+            if self.samples == 0:
+                self.correction = ratio
+            else:
+                self.correction += self.smoothing * (ratio - self.correction)
+            self.samples += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"correction": round(self.correction, 4), "samples": self.samples}
+
+
+# 응답의 usage_metadata에서 토큰 수 추출 (없으면 None)
+def extract_usage(response: Any) -> Optional[Dict[str, int]]:
+    metadata = getattr(response, "usage_metadata", None)
+    if metadata is None:
+        return None
+
+    prompt_tokens = getattr(metadata, "prompt_token_count", 0) or 0
+    output_tokens = getattr(metadata, "candidates_token_count", 0) or 0
+    cached_tokens = getattr(metadata, "cached_content_token_count", 0) or 0
+    total_tokens = getattr(metadata, "total_token_count", 0) or (prompt_tokens + output_tokens)
+    if not total_tokens:
+        return None
+
+    return {
+        "prompt_tokens": prompt_tokens,
+        "output_tokens": output_tokens,
+        "cached_tokens": cached_tokens,
+        "total_tokens": total_tokens,
+        "estimated": False
+    }
+
+
+# 토큰 사용량 합산 (재요청 등 한 요청에서 여러 번 호출한 경우)
+def merge_usage(first: Optional[Dict[str, Any]], second: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    if not first or not second:
+        return first or second
+    merged = {key: first.get(key, 0) + second.get(key, 0)
+              for key in ("prompt_tokens", "output_tokens", "cached_tokens", "total_tokens")}
+    merged["estimated"] = bool(first.get("estimated") or second.get("estimated"))
+    return merged
+
+
+# 전역 인스턴스 생성
+token_estimator = TokenEstimator()
@@ -1,4 +1,3 @@
-from bson import ObjectId
 from datetime import datetime, timedelta
 
 from database.crud import create_user, get_user_by_team_and_name, get_user_generations, get_user_feedbacks
@@ -14,7 +13,8 @@ def handle_user_login(team_name: str, user_name: str) -> str:
         logger.info(f"[handle_user_login] Existing user logged in: user_id={user_id}, team_name={team_name}, user_name={user_name}")
         return user_id
     
-    # 새로운 사용자 생성
+    # 새로운 사용자 생성 (bson은 신규 가입 시에만 필요하므로 지연 import)
+    from bson import ObjectId
     user_id = str(ObjectId())
     create_user(team_name, user_name, user_id)
     
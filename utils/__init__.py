@@ -1,12 +1,17 @@
 # Utils module
 from .validators import validate_input_form, validate_user_input
 from .get_logger import get_logger, logger
-from .prompt_loader import load_prompt_template
+from .prompt_loader import load_prompt_template, load_compiled_template
+from .request_context import RequestContext, DeadlineExceededError, RequestCancelledError
 
 __all__ = [
     'validate_input_form',
     'validate_user_input',
     'get_logger',
     'logger',
-    'load_prompt_template'
+    'load_prompt_template',
+    'load_compiled_template',
+    'RequestContext',
+    'DeadlineExceededError',
+    'RequestCancelledError'
 ]
@@ -8,12 +8,14 @@ from core.config import settings
 # 로그 디렉토리 설정
 os.makedirs(settings.LOG_PATH, exist_ok=True)
 
+# 한국 시간대 (레코드마다 조회하지 않도록 한 번만 생성)
+KST = pytz.timezone("Asia/Seoul")
+
 # Formatter 클래스
 class KSTFormatter(logging.Formatter):
     def formatTime(self, record, datefmt=None):
         # 한국 시간대 설정
-        kst = pytz.timezone("Asia/Seoul")
-        dt = datetime.fromtimestamp(record.created, tz=kst)
+        dt = datetime.fromtimestamp(record.created, tz=KST)
         if datefmt:
             return dt.strftime(datefmt)
         else:
@@ -50,7 +52,8 @@ def get_logger():
         )
 
         # INFO 로그 핸들러
-        info_handler = logging.FileHandler(os.path.join(settings.LOG_PATH, "info.log"))
+        # 파일은 첫 로그 기록 시점에 열림 (delay=True, 워커 프로세스 시작 비용 절감)
+        info_handler = logging.FileHandler(os.path.join(settings.LOG_PATH, "info.log"), delay=True)
         info_handler.setLevel(logging.INFO)
         info_handler.setFormatter(formatter)
 
@@ -63,7 +66,7 @@ def get_logger():
         logger.addHandler(info_handler)
 
         # ERROR 로그 핸들러
-        error_handler = logging.FileHandler(os.path.join(settings.LOG_PATH, "error.log"))
+        error_handler = logging.FileHandler(os.path.join(settings.LOG_PATH, "error.log"), delay=True)
         error_handler.setLevel(logging.ERROR)
         error_handler.setFormatter(formatter)
 
@@ -1,46 +1,333 @@
 import os
+import time
+import string
+import marshal
+import hashlib
+import threading
 import yaml
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple, Optional
 
 from core.config import settings
 from utils.get_logger import logger
 
+# 요청마다 바뀌는 프롬프트 변수 -> product_data 필드 매핑
+REQUEST_FIELDS = {
+    "productName": "product_name",
+    "price": "price",
+    "productAttribute": "product_attribute",
+    "event": "event",
+    "card": "card",
+    "coupon": "coupon",
+    "keyword": "keyword",
+    "etc": "etc",
+    "bestCase": "best_case",
+    # 재생성 변수
+    "regenerateReason": "regenerate_reason",
+    "previousContents": "previous_contents",
+    "targetTones": "target_tones"
+}
+
+_formatter = string.Formatter()
+
+# libyaml 기반 C 로더 사용 (설치되지 않은 경우 순수 Python 로더)
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+# 스냅샷 형식 버전 (구조 변경 시 증가)
+SNAPSHOT_FORMAT = 1
+
+
+# 컴파일된 프롬프트 템플릿 클래스
+# 정적 섹션(역할 정의, 지침, 스타일, 출력 형식)은 로드 시점에 한 번만 치환하고,
+# 요청별 변수만 렌더링 시점에 채운다.
+class PromptTemplate:
+    def __init__(self, prompt_key: str, prompt_data: Dict[str, Any]):
+        self.prompt_key = prompt_key
+        self.prompt_data = prompt_data
+        self._literals: List[str] = []
+        self._fields: List[Tuple[str, str, str]] = []
+        self._compile(prompt_data.get("system_prompt", ""))
+
+    # 템플릿 내부(정적) 변수
+    def _static_variables(self) -> Dict[str, Any]:
+        community_style = self.prompt_data.get("community_style", {}) or {}
+        return {
+            "role_definition": self.prompt_data.get("role_definition", ""),
+            "guidelines": "\n".join(list(self.prompt_data.get("guidelines", [])) + self._rule_guidelines()),
+            "community_style": community_style,
+            "output_format": self.prompt_data.get("output_format", ""),
+            # community_style 딕셔너리의 개별 값들
+            "community_style_core": community_style.get("core", ""),
+            "community_style_tone": community_style.get("tone", ""),
+            "community_style_characteristics": community_style.get("characteristics", ""),
+            "community_style_professional_terms": community_style.get("professional_terms", "")
+        }
+
+    # 후처리 규칙(rules)의 분량 제한과 금지 표현을 지침으로 추가 (후처리와 같은 기준을 모델에 전달)
+    def _rule_guidelines(self) -> List[str]:
+        rules = self.prompt_data.get("rules") or {}
+        limits = []
+        if rules.get("max_lines"):
+            limits.append(f"최대 {rules['max_lines']}줄")
+        if rules.get("max_line_chars"):
+            limits.append(f"한 줄 {rules['max_line_chars']}자 이내")
+        if rules.get("max_chars"):
+            limits.append(f"전체 {rules['max_chars']}자 이내")
+
+        guidelines = []
+        if limits:
+            guidelines.append(f"분량 제한: 각 문구는 {', '.join(limits)}로 작성한다. 제한을 넘는 줄과 글자는 잘린다.")
+        if rules.get("forbidden_terms"):
+            terms = ", ".join(f"'{term}'" for term in rules["forbidden_terms"])
+            guidelines.append(f"금지 표현: {terms}은(는) 어떤 톤에서도 사용하지 않는다.")
+        return guidelines
+
+    # system_prompt 컴파일 (알 수 없는 플레이스홀더는 로드 시점에 오류 발생)
+    def _compile(self, system_prompt: str):
+        static_variables = self._static_variables()
+        buffer = []
+
+        for literal, field_name, format_spec, conversion in _formatter.parse(system_prompt):
+            buffer.append(literal)
+            if field_name is None:
+                continue
+
+            if field_name in static_variables:
+                value = _formatter.convert_field(static_variables[field_name], conversion)
+                buffer.append(_formatter.format_field(value, format_spec))
+            elif field_name in REQUEST_FIELDS:
+                self._literals.append("".join(buffer))
+                self._fields.append((field_name, conversion, format_spec))
+                buffer = []
+            else:
+                raise KeyError(f"Unknown placeholder '{{{field_name}}}' in prompt '{self.prompt_key}'")
+
+        self._literals.append("".join(buffer))
+
+    # 요청별 변수만 채워 최종 프롬프트 생성
+    def render(self, product_data: Dict[str, Any]) -> str:
+        parts = [self._literals[0]]
+        for (field_name, conversion, format_spec), literal in zip(self._fields, self._literals[1:]):
+            value = _formatter.convert_field(product_data.get(REQUEST_FIELDS[field_name], ""), conversion)
+            parts.append(_formatter.format_field(value, format_spec))
+            parts.append(literal)
+        return "".join(parts)
+
+    # 템플릿이 사용하는 요청별 변수 목록
+    @property
+    def request_fields(self) -> List[str]:
+        return [field_name for field_name, _, _ in self._fields]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.prompt_data.get(key, default)
+
+
+# 프롬프트 세트 클래스: 한 시점에 로드된 프롬프트 전체 (교체 후에도 변경되지 않음)
+class PromptSet:
+    def __init__(self, version: str, prompts: Dict[str, Any], templates: Dict[str, PromptTemplate]):
+        self.version = version
+        self.prompts = prompts
+        self.templates = templates
+
+    def load_prompt(self, prompt_key: str) -> Any:
+        # 프롬프트 키가 존재하지 않으면 오류 발생
+        if prompt_key not in self.prompts:
+            logger.error(f"[load_prompt] Prompt key '{prompt_key}' not found")
+            raise FileNotFoundError(f"Prompt key '{prompt_key}' not found")
+
+        return self.prompts[prompt_key]
+
+    def load_template(self, prompt_key: str) -> PromptTemplate:
+        # 템플릿 키가 존재하지 않으면 오류 발생
+        if prompt_key not in self.templates:
+            logger.error(f"[load_template] Prompt key '{prompt_key}' not found")
+            raise FileNotFoundError(f"Prompt key '{prompt_key}' not found")
+
+        return self.templates[prompt_key]
+
+
 # 프롬프트 로더 클래스
 class PromptLoader:
     def __init__(self):
-        self.prompts: Dict[str, Any] = {}
-        self._load_prompts()
+        self.prompts_dir = settings.PROMPT_BASE_PATH
+        self._reload_lock = threading.Lock()
+        self._watcher: Optional[threading.Thread] = None
+        self._fingerprint = self._scan_fingerprint()
+        self._prompt_set = self._load_prompts(strict=False, fingerprint=self._fingerprint)
+
+    # 현재 프롬프트 세트 (요청 시작 시 한 번 가져와서 끝까지 사용)
+    def snapshot(self) -> PromptSet:
+        return self._prompt_set
+
+    @property
+    def prompts(self) -> Dict[str, Any]:
+        return self._prompt_set.prompts
+
+    @property
+    def templates(self) -> Dict[str, PromptTemplate]:
+        return self._prompt_set.templates
+
+    @property
+    def version(self) -> str:
+        return self._prompt_set.version
+
+    # 프롬프트 파일 목록
+    def _prompt_files(self) -> List[str]:
+        return sorted(f for f in os.listdir(self.prompts_dir) if f.endswith(".yaml"))
+
+    # 변경 감지용 파일 정보 (파일명, 수정 시각, 크기)
+    def _scan_fingerprint(self) -> Tuple:
+        fingerprint = []
+        for filename in self._prompt_files():
+            try:
+                stat = os.stat(os.path.join(self.prompts_dir, filename))
+                fingerprint.append((filename, stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                continue
+        return tuple(fingerprint)
 
     # 프롬프트 로드 함수
-    def _load_prompts(self):
-        prompts_dir = settings.PROMPT_BASE_PATH
-        
+    # strict=True이면 하나라도 실패 시 예외 발생 (재로드 시 기존 세트 유지 목적)
+    def _load_prompts(self, strict: bool, fingerprint: Optional[Tuple] = None) -> PromptSet:
+        fingerprint = fingerprint if fingerprint is not None else self._scan_fingerprint()
+
+        # 파일 상태가 같으면 스냅샷에서 로드 (YAML 파싱 생략)
+        snapshot = self._read_snapshot(fingerprint)
+        if snapshot is not None:
+            try:
+                templates = {key: PromptTemplate(key, data) for key, data in snapshot["prompts"].items()}
+                return PromptSet(snapshot["version"], snapshot["prompts"], templates)
+            except Exception as e:
+                logger.error(f"[_load_prompts] Invalid prompt snapshot, parsing YAML files: {e}")
+
+        prompts: Dict[str, Any] = {}
+        templates: Dict[str, PromptTemplate] = {}
+        digest = hashlib.sha1()
+        failed = False
+
         # 프롬프트 파일 목록 로드
-        for filename in os.listdir(prompts_dir):
-            if filename.endswith(".yaml"):
+        for filename in self._prompt_files():
+            try:
+                with open(os.path.join(self.prompts_dir, filename), "rb") as f:
+                    raw = f.read()
+
+                # YAML 파일 로드
+                prompt_data = yaml.load(raw.decode("utf-8"), Loader=_YamlLoader)
+
+                # 파일 이름에서 확장자를 제거하고 키로 사용
+                prompt_key = os.path.splitext(filename)[0].lower()
+
+                # 템플릿 컴파일 (플레이스홀더 검증 포함)
+                templates[prompt_key] = PromptTemplate(prompt_key, prompt_data)
+                prompts[prompt_key] = prompt_data
+                digest.update(filename.encode("utf-8"))
+                digest.update(raw)
+            except Exception as e:
+                logger.error(f"[_load_prompts] Error loading prompt file {filename}: {e}")
+                if strict:
+                    raise
+                failed = True
+
+        prompt_set = PromptSet(digest.hexdigest()[:12], prompts, templates)
+
+        # 모든 파일이 정상 로드된 경우에만 스냅샷 저장
+        if not failed:
+            self._write_snapshot(fingerprint, prompt_set)
+
+        return prompt_set
+
+    # 스냅샷 읽기 (파일 수정 시각/크기가 일치할 때만 사용)
+    def _read_snapshot(self, fingerprint: Tuple) -> Optional[Dict[str, Any]]:
+        try:
+            with open(settings.PROMPT_CACHE_PATH, "rb") as f:
+                snapshot = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+
+        if not isinstance(snapshot, dict) or snapshot.get("format") != SNAPSHOT_FORMAT:
+            return None
+        if snapshot.get("prompts_dir") != self.prompts_dir or snapshot.get("fingerprint") != fingerprint:
+            return None
+        return snapshot
+
+    # 스냅샷 저장 (임시 파일에 쓴 뒤 교체하여 다른 프로세스가 깨진 파일을 읽지 않도록 함)
+    def _write_snapshot(self, fingerprint: Tuple, prompt_set: PromptSet):
+        snapshot = {
+            "format": SNAPSHOT_FORMAT,
+            "prompts_dir": self.prompts_dir,
+            "fingerprint": fingerprint,
+            "version": prompt_set.version,
+            "prompts": prompt_set.prompts
+        }
+        tmp_path = f"{settings.PROMPT_CACHE_PATH}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(settings.PROMPT_CACHE_PATH), exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                marshal.dump(snapshot, f)
+            os.replace(tmp_path, settings.PROMPT_CACHE_PATH)
+        except (OSError, ValueError) as e:
+            # marshal로 직렬화할 수 없는 값(예: 날짜)이 있거나 쓰기 실패 시 스냅샷 없이 진행
+            logger.error(f"[_write_snapshot] Failed to write prompt snapshot: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    # 프롬프트 재로드: 전체 검증 통과 시에만 세트를 원자적으로 교체
+    def reload(self) -> bool:
+        with self._reload_lock:
+            fingerprint = self._scan_fingerprint()
+            try:
+                prompt_set = self._load_prompts(strict=True, fingerprint=fingerprint)
+            except Exception as e:
+                logger.error(f"[reload] Prompt reload rejected, keeping version {self.version}: {e}")
+                # 같은 파일 상태로 재시도하지 않도록 기록
+                self._fingerprint = fingerprint
+                return False
+
+            previous_version = self.version
+            self._fingerprint = fingerprint
+            self._prompt_set = prompt_set
+            logger.info(f"[reload] Prompts reloaded: {previous_version} -> {prompt_set.version}")
+            return True
+
+    # 파일 변경 여부 확인 후 재로드
+    def check_for_changes(self) -> bool:
+        if self._scan_fingerprint() == self._fingerprint:
+            return False
+        return self.reload()
+
+    # 백그라운드 변경 감지 스레드 시작 (mtime 폴링)
+    def start_watcher(self, interval: float):
+        if interval <= 0 or (self._watcher and self._watcher.is_alive()):
+            return
+
+        def watch():
+            while True:
+                time.sleep(interval)
                 try:
-                    with open(os.path.join(prompts_dir, filename), "r", encoding="utf-8") as f:
-                        # YAML 파일 로드
-                        prompt_data = yaml.safe_load(f)
-                        
-                        # 파일 이름에서 확장자를 제거하고 키로 사용
-                        prompt_key = os.path.splitext(filename)[0].lower()
-                        self.prompts[prompt_key] = prompt_data
+                    self.check_for_changes()
                 except Exception as e:
-                    logger.error(f"[_load_prompts] Error loading prompt file {filename}: {e}")
+                    logger.error(f"[start_watcher] Prompt watcher error: {e}")
+
+        self._watcher = threading.Thread(target=watch, name="prompt-watcher", daemon=True)
+        self._watcher.start()
 
     def load_prompt(self, prompt_key: str) -> Any:
-        # 프롬프트 키가 존재하지 않으면 오류 발생
-        if prompt_key not in self.prompts:
-            logger.error(f"[load_prompt] Prompt key '{prompt_key}' not found")
-            raise FileNotFoundError(f"Prompt key '{prompt_key}' not found")
-        
-        return self.prompts[prompt_key]
+        return self._prompt_set.load_prompt(prompt_key)
+
+    def load_template(self, prompt_key: str) -> PromptTemplate:
+        return self._prompt_set.load_template(prompt_key)
 
 
 # 전역 인스턴스 생성
 prompt_loader = PromptLoader()
+prompt_loader.start_watcher(settings.PROMPT_RELOAD_INTERVAL)
 
 # 프롬프트 템플릿 로드 함수
 def load_prompt_template(prompt_key: str) -> Any:
-    return prompt_loader.load_prompt(prompt_key)
\ No newline at end of file
+    return prompt_loader.load_prompt(prompt_key)
+
+# 컴파일된 프롬프트 템플릿 로드 함수
+def load_compiled_template(prompt_key: str) -> PromptTemplate:
+    return prompt_loader.load_template(prompt_key)
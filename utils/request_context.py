@@ -0,0 +1,98 @@
+import time
+import threading
+from typing import Dict, Any, Optional
+
+from core.config import settings
+from utils.get_logger import logger
+
+
+# 요청 데드라인 초과 오류
+class DeadlineExceededError(Exception):
+    pass
+
+
+# 요청 취소 오류 (사용자가 요청을 버린 경우: 화면 이동, 로그아웃, 새 생성 요청)
+class RequestCancelledError(Exception):
+    pass
+
+
+# 요청 컨텍스트: UI에서 생성해 서비스 -> AIService -> crud까지 전달하는 요청 단위 시간 예산
+# 각 단계는 남은 시간을 확인해 초과가 예상되면 부분 결과나 캐시된 결과로 응답한다.
+# cancel()로 취소하면 대기열 대기, 재시도, 재요청 등 이후 단계가 중단된다.
+class RequestContext:
+    def __init__(self, operation: str, timeout: Optional[float] = None):
+        self.operation = operation
+        self.timeout = timeout if timeout is not None else settings.GENERATION_SLO
+        self.started_at = time.monotonic()
+        self.deadline = self.started_at + self.timeout
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+        self.cancel_reason: Optional[str] = None
+        # 단계별 경과 시간 (로그/분석용)
+        self.stages: Dict[str, float] = {}
+
+    # 남은 시간(초), 초과했으면 0
+    def remaining(self) -> float:
+        return max(self.deadline - time.monotonic(), 0.0)
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.deadline
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    # 남은 시간을 limit 이내로 제한 (minimum: 초과 후에도 보장할 최소 시간, 결과 저장 등)
+    def remaining_for(self, limit: float, minimum: float = 0.0) -> float:
+        return min(limit, max(self.remaining(), minimum))
+
+    # 요청 취소 (이미 취소되었으면 무시)
+    def cancel(self, reason: str = "cancelled"):
+        with self._lock:
+            if self._cancelled.is_set():
+                return
+            self.cancel_reason = reason
+            self._cancelled.set()
+        logger.info(f"[RequestContext] Cancelled: operation={self.operation}, reason={reason}, elapsed={self.elapsed:.2f}s")
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    # 취소 이벤트 (스케줄러 대기열 등 대기 중 취소 감지용)
+    @property
+    def cancel_event(self) -> threading.Event:
+        return self._cancelled
+
+    # seconds 동안 대기, 도중에 취소되면 즉시 True 반환
+    def wait(self, seconds: float) -> bool:
+        return self._cancelled.wait(max(seconds, 0.0))
+
+    def raise_if_cancelled(self):
+        if self.cancelled:
+            raise RequestCancelledError(f"[RequestContext] {self.operation} cancelled ({self.cancel_reason})")
+
+    # 단계 시작 시점 기록 후 취소 여부와 남은 시간 확인 (min_budget보다 적으면 DeadlineExceededError)
+    def check(self, stage: str, min_budget: float = 0.0):
+        with self._lock:
+            self.stages[stage] = round(self.elapsed, 3)
+        self.raise_if_cancelled()
+        if self.remaining() <= min_budget:
+            logger.info(f"[RequestContext] Deadline budget exhausted: operation={self.operation}, stage={stage}, elapsed={self.elapsed:.2f}s, slo={self.timeout:.1f}s")
+            raise DeadlineExceededError(f"[RequestContext] {self.operation} exceeded {self.timeout:.1f}s at {stage}")
+
+    # 남은 시간이 min_budget 이상인지 (선택 단계 실행 여부 판단용)
+    def has_budget(self, min_budget: float) -> bool:
+        return self.remaining() >= min_budget
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "operation": self.operation,
+            "timeout": self.timeout,
+            "elapsed": round(self.elapsed, 3),
+            "remaining": round(self.remaining(), 3),
+            "cancelled": self.cancelled,
+            "cancel_reason": self.cancel_reason,
+            "stages": dict(self.stages)
+        }
@@ -0,0 +1,17 @@
+import time
+
+from database import create_tables
+
+# 데이터베이스 초기화
+create_tables()
+
+from services.job_service import job_worker_pool
+from utils.get_logger import logger
+
+# 화면 없이 생성 작업 워커만 실행 (작업 처리량을 프로세스 단위로 늘릴 때 사용)
+# 앱 프로세스는 JOB_WORKERS=0으로 실행하면 작업 등록만 하고 실행은 워커 프로세스가 맡는다.
+if __name__ == "__main__":
+    job_worker_pool.start()
+    while True:
+        time.sleep(60)
+        logger.info(f"[worker] {job_worker_pool.snapshot()}")